@@ -0,0 +1,89 @@
+"""
+Benchmark of the RFC 822 and ISO 8601 date parsers against dateutil, in dates/sec.
+
+Dates are the date test corpus in tests/data/dates, and random dates in the RFC 822 and
+ISO 8601 formats that feeds use. The datestring_to_utc_datetime cache is cleared before
+each run, so every date is parsed.
+
+Usage: python -m benchmarks.dates [--seconds 2] [--random 2000]
+"""
+import argparse
+import random
+import time
+import warnings
+from pathlib import Path
+from typing import List, Callable, Dict
+
+from dateutil import parser
+
+from feedsearch_crawler.feed_spider.lib import (
+    datestring_to_utc_datetime,
+    force_utc,
+    parse_iso8601_date,
+    parse_rfc822_date,
+)
+
+dates_path = Path(__file__).parent.parent / "tests" / "data" / "dates"
+
+
+def read_dates(name: str) -> List[str]:
+    lines = (dates_path / f"{name}.txt").read_text().splitlines()
+    return [line for line in lines if line and not line.startswith("# ")]
+
+
+def random_dates(count: int, date_format: str) -> List[str]:
+    return [
+        time.strftime(date_format, time.gmtime(random.randint(0, 1_700_000_000)))
+        for _ in range(count)
+    ]
+
+
+def dates_per_second(dates: List[str], parse: Callable, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        datestring_to_utc_datetime.cache_clear()
+        for date_string in dates:
+            parse(date_string)
+        count += len(dates)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--seconds", type=float, default=2)
+    arg_parser.add_argument("--random", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    # dateutil warns about timezone names it does not know.
+    warnings.simplefilter("ignore")
+    random.seed(1)
+
+    corpus = {
+        "rfc822": read_dates("rfc822"),
+        "iso8601": read_dates("iso8601"),
+        "other": read_dates("other"),
+        "random rfc822": random_dates(args.random, "%a, %d %b %Y %H:%M:%S +0000"),
+        "random iso8601": random_dates(args.random, "%Y-%m-%dT%H:%M:%SZ"),
+    }
+    fast_parsers: Dict[str, Callable] = {
+        "rfc822": parse_rfc822_date,
+        "iso8601": parse_iso8601_date,
+        "random rfc822": parse_rfc822_date,
+        "random iso8601": parse_iso8601_date,
+    }
+
+    for name, dates in corpus.items():
+        parsers = {
+            "dateutil": lambda date_string: force_utc(parser.parse(date_string)),
+            "datestring_to_utc_datetime": datestring_to_utc_datetime,
+        }
+        if name in fast_parsers:
+            parsers[fast_parsers[name].__name__] = fast_parsers[name]
+        for parser_name, parse in parsers.items():
+            rate = dates_per_second(dates, parse, args.seconds)
+            print(f"{name:>14} {parser_name:>26}: {rate:.0f} dates/sec")
+
+
+if __name__ == "__main__":
+    main()
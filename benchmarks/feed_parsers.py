@@ -0,0 +1,98 @@
+"""
+Benchmark of the lxml feed parser against feedparser, in feeds parsed per second.
+
+Feeds are the feed test corpus that the fast parser supports, and a large generated podcast feed.
+
+Usage: python -m benchmarks.feed_parsers [--seconds 2] [--items 500]
+"""
+import argparse
+import time
+import warnings
+from pathlib import Path
+from typing import List, Tuple, Dict, Callable
+
+import feedparser
+
+from feedsearch_crawler.feed_spider.feed_xml_parser import parse_feed_xml, etree
+
+corpus_path = Path(__file__).parent.parent / "tests" / "data" / "feeds"
+
+content_types: Dict[str, str] = {
+    ".rss": "application/rss+xml",
+    ".atom": "application/atom+xml",
+    ".rdf": "application/rdf+xml",
+}
+
+
+def large_feed(items: int) -> bytes:
+    """
+    Create a podcast feed with many items.
+    """
+    item = (
+        "<item><title>Episode %d</title>"
+        "<description>Plain text description of the episode</description>"
+        "<pubDate>Mon, 02 Jan 2006 15:04:05 -0700</pubDate>"
+        '<enclosure url="https://cdn.example.com/%d.mp3" type="audio/mpeg" length="1000"/></item>'
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">'
+        "<channel><title>Podcast</title><description>Description</description>"
+        + "".join(item % (i, i) for i in range(items))
+        + "</channel></rss>"
+    ).encode()
+
+
+def feeds_per_second(
+    feeds: List[Tuple[bytes, Dict]], parse: Callable, seconds: float
+) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for data, headers in feeds:
+            parse(data, headers)
+        count += len(feeds)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--items", type=int, default=500)
+    args = parser.parse_args()
+
+    if etree is None:
+        print("lxml is not installed")
+        return
+
+    warnings.simplefilter("ignore")
+
+    corpus = []
+    for path in sorted(corpus_path.iterdir()):
+        data = path.read_bytes().strip()
+        headers = {"content-type": content_types[path.suffix]}
+        # Only compare the feeds that the fast parser reads, the rest are parsed by feedparser anyway.
+        if parse_feed_xml(data, headers) is not None:
+            corpus.append((data, headers))
+
+    feeds = {
+        f"corpus ({len(corpus)} feeds)": corpus,
+        f"{args.items} items": [
+            (large_feed(args.items), {"content-type": "application/rss+xml"})
+        ],
+    }
+    parsers = {
+        "parse_feed_xml": parse_feed_xml,
+        "feedparser": lambda data, headers: feedparser.parse(
+            data, response_headers=headers
+        ),
+    }
+
+    for name, texts in feeds.items():
+        for parser_name, parse in parsers.items():
+            rate = feeds_per_second(texts, parse, args.seconds)
+            print(f"{name:>18} {parser_name:>15}: {rate:.0f} feeds/sec")
+
+
+if __name__ == "__main__":
+    main()
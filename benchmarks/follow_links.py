@@ -0,0 +1,147 @@
+"""
+Memory and CPU benchmark of Crawler.follow on link-heavy pages.
+
+Compares sharing the immutable URLHistory chain between Requests with deep-copying a list of history URLs
+for every followed link, and reports the time and memory used to follow every link on a set of pages that
+repeat the same navigation hrefs.
+
+Usage: python -m benchmarks.follow_links [--pages 50] [--links 2000] [--depth 4]
+"""
+import argparse
+import asyncio
+import copy
+import time
+import tracemalloc
+from typing import List, Callable, Any, Tuple
+
+import aiohttp
+from yarl import URL
+
+from feedsearch_crawler.crawler import Crawler, Response
+from feedsearch_crawler.crawler.lib import URLHistory
+
+
+class BenchmarkCrawler(Crawler):
+    async def parse(self, request, response):
+        pass
+
+    async def parse_xml(self, response_text):
+        pass
+
+    async def process_item(self, item):
+        pass
+
+
+def page_hrefs(page: int, links: int) -> List[str]:
+    """
+    Create the hrefs of a link-heavy page. Most hrefs are navigation links repeated on every page.
+
+    :param page: Page number
+    :param links: Number of links on the page
+    :return: List of href strings
+    """
+    unique = links // 10
+    hrefs = [f"/category/{i % 50}/page/{i % 20}" for i in range(links - unique)]
+    hrefs += [f"/{page}/article-{i}.html" for i in range(unique)]
+    return hrefs
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, int, Any]:
+    """
+    Run a function and measure its duration and peak memory allocation.
+
+    :param func: Function to run
+    :return: Tuple of duration in Milliseconds, peak allocated bytes, and the function result
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    duration = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak, result
+
+
+def history_urls(depth: int) -> List[URL]:
+    return [URL(f"https://example.com/{i}/") for i in range(depth)]
+
+
+def copied_histories(depth: int, links: int) -> list:
+    """
+    Create a history for each link by deep-copying the list of history URLs.
+    """
+    history = history_urls(depth)
+    histories = []
+    for i in range(links):
+        link_history = copy.deepcopy(history)
+        link_history.append(URL(f"https://example.com/link/{i}"))
+        histories.append(link_history)
+    return histories
+
+
+def shared_histories(depth: int, links: int) -> list:
+    """
+    Create a history for each link by extending a shared URLHistory chain.
+    """
+    history = None
+    for url in history_urls(depth):
+        history = URLHistory(url, history)
+    return [history.append(URL(f"https://example.com/link/{i}")) for i in range(links)]
+
+
+def follow_pages(pages: int, links: int, depth: int) -> Crawler:
+    """
+    Follow every link on each page, as the spider does for a crawl of the same site.
+    """
+    crawler = BenchmarkCrawler(allowed_domains=["example.com"], max_depth=depth + 2)
+
+    history = None
+    for url in history_urls(depth):
+        history = URLHistory(url, history)
+
+    async def run() -> list:
+        # Requests are created but never sent.
+        crawler._session = aiohttp.ClientSession()
+        requests = []
+        for page in range(pages):
+            url = URL(f"https://example.com/{page}/")
+            response = Response(url, "GET", history=history.append(url))
+            for href in page_hrefs(page, links):
+                request = await crawler.follow(href, response=response)
+                if request:
+                    requests.append(request)
+        await crawler._session.close()
+        return requests
+
+    crawler.requests = asyncio.run(run())
+    return crawler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    for name, func in (("deepcopy list", copied_histories), ("URLHistory", shared_histories)):
+        duration, peak, _ = measure(lambda: func(args.depth, args.links))
+        print(
+            f"{name:>14}: {args.links} histories at depth {args.depth} "
+            f"in {duration:.1f} ms, peak {peak / 1024:.0f} KiB"
+        )
+
+    duration, peak, crawler = measure(
+        lambda: follow_pages(args.pages, args.links, args.depth)
+    )
+    total = args.pages * args.links
+    cache = crawler._url_cache
+    print(
+        f"{'follow':>14}: {total} links on {args.pages} pages in {duration:.1f} ms "
+        f"({duration * 1000 / total:.2f} us/link), peak {peak / 1024:.0f} KiB, "
+        f"{len(crawler.requests)} Requests, URL cache hits {cache.hits} misses {cache.misses}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of the HTML parser backends, in pages parsed per second.
+
+Each page is parsed, then all links, the title, and the site metadata used by the spider are read from it.
+Pages are the HTML test corpus, and a large generated page with many links.
+
+Usage: python -m benchmarks.html_backends [--seconds 2] [--links 2000]
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from feedsearch_crawler.feed_spider.html_document import html_backends, parse_html
+
+corpus_path = Path(__file__).parent.parent / "tests" / "data" / "html"
+
+
+def large_page(links: int) -> str:
+    """
+    Create a page with a typical head and many links in the body.
+    """
+    head = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Large page</title>"
+        "<meta property='og:site_name' content='Large'>"
+        "<link rel='alternate' type='application/rss+xml' href='/feed.xml'>"
+        "<link rel='icon' href='/favicon.ico'><script>var x = 1;</script></head><body>"
+    )
+    body = "".join(
+        f"<div class='post'><h2><a href='/posts/{i}.html'>Post {i}</a></h2>"
+        f"<p>Some text with a <a href='/tags/{i % 40}/'>tag link</a>.</p></div>"
+        for i in range(links // 2)
+    )
+    return head + body + "</body></html>"
+
+
+def read_page(text: str, backend: str) -> int:
+    document = parse_html(text, backend)
+    links = list(document.links())
+    document.title()
+    document.find_meta("og:site_name")
+    document.find_link("canonical")
+    document.head_index.find_links("alternate")
+    return len(links)
+
+
+def pages_per_second(pages: List[str], backend: str, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for page in pages:
+            read_page(page, backend)
+        count += len(pages)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--links", type=int, default=2000)
+    args = parser.parse_args()
+
+    pages = {
+        "corpus": [p.read_text(encoding="utf-8") for p in sorted(corpus_path.glob("*.html"))],
+        "large": [large_page(args.links)],
+    }
+
+    for backend, document_class in html_backends.items():
+        if not document_class.is_available():
+            print(f"{backend:>10}: not installed")
+            continue
+        results = ", ".join(
+            f"{name} {pages_per_second(texts, backend, args.seconds):.0f} pages/sec"
+            for name, texts in pages.items()
+        )
+        print(f"{backend:>10}: {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-link microbenchmark of the LinkFilter href classification, on a corpus of real-world href values.
+
+Compares LinkFilter.should_follow_link, which classifies each href with HrefFlags in one
+pass, against the original rule logic, which parsed every href to a URL and checked each
+rule separately.
+
+Usage: python -m benchmarks.link_filter [--seconds 1]
+"""
+import argparse
+import time
+from typing import List, Callable
+
+from yarl import URL
+
+from feedsearch_crawler.crawler import Request, Response
+from feedsearch_crawler.feed_spider.link_filter import HrefFlags, LinkFilter
+from tests.link_filter_baseline import baseline_should_follow_link, read_corpus
+
+
+def ns_per_link(hrefs: List[str], func: Callable[[str], object], seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for href in hrefs:
+            func(href)
+        count += len(hrefs)
+    return (time.perf_counter() - start) * 1_000_000_000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=1)
+    args = parser.parse_args()
+
+    hrefs = read_corpus()
+    url = URL("https://example.com/")
+    response = Response(url, "GET", status_code=200)
+    request = Request.__new__(Request)
+    link_filter = LinkFilter(response, request)
+    full_crawl_filter = LinkFilter(response, request, full_crawl=True)
+
+    followed = sum(1 for href in hrefs if link_filter.should_follow_link(href))
+    print(f"{len(hrefs)} hrefs, {followed} followed without full_crawl")
+
+    benchmarks = {
+        "baseline": baseline_should_follow_link,
+        "should_follow_link": link_filter.should_follow_link,
+        "baseline full_crawl": lambda href: baseline_should_follow_link(
+            href, full_crawl=True
+        ),
+        "should_follow_link full_crawl": full_crawl_filter.should_follow_link,
+        "HrefFlags": HrefFlags,
+    }
+    for name, func in benchmarks.items():
+        print(f"{name:>30}: {ns_per_link(hrefs, func, args.seconds):.0f} ns/link")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+tracemalloc benchmark of the size and creation time of the objects put on the crawler queue.
+
+Reports the memory allocated for each Request, Response, CallbackResult and URLHistory object,
+including the objects they create when initialised, but not the values passed to them.
+
+Usage: python -m benchmarks.object_sizes [--count 10000]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Callable, Any, Tuple
+
+import aiohttp
+from yarl import URL
+
+from feedsearch_crawler.crawler import Request, Response, CallbackResult
+from feedsearch_crawler.crawler.lib import URLHistory
+
+
+def measure_objects(create: Callable[[int], Any], count: int) -> Tuple[float, float]:
+    """
+    Create objects and measure the memory allocated for each object.
+
+    :param create: Function that creates one object from its index
+    :param count: Number of objects to create
+    :return: Tuple of bytes allocated per object, and creation time per object in Microseconds
+    """
+    objects = [None] * count
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for i in range(count):
+        objects[i] = create(i)
+    duration = time.perf_counter() - start
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / count, duration * 1_000_000 / count
+
+
+async def run(count: int) -> None:
+    session = aiohttp.ClientSession()
+    url = URL("https://example.com/feed.xml")
+    history = URLHistory(URL("https://example.com/"))
+    result = object()
+
+    cases = {
+        "Request": lambda i: Request(url=url, request_session=session, history=history),
+        "Response": lambda i: Response(url, "GET", history=history, status_code=200),
+        "CallbackResult": lambda i: CallbackResult(result, 1),
+        "URLHistory": lambda i: history.append(url),
+    }
+
+    # Run each case once first, so that one-off allocations aren't counted.
+    for create in cases.values():
+        create(0)
+
+    for name, create in cases.items():
+        size, duration = measure_objects(create, count)
+        print(f"{name:>14}: {size:6.0f} bytes/object, {duration:5.2f} us/object")
+
+    await session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.count))
+
+
+if __name__ == "__main__":
+    main()
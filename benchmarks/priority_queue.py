@@ -0,0 +1,81 @@
+"""
+Microbenchmark of CrawlerPriorityQueue against the heap based asyncio.PriorityQueue.
+
+Queues items with the priorities used by the crawler, then gets them all, both in bulk and interleaved
+with puts as the crawler workers do.
+
+Usage: python -m benchmarks.priority_queue [--items 100000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from asyncio import Queue
+from typing import List, Type
+
+from feedsearch_crawler.crawler.lib import CrawlerPriorityQueue, CallbackResult
+from feedsearch_crawler.crawler.queueable import Queueable
+
+# Priorities of CallbackResults, LinkFilter Requests, default Requests and low priority Requests.
+priorities = [1, 2, 3, 4, 5, 100, 102]
+
+
+def create_items(count: int) -> List[Queueable]:
+    random.seed(0)
+    items = []
+    for _ in range(count):
+        priority = random.choice(priorities)
+        item = CallbackResult(None, 0) if priority == 1 else Queueable()
+        item.priority = priority
+        items.append(item)
+    return items
+
+
+def bulk(queue_class: Type[Queue], items: List[Queueable]) -> float:
+    queue = queue_class()
+    start = time.perf_counter()
+    for item in items:
+        queue.put_nowait(item)
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
+    return time.perf_counter() - start
+
+
+def interleaved(queue_class: Type[Queue], items: List[Queueable]) -> float:
+    queue = queue_class()
+    start = time.perf_counter()
+    # Each get is followed by puts, as each processed Request queues the Requests it follows.
+    for item in items[:100]:
+        queue.put_nowait(item)
+    for i in range(100, len(items), 2):
+        queue.get_nowait()
+        queue.task_done()
+        for item in items[i : i + 2]:
+            queue.put_nowait(item)
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
+    return time.perf_counter() - start
+
+
+async def run(count: int) -> None:
+    items = create_items(count)
+    for name, benchmark in (("bulk", bulk), ("interleaved", interleaved)):
+        for queue_class in (asyncio.PriorityQueue, CrawlerPriorityQueue):
+            duration = min(benchmark(queue_class, items) for _ in range(3))
+            print(
+                f"{name:>11} {queue_class.__name__:>20}: {count} items in {duration * 1000:.1f} ms "
+                f"({duration * 1_000_000_000 / (count * 2):.0f} ns/op)"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(run(args.items))
+
+
+if __name__ == "__main__":
+    main()
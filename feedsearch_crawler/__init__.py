@@ -47,13 +47,15 @@ async def search_async(
 
 def sort_urls(feeds: List[FeedInfo]) -> List[FeedInfo]:
     """
-    Sort list of feeds based on Url score
+    Sort list of feeds based on confidence and Url score
 
     :param feeds: List of FeedInfo objects
-    :return: List of FeedInfo objects sorted by score
+    :return: List of FeedInfo objects sorted by confidence, then score
     """
     feeds = [f for f in feeds if isinstance(f, FeedInfo)]
-    sorted_urls = sorted(list(set(feeds)), key=lambda x: x.score, reverse=True)
+    sorted_urls = sorted(
+        list(set(feeds)), key=lambda x: (x.confidence, x.score), reverse=True
+    )
     return sorted_urls
 
 
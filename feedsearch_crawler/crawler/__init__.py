@@ -7,6 +7,7 @@ from feedsearch_crawler.crawler.lib import (
     to_bytes,
     coerce_url,
     CallbackResult,
+    LRUCache,
 )
 from feedsearch_crawler.crawler.request import Request
 from feedsearch_crawler.crawler.response import Response
@@ -22,4 +23,5 @@ __all__ = [
     "to_string",
     "coerce_url",
     "CallbackResult",
+    "LRUCache",
 ]
@@ -1,12 +1,11 @@
 import asyncio
-import copy
 import inspect
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from fnmatch import fnmatch
-from statistics import harmonic_mean, median
+from statistics import harmonic_mean, median, mean
 from types import AsyncGeneratorType
-from typing import List, Any, Dict, Set
+from typing import List, Any, Dict, Set, Tuple, Optional, Iterable
 from typing import Union
 
 import aiohttp
@@ -22,6 +21,7 @@ from feedsearch_crawler.crawler.lib import (
     Stats,
     CallbackResult,
     CrawlerPriorityQueue,
+    LRUCache,
     parse_href_to_url,
 )
 from feedsearch_crawler.crawler.queueable import Queueable
@@ -56,12 +56,18 @@ class Crawler(ABC):
     concurrency: int = 10
     # Max size of incoming http response content.
     max_content_length = 1024 * 1024 * 10
+    # Content types that are truncated at truncate_content_length and still parsed, instead of failing.
+    truncate_content_types: List[str] = []
+    # Max size of incoming http response content of the truncated content types.
+    truncate_content_length: int = 1024 * 1024
     # Max crawl depth. i.e. The max length of the response history.
     max_depth: int = 4
     # Max callback recursion depth, to prevent accidental infinite recursion from AsyncGenerators.
     max_callback_recursion: int = 10
     # Time in seconds to delay each HTTP request.
     delay: float = 0
+    # Max number of resolved URLs to memoize for each crawl.
+    url_cache_size: int = 10000
 
     # List of worker tasks.
     _workers = []
@@ -88,6 +94,9 @@ class Crawler(ABC):
         delay: float = 0.5,
         max_retries: int = 3,
         ssl: bool = False,
+        inline_callbacks: bool = False,
+        incremental_parse: bool = False,
+        truncate_content_length: int = None,
         *args,
         **kwargs,
     ):
@@ -108,6 +117,12 @@ class Crawler(ABC):
         :param delay: Time in seconds to delay each HTTP request.
         :param max_retries: Maximum number of retries for each failed HTTP request.
         :param ssl: Enables strict SSL checking.
+        :param inline_callbacks: Process nested callback results within the worker that fetched the Response,
+            instead of putting each result back on the queue. Only Requests are put on the queue.
+        :param incremental_parse: Pass each chunk of a Response body to parse_chunk as it is downloaded,
+            so that parsing overlaps with the download.
+        :param truncate_content_length: Max size in bytes of incoming http response content of the
+            truncate_content_types. Larger content is truncated to this size and parsed.
         :param args: Additional positional arguments for subclasses.
         :param kwargs: Additional keyword arguments for subclasses.
         """
@@ -125,6 +140,8 @@ class Crawler(ABC):
         self.request_timeout: ClientTimeout = request_timeout
 
         self.max_content_length = max_content_length
+        if truncate_content_length:
+            self.truncate_content_length = truncate_content_length
         self.max_depth = max_depth
 
         self.user_agent = user_agent or (
@@ -140,6 +157,8 @@ class Crawler(ABC):
         self.delay = delay
         self.max_retries = max_retries
         self._ssl = ssl
+        self.inline_callbacks = inline_callbacks
+        self.incremental_parse = incremental_parse
 
         # Default set for parsed items.
         self.items: set = set()
@@ -147,6 +166,14 @@ class Crawler(ABC):
         # URL Duplicate Filter instance.
         self._duplicate_filter = self.duplicate_filter_class()
 
+        # Cache of URLs resolved by follow, keyed by the Response origin, the URL or href, and the HTTP method.
+        # Values are a tuple of the resolved URL and its duplicate filter fingerprint.
+        self._url_cache = LRUCache(self.url_cache_size)
+
+        # Fingerprints of URLs that are aliases of an already parsed URL, such as the self link of a feed.
+        # Queued Requests to these URLs are dropped before they are fetched.
+        self._alias_fingerprints: Set[str] = set()
+
         # List of total durations in Milliseconds for the total handling time of all Requests.
         self._stats_request_durations = []
         # List of total duration in Milliseconds of all HTTP requests.
@@ -157,6 +184,10 @@ class Crawler(ABC):
         self._stats_queue_wait_times = []
         # List of the size of the queue each time an item was popped off the queue.
         self._stats_queue_sizes = []
+        # List of the number of queue operations saved by each batch of Requests.
+        self._stats_queue_ops_saved = []
+        # List of the number of links dropped before URL parsing from each page.
+        self._stats_links_dropped = []
 
         # Initialise Crawl Statistics.
         self.stats: dict = {
@@ -186,6 +217,20 @@ class Crawler(ABC):
             Stats.QUEUE_SIZE_MEDIAN: 0,
             Stats.QUEUED_TOTAL: 0,
             Stats.REQUESTS_RETRIED: 0,
+            Stats.REQUESTS_BATCHED: 0,
+            Stats.QUEUE_OPS_SAVED: 0,
+            Stats.QUEUE_OPS_SAVED_MAX: 0,
+            Stats.QUEUE_OPS_SAVED_AVG: 0,
+            Stats.LINKS_DUPLICATE: 0,
+            Stats.LINKS_PRESCREENED: 0,
+            Stats.LINKS_DROPPED_PER_PAGE_MAX: 0,
+            Stats.LINKS_DROPPED_PER_PAGE_AVG: 0,
+            Stats.RESPONSES_TRUNCATED: 0,
+            Stats.LINK_LISTS_TRUNCATED: 0,
+            Stats.FEED_CACHE_HITS: 0,
+            Stats.FEED_CACHE_MISSES: 0,
+            Stats.FEED_CACHE_HIT_RATE: 0,
+            Stats.ALIAS_REQUESTS_DROPPED: 0,
         }
 
     async def _handle_request(self, request: Request) -> None:
@@ -199,6 +244,11 @@ class Crawler(ABC):
             if request.has_run and not request.should_retry:
                 return
 
+            # The URL is an alias of a URL that has already been parsed, so fetching it would only find duplicates.
+            if request.fingerprint and request.fingerprint in self._alias_fingerprints:
+                self.stats[Stats.ALIAS_REQUESTS_DROPPED] += 1
+                return
+
             start = time.perf_counter()
 
             # Fetch the request and run its callback
@@ -220,14 +270,19 @@ class Crawler(ABC):
                 self.stats[Stats.STATUS_CODES][response.status_code] = 1
 
             self._stats_response_content_lengths.append(response.content_length)
+            if response.truncated:
+                self.stats[Stats.RESPONSES_TRUNCATED] += 1
 
             # Mark the Response URL as seen in the duplicate filter, as it may be different from the Request URL
             # due to redirects.
             await self._duplicate_filter.url_seen(response.url, response.method)
 
-            # Add callback results to the queue for processing.
+            # Process the callback results in this worker, or add them to the queue for processing.
             if results:
-                self._put_queue(CallbackResult(results, 0))
+                if self.inline_callbacks:
+                    await self._process_request_callback_result(results, 0)
+                else:
+                    self._put_queue(CallbackResult(results, 0))
 
             # Add Request back to the queue for retrying.
             if request.should_retry:
@@ -248,7 +303,8 @@ class Crawler(ABC):
         Process the Request callback result depending on the result type.
         Request callbacks may contain nested iterators.
 
-        :param result: Callback Result. May be an CallbackResult class, AsyncGenerator, Coroutine, Request, or Item.
+        :param result: Callback Result. May be an CallbackResult class, AsyncGenerator, Coroutine, Request,
+            list of Requests, or Item.
         :param callback_recursion: Incremented counter to limit this method's recursion.
         :return: None
         """
@@ -261,19 +317,40 @@ class Crawler(ABC):
                 await self._process_request_callback_result(
                     result.result, result.callback_recursion
                 )
-            # For async generators, put each value back on the queue for processing.
+            # For async generators, process each value inline or put it back on the queue for processing.
             # This will happen recursively until the end of the recursion chain or max_callback_recursion is reached.
             elif inspect.isasyncgen(result):
                 async for value in result:
-                    if value:
+                    if not value:
+                        continue
+                    # Batches of Requests go straight onto the queue, rather than each Request making an extra
+                    # round trip through the queue as a CallbackResult.
+                    if isinstance(value, (list, tuple)):
+                        self._process_requests(
+                            value, saves_callback_results=not self.inline_callbacks
+                        )
+                    elif self.inline_callbacks:
+                        await self._process_request_callback_result(
+                            value, callback_recursion + 1
+                        )
+                    else:
                         self._put_queue(CallbackResult(value, callback_recursion + 1))
-            # For coroutines, await the result then put the value back on the queue for further processing.
+            # For coroutines, await the result then process the value inline or put it back on the queue for
+            # further processing.
             elif inspect.iscoroutine(result):
                 value = await result
-                self._put_queue(CallbackResult(value, callback_recursion + 1))
+                if self.inline_callbacks:
+                    await self._process_request_callback_result(
+                        value, callback_recursion + 1
+                    )
+                else:
+                    self._put_queue(CallbackResult(value, callback_recursion + 1))
             # Requests are put onto the queue to be fetched.
             elif isinstance(result, Request):
                 self._process_request(result)
+            # Batches of Requests are put onto the queue together.
+            elif isinstance(result, (list, tuple)):
+                self._process_requests(result)
 
             # Items are handled by the implementing Class.
             elif isinstance(result, Item):
@@ -296,6 +373,35 @@ class Crawler(ABC):
         # Add the Request to the queue for processing.
         self._put_queue(request)
 
+    def _process_requests(
+        self, requests: Iterable[Request], saves_callback_results: bool = False
+    ) -> None:
+        """
+        Process a batch of Requests onto the Request Queue in one operation.
+
+        The Requests are expected to have been validated and deduplicated by follow.
+        Values that are not Requests are ignored.
+
+        :param requests: Iterable of HTTP Requests
+        :param saves_callback_results: Whether each Request would otherwise have been queued as a CallbackResult.
+        :return: None
+        """
+        batch = [request for request in requests if isinstance(request, Request)]
+        if not batch:
+            return
+
+        for request in batch:
+            request.set_queue_put_time()
+        self._request_queue.put_many_nowait(batch)
+
+        self.stats[Stats.REQUESTS_QUEUED] += len(batch)
+        self.stats[Stats.QUEUED_TOTAL] += len(batch)
+        self.stats[Stats.REQUESTS_BATCHED] += len(batch)
+        # Each batched Request saves putting and getting a CallbackResult on the queue.
+        # Inline callbacks never queue CallbackResults, so there is nothing saved.
+        if saves_callback_results:
+            self._stats_queue_ops_saved.append(len(batch) * 2)
+
     def is_allowed_domain(self, url: URL) -> bool:
         """
         Check that the URL host is in the list of allowed domain patterns.
@@ -338,7 +444,7 @@ class Crawler(ABC):
         Follow a URL by creating an HTTP Request.
 
         If the URL is not absolute then it is joined with the previous Response URL.
-        The previous Response history is copied to the Request.
+        The previous Response history is shared with the Request.
 
         Before a Request is followed, first check that the Request URL has not already been seen,
         that the max URL depth has not been reached, and that the URI scheme is allowed.
@@ -361,34 +467,25 @@ class Crawler(ABC):
         :param cb_kwargs: Optional Dictionary of keyword arguments to be passed to the callback function.
         :return: Request
         """
-        original_url = copy.copy(url)
-        if isinstance(url, str):
-            url = parse_href_to_url(url)
+        cache_key = (response.origin if response else None, url, method)
+        resolved = self._url_cache.get(cache_key)
+        if resolved is None:
+            resolved = self._resolve_url(url, response, method)
+            self._url_cache.set(cache_key, resolved)
 
+        url, fingerprint = resolved
         if not url:
             return
 
-        history = []
+        history = None
         if response:
-            # Join the URL to the Response URL if it doesn't contain a domain.
-            if not url.is_absolute() or not url.scheme:
-                url = coerce_url(
-                    response.origin.join(url), default_scheme=response.scheme
-                )
-
             # Restrict the depth of the Request chain to the maximum depth.
             # This test happens before the URL duplicate check so that the URL might still be reachable by another path.
-            if self.max_depth and len(response.history) >= self.max_depth:
+            if response.is_max_depth_reached(self.max_depth):
                 return
 
-            # Copy the Response history so that it isn't a reference to a mutable object.
-            history = copy.deepcopy(response.history)
-        else:
-            if not url.is_absolute():
-                return
-
-            if not url.scheme:
-                url = coerce_url(url)
+            # The Response history is immutable, so it is shared with the Request rather than copied.
+            history = response.history
 
         # The URL scheme must be in the list of allowed schemes.
         if self.allowed_schemes and url.scheme not in self.allowed_schemes:
@@ -398,10 +495,18 @@ class Crawler(ABC):
         if not allow_domain and not self.is_allowed_domain(url):
             return
 
+        # The URL is an alias of a URL that has already been parsed.
+        if fingerprint in self._alias_fingerprints:
+            return
+
         # Check if URL is not already seen, and add it to the duplicate filter seen list.
-        if await self._duplicate_filter.url_seen(url, method):
+        if await self._duplicate_filter.fingerprint_seen(fingerprint, url):
             return
 
+        # Parse the Response body while it downloads, unless the caller has provided its own chunk callback.
+        if self.incremental_parse and "chunk_callback" not in kwargs:
+            kwargs["chunk_callback"] = self._handle_chunk
+
         request = Request(
             url=url,
             request_session=self._session,
@@ -409,6 +514,8 @@ class Crawler(ABC):
             callback=callback,
             xml_parser=self.parse_xml,
             max_content_length=max_content_length or self.max_content_length,
+            truncate_content_types=self.truncate_content_types,
+            truncate_content_length=self.truncate_content_length,
             timeout=timeout or self.request_timeout,
             method=method,
             delay=delay if isinstance(delay, float) else self.delay,
@@ -417,12 +524,100 @@ class Crawler(ABC):
             **kwargs,
         )
 
+        request.fingerprint = fingerprint
+
         # Override the Request priority only if the kwarg is provided.
         if priority:
             request.priority = priority
 
         return request
 
+    async def register_aliases(
+        self,
+        urls: Iterable[Union[str, URL]],
+        variants: Iterable[Union[str, URL]] = (),
+        method: str = "GET",
+    ) -> None:
+        """
+        Register URLs that are known to be aliases of a URL that has already been parsed.
+
+        Aliases that haven't been seen are added to the duplicate filter, so they will never be followed,
+        and Requests to aliases that are already queued are dropped before they are fetched.
+        Variants are URLs that are only likely to be aliases, such as the URL with a trailing slash.
+        They are not added to the duplicate filter, but are never followed and queued Requests to them are dropped.
+
+        :param urls: Alias URLs
+        :param variants: Likely alias URLs
+        :param method: HTTP method of Requests to the aliases
+        """
+        for url in urls:
+            url, fingerprint = self._resolve_url(url, None, method)
+            if url and await self._duplicate_filter.fingerprint_seen(fingerprint, url):
+                self._alias_fingerprints.add(fingerprint)
+
+        for url in variants:
+            url, fingerprint = self._resolve_url(url, None, method)
+            if url:
+                self._alias_fingerprints.add(fingerprint)
+
+    def _resolve_url(
+        self, url: Union[str, URL], response: Optional[Response], method: str
+    ) -> Tuple[Optional[URL], str]:
+        """
+        Resolve a URL or href string to an absolute URL, and create its duplicate filter fingerprint.
+
+        :param url: URL or href string to resolve.
+        :param response: Previous Response that contained the URL.
+        :param method: HTTP method for Request.
+        :return: Tuple of the resolved URL and its fingerprint, or (None, "") if the URL is invalid.
+        """
+        if isinstance(url, str):
+            url = parse_href_to_url(url)
+
+        if not url:
+            return None, ""
+
+        if response:
+            # Join the URL to the Response URL if it doesn't contain a domain.
+            if not url.is_absolute() or not url.scheme:
+                url = coerce_url(
+                    response.origin.join(url), default_scheme=response.scheme
+                )
+        else:
+            if not url.is_absolute():
+                return None, ""
+
+            if not url.scheme:
+                url = coerce_url(url)
+
+        return url, self._duplicate_filter.url_fingerprint(url, method)
+
+    async def _handle_chunk(
+        self, request: Request, response: Response, chunk: bytes
+    ) -> None:
+        """
+        Parse a chunk of a Response body while the Response is downloading, and process the results in this worker.
+
+        :param request: HTTP Request that is being fetched.
+        :param response: Response containing only the HTTP headers.
+        :param chunk: Chunk of the Response body. An empty chunk means the download has ended.
+        """
+        result = self.parse_chunk(request, response, chunk)
+        if result:
+            await self._process_request_callback_result(result, 0)
+
+    def parse_chunk(self, request: Request, response: Response, chunk: bytes) -> Any:
+        """
+        Parse a chunk of a Response body as it is downloaded, when incremental_parse is enabled.
+        May return an AsyncGenerator, Coroutine, Request, list of Requests, or Item, or None to do nothing.
+        The full Response is still passed to the Request callback when the download ends.
+
+        :param request: HTTP Request that is being fetched.
+        :param response: Response containing only the HTTP headers.
+        :param chunk: Chunk of the Response body. An empty chunk means the download has ended.
+        """
+        return None
+
     @abstractmethod
     async def process_item(self, item: Item) -> None:
         """
@@ -445,7 +640,7 @@ class Crawler(ABC):
     @abstractmethod
     async def parse(self, request: Request, response: Response) -> AsyncGeneratorType:
         """
-        Parse an HTTP Response. Must yield Items, Requests, AsyncGenerators, or Coroutines.
+        Parse an HTTP Response. Must yield Items, Requests, lists of Requests, AsyncGenerators, or Coroutines.
 
         :param request: HTTP Request that created the Response.
         :param response: HTTP Response.
@@ -591,6 +786,29 @@ class Crawler(ABC):
             sum(self._stats_request_latencies)
         )
 
+        if self._stats_queue_ops_saved:
+            self.stats[Stats.QUEUE_OPS_SAVED] = sum(self._stats_queue_ops_saved)
+            self.stats[Stats.QUEUE_OPS_SAVED_MAX] = max(self._stats_queue_ops_saved)
+            self.stats[Stats.QUEUE_OPS_SAVED_AVG] = int(
+                harmonic_mean(self._stats_queue_ops_saved)
+            )
+
+        if self._stats_links_dropped:
+            self.stats[Stats.LINKS_DROPPED_PER_PAGE_MAX] = max(
+                self._stats_links_dropped
+            )
+            self.stats[Stats.LINKS_DROPPED_PER_PAGE_AVG] = int(
+                mean(self._stats_links_dropped)
+            )
+
+        feed_cache_lookups = (
+            self.stats[Stats.FEED_CACHE_HITS] + self.stats[Stats.FEED_CACHE_MISSES]
+        )
+        if feed_cache_lookups:
+            self.stats[Stats.FEED_CACHE_HIT_RATE] = round(
+                self.stats[Stats.FEED_CACHE_HITS] / feed_cache_lookups, 3
+            )
+
     def get_stats(self) -> dict:
         """
         Return crawl statistics as a sorted dictionary.
@@ -12,7 +12,7 @@ class DuplicateFilter:
     """
 
     def __init__(self):
-        # Dictionary whose keys are the hashed fingerprints of the URLs
+        # Dictionary whose keys are the hashed fingerprints of the URLs, and values are the parsed URL strings.
         self.fingerprints = dict()
         # Locks the fingerprints dict when accessing keys.
         self._seen_lock = asyncio.Lock()
@@ -25,14 +25,35 @@ class DuplicateFilter:
         :param method: Optional HTTP method to use for hashing
         :return: True if URL already seen
         """
+        return await self.fingerprint_seen(self.url_fingerprint(url, method), url)
+
+    async def fingerprint_seen(self, fingerprint: str, url: URL) -> bool:
+        """
+        Checks if a URL fingerprint has already been seen, and adds the fingerprint if not.
+
+        :param fingerprint: URL fingerprint hash, as created by url_fingerprint
+        :param url: URL object
+        :return: True if URL already seen
+        """
+        if fingerprint in self.fingerprints:
+            return True
         url_str: str = self.parse_url(url)
-        fp = self.url_fingerprint_hash(url_str, method)
         async with self._seen_lock:
-            if fp in self.fingerprints:
+            if fingerprint in self.fingerprints:
                 return True
-            self.fingerprints[fp] = url_str
+            self.fingerprints[fingerprint] = url_str
             return False
 
+    def url_fingerprint(self, url: URL, method: str = "") -> str:
+        """
+        Create the fingerprint hash used to check if the URL has already been seen.
+
+        :param url: URL object
+        :param method: Optional HTTP method to use for hashing
+        :return: Hashed string
+        """
+        return self.url_fingerprint_hash(self.parse_url(url), method)
+
     def parse_url(self, url: URL) -> str:
         """
         Parse the URL object to a string. Used for functionality such as filtering query strings.
@@ -1,17 +1,105 @@
-from asyncio import PriorityQueue
-from dataclasses import dataclass
+import heapq
+from asyncio import Queue
+from collections import OrderedDict, deque
 from enum import Enum
-from typing import Any, Union, Dict
+from typing import Any, Union, Dict, Iterator, Optional, List
 
 from yarl import URL
 
 from feedsearch_crawler.crawler.queueable import Queueable
 
 
+class PriorityBuckets:
+    """
+    Priority ordered container with a FIFO bucket for each priority value.
+
+    Queueable priorities are a small set of integers, so adding and removing an item is O(1) for each item,
+    and items with the same priority are returned in the order they were added.
+    Implements the deque methods used by asyncio.Queue.
+    """
+
+    __slots__ = ("_buckets", "_priorities", "_size")
+
+    def __init__(self):
+        # Dictionary of priority values to a deque of items with that priority.
+        self._buckets: Dict[int, deque] = {}
+        # Min-heap of the priority values that currently have items.
+        self._priorities: List[int] = []
+        self._size: int = 0
+
+    def append(self, item: Queueable) -> None:
+        """
+        Add an item to the end of the bucket for its priority.
+
+        :param item: Queueable object
+        """
+        priority = item.priority
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = deque()
+            heapq.heappush(self._priorities, priority)
+        bucket.append(item)
+        self._size += 1
+
+    def popleft(self) -> Queueable:
+        """
+        Remove and return the oldest item with the highest priority (lowest priority number).
+
+        :return: Queueable object
+        """
+        if not self._priorities:
+            raise IndexError("pop from an empty PriorityBuckets")
+        priority = self._priorities[0]
+        bucket = self._buckets[priority]
+        item = bucket.popleft()
+        if not bucket:
+            heapq.heappop(self._priorities)
+            del self._buckets[priority]
+        self._size -= 1
+        return item
+
+    def clear(self) -> None:
+        """
+        Remove all items.
+        """
+        self._buckets.clear()
+        self._priorities.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Queueable]:
+        for priority in sorted(self._priorities):
+            yield from self._buckets[priority]
+
+
 # noinspection PyUnresolvedReferences
-class CrawlerPriorityQueue(PriorityQueue):
+class CrawlerPriorityQueue(Queue):
+    """
+    Queue that returns the Queueable with the highest priority first, and is FIFO within each priority.
+    """
+
     _unfinished_tasks: int
 
+    def _init(self, maxsize: int) -> None:
+        self._queue = PriorityBuckets()
+
+    def put_many_nowait(self, items: List[Queueable]) -> None:
+        """
+        Put multiple items onto the Queue in one operation, waking a waiting getter for each item.
+        The Queue is unbounded, so this never blocks.
+
+        :param items: List of Queueable objects
+        """
+        if not items:
+            return
+        for item in items:
+            self._put(item)
+            self._wakeup_next(self._getters)
+        self._unfinished_tasks += len(items)
+        self._finished.clear()
+
     def clear(self):
         """
         Clear the Queue of any unfinished tasks.
@@ -21,20 +109,142 @@ class CrawlerPriorityQueue(PriorityQueue):
         self._finished.set()
 
 
-@dataclass
 class CallbackResult(Queueable):
-    """Dataclass for holding callback results and recording recursion"""
+    """Holds callback results and records recursion"""
+
+    __slots__ = ("result", "callback_recursion")
 
-    result: Any
-    callback_recursion: int
     # CallbackResult priority is high so that we clear Callbacks off the queue and process them as fast as possible.
     # Otherwise the workers always process Requests and don't often process the Request results.
-    priority = 1
+    default_priority = 1
+
+    def __init__(self, result: Any, callback_recursion: int):
+        super().__init__()
+        self.result = result
+        self.callback_recursion = callback_recursion
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.result.__class__.__name__})"
 
 
+class URLHistory:
+    """
+    Immutable chain of the URLs that led to a Request or Response.
+
+    Each node holds a URL and a pointer to the previous node, so that new Requests can share the history of
+    the Response they were followed from instead of copying it.
+    """
+
+    __slots__ = ("url", "parent", "depth", "root")
+
+    def __init__(self, url: URL, parent: "URLHistory" = None):
+        """
+        :param url: URL at this point in the history
+        :param parent: Previous node in the history
+        """
+        self.url: URL = url
+        self.parent: Optional[URLHistory] = parent
+        # Number of URLs in the history up to and including this node.
+        self.depth: int = parent.depth + 1 if parent else 1
+        # The first URL in the history.
+        self.root: URL = parent.root if parent else url
+
+    def append(self, url: URL) -> "URLHistory":
+        """
+        Create a new history node that extends this history. This history is not modified.
+
+        :param url: URL to add to the history
+        :return: URLHistory
+        """
+        return URLHistory(url, self)
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def __iter__(self) -> Iterator[URL]:
+        urls = []
+        node = self
+        while node is not None:
+            urls.append(node.url)
+            node = node.parent
+        return reversed(urls)
+
+    def __getitem__(self, index: int) -> URL:
+        if not isinstance(index, int):
+            raise TypeError("URLHistory indices must be integers")
+        if index < 0:
+            index += self.depth
+        if index < 0 or index >= self.depth:
+            raise IndexError("URLHistory index out of range")
+        if index == 0:
+            return self.root
+        node = self
+        for _ in range(self.depth - 1 - index):
+            node = node.parent
+        return node.url
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({[str(url) for url in self]})"
+
+
+class LRUCache:
+    """
+    Bounded Least Recently Used cache. Used to memoize values for the duration of a crawl.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        """
+        :param maxsize: Maximum number of values held before the least recently used value is evicted.
+        """
+        self.maxsize = maxsize
+        self._cache: OrderedDict = OrderedDict()
+        # Number of lookups that found a cached value.
+        self.hits: int = 0
+        # Number of lookups that did not find a cached value.
+        self.misses: int = 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as most recently used.
+
+        :param key: Hashable cache key
+        :param default: Value to return if the key is not cached
+        :return: Cached value or default
+        """
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used value if the cache is full.
+
+        :param key: Hashable cache key
+        :param value: Value to cache
+        """
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all cached values.
+        """
+        self._cache.clear()
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
 class Stats(Enum):
     # Number of Requests added to the queue.
     REQUESTS_QUEUED = "requests_queued"
@@ -98,6 +308,34 @@ class Stats(Enum):
     QUEUED_TOTAL = "queued_total"
     # Total number of retried Requests
     REQUESTS_RETRIED = "requests_retried"
+    # Number of Requests added to the queue in batches.
+    REQUESTS_BATCHED = "requests_batched"
+    # Total queue operations saved by adding Requests to the queue in batches.
+    QUEUE_OPS_SAVED = "queue_ops_saved"
+    # Highest number of queue operations saved by a single batch.
+    QUEUE_OPS_SAVED_MAX = "queue_ops_saved_max"
+    # Harmonic mean of queue operations saved by each batch.
+    QUEUE_OPS_SAVED_AVG = "queue_ops_saved_avg"
+    # Number of duplicate links on the same page that were dropped before URL parsing.
+    LINKS_DUPLICATE = "links_duplicate"
+    # Number of links dropped by the string pre-screen before URL parsing.
+    LINKS_PRESCREENED = "links_prescreened"
+    # Highest number of links dropped before URL parsing from a single page.
+    LINKS_DROPPED_PER_PAGE_MAX = "links_dropped_per_page_max"
+    # Mean number of links dropped before URL parsing from each page.
+    LINKS_DROPPED_PER_PAGE_AVG = "links_dropped_per_page_avg"
+    # Number of Responses that were truncated at the maximum content length.
+    RESPONSES_TRUNCATED = "responses_truncated"
+    # Number of pages with more links than the maximum number of links checked per page.
+    LINK_LISTS_TRUNCATED = "link_lists_truncated"
+    # Number of feeds whose parse result was found in the feed cache.
+    FEED_CACHE_HITS = "feed_cache_hits"
+    # Number of feeds that were parsed because their content was not in the feed cache.
+    FEED_CACHE_MISSES = "feed_cache_misses"
+    # Fraction of parsed feeds whose parse result was found in the feed cache.
+    FEED_CACHE_HIT_RATE = "feed_cache_hit_rate"
+    # Number of queued Requests dropped because their URL is an alias of an already parsed URL.
+    ALIAS_REQUESTS_DROPPED = "alias_requests_dropped"
 
     def __repr__(self):
         return self.value
@@ -4,11 +4,33 @@ from typing import Union
 import time
 
 
+class QueuePriority:
+    """
+    Descriptor for the queue priority of a Queueable.
+    Reads the class default priority when accessed on the class, and the instance priority otherwise.
+    """
+
+    def __get__(self, instance, owner) -> int:
+        if instance is None:
+            return owner.default_priority
+        return instance._priority
+
+    def __set__(self, instance, value: int) -> None:
+        instance._priority = value
+
+
 class Queueable:
-    queue_put_time = None
-    queue_get_time = None
+    __slots__ = ("queue_put_time", "queue_get_time", "_priority")
+
     # Default lowest queue priority is 100 (higher number means lower priority)
-    priority = 100
+    default_priority = 100
+    # Priority may be overridden per instance.
+    priority = QueuePriority()
+
+    def __init__(self):
+        self.queue_put_time = None
+        self.queue_get_time = None
+        self._priority = self.default_priority
 
     def get_queue_wait_time(self) -> Union[float, None]:
         """
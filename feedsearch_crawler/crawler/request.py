@@ -1,21 +1,55 @@
 import asyncio
 import copy
-import json
+import logging
 import uuid
 from asyncio import Semaphore, IncompleteReadError, LimitOverrunError, CancelledError
 from random import random
-from typing import List, Tuple, Any, Union, Optional, Dict
+from typing import Tuple, Any, Union, Optional, Dict, Iterable
 
 import aiohttp
 import time
 from aiohttp import ClientSession, ClientTimeout, hdrs
 from yarl import URL
 
+from feedsearch_crawler.crawler.lib import URLHistory
 from feedsearch_crawler.crawler.queueable import Queueable
 from feedsearch_crawler.crawler.response import Response
 
+logger = logging.getLogger(__name__)
+
 
 class Request(Queueable):
+    __slots__ = (
+        "url",
+        "method",
+        "request_session",
+        "headers",
+        "timeout",
+        "history",
+        "encoding",
+        "_callback",
+        "_failure_callback",
+        "_chunk_callback",
+        "_chunk_callback_stopped",
+        "_id",
+        "_xml_parser",
+        "max_content_length",
+        "truncate_content_types",
+        "truncate_content_length",
+        "json_data",
+        "data",
+        "params",
+        "has_run",
+        "delay",
+        "cb_kwargs",
+        "should_retry",
+        "_max_retries",
+        "_num_retries",
+        "req_latency",
+        "content_read",
+        "fingerprint",
+    )
+
     METHOD = ["GET", "POST"]
 
     def __init__(
@@ -29,11 +63,14 @@ class Request(Queueable):
         method: str = "GET",
         headers: Dict = None,
         timeout: Union[float, ClientTimeout] = 5.0,
-        history: List = None,
+        history: URLHistory = None,
         callback=None,
         xml_parser=None,
         failure_callback=None,
+        chunk_callback=None,
         max_content_length: int = 1024 * 1024 * 10,
+        truncate_content_types: Iterable[str] = None,
+        truncate_content_length: int = None,
         delay: float = 0,
         retries: int = 3,
         cb_kwargs: Dict = None,
@@ -52,16 +89,24 @@ class Request(Queueable):
         :param method: HTTP method
         :param headers: HTTP headers for the request
         :param timeout: Seconds before Request times out
-        :param history: Response history, list of previous URLs
+        :param history: Response history, chain of previous URLs
         :param callback: Callback function to run after request is successful
         :param xml_parser: Function to parse Response XML
         :param failure_callback: Callback function to run if request is unsuccessful
+        :param chunk_callback: Optional coroutine function that is awaited with each chunk of the Response body
+            as it is downloaded, and with an empty chunk when the download ends, unless stop_chunk_callback
+            has been called.
         :param max_content_length: Maximum allowed size in bytes of Response content
+        :param truncate_content_types: Content types that are truncated to truncate_content_length and parsed,
+            instead of failing if the Response content is too large
+        :param truncate_content_length: Maximum size in bytes of Response content of the truncate_content_types.
+            Defaults to max_content_length, and is never larger than max_content_length.
         :param delay: Time in seconds to delay Request
         :param retries: Number of times to retry a failed Request
         :param cb_kwargs: Optional Dictionary of keyword arguments to be passed to the callback function.
         :param kwargs: Optional keyword arguments
         """
+        super().__init__()
         self.url = url
         self.method = method.upper()
         if self.method not in self.METHOD:
@@ -73,13 +118,19 @@ class Request(Queueable):
         if not isinstance(timeout, ClientTimeout):
             timeout = aiohttp.ClientTimeout(total=timeout)
         self.timeout = timeout
-        self.history = history or []
+        self.history: Optional[URLHistory] = history
         self.encoding = encoding
         self._callback = callback
         self._failure_callback = failure_callback
-        self.id = uuid.uuid4()
+        self._chunk_callback = chunk_callback
+        # True once the chunk callback has been stopped for the current fetch.
+        self._chunk_callback_stopped: bool = False
+        # Unique id, only created when requested.
+        self._id: Optional[uuid.UUID] = None
         self._xml_parser = xml_parser
         self.max_content_length = max_content_length
+        self.truncate_content_types = truncate_content_types or ()
+        self.truncate_content_length = truncate_content_length
         self.json_data = json_data
         self.data = data
         self.params = params
@@ -95,11 +146,31 @@ class Request(Queueable):
         self.req_latency: int = 0
         # Time in Milliseconds for the HTTP response content to be read.
         self.content_read: int = 0
+        # Duplicate filter fingerprint of the Request URL, if the Request was created by the Crawler.
+        self.fingerprint: str = ""
 
-        for key, value in kwargs:
+        for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
 
+    @property
+    def id(self) -> uuid.UUID:
+        if self._id is None:
+            self._id = uuid.uuid4()
+        return self._id
+
+    def stop_chunk_callback(self) -> None:
+        """
+        Stop passing chunks of the Response body to the chunk callback, including the empty chunk
+        at the end of the download. Only applies to the current fetch, so a retried Request
+        passes chunks to the chunk callback again.
+        """
+        self._chunk_callback_stopped = True
+
+    @property
+    def chunk_callback_active(self) -> bool:
+        return self._chunk_callback is not None and not self._chunk_callback_stopped
+
     async def fetch_callback(self, semaphore: Semaphore = None) -> Tuple[Any, Response]:
         """
         Fetch HTTP Response and run Callbacks.
@@ -136,11 +207,13 @@ class Request(Queueable):
         # Delay the request if self.delay is > 0
         await self.delay_request()
 
-        # Copy the Request history so that it isn't a pointer.
-        history = copy.deepcopy(self.history)
+        # The history is immutable, so the Response history extends the Request history without copying it.
+        history = self.history
 
         # Make sure that retry is reset.
         self.should_retry = False
+        # Each fetch of the Request parses the Response body from the start.
+        self._chunk_callback_stopped = False
         response = None
         start = time.perf_counter()
 
@@ -148,34 +221,42 @@ class Request(Queueable):
             async with self._create_request() as resp:
                 resp_recieved = time.perf_counter()
                 self.req_latency = int((resp_recieved - start) * 1000)
-                history.append(resp.url)
+                history = URLHistory(resp.url, self.history)
+
+                # Content that is too large is truncated if the content type allows it, otherwise it fails.
+                truncate: bool = resp.content_type in self.truncate_content_types
 
                 # Fail the response if the content length header is too large.
                 content_length: int = int(resp.headers.get(hdrs.CONTENT_LENGTH, "0"))
-                if content_length > self.max_content_length:
-                    return self._failed_response(413)
+                if content_length > self.max_content_length and not truncate:
+                    return self._failed_response(413, history)
+
+                # Create a Response with only the headers, so that chunks of the body can be parsed as they arrive.
+                partial_response = None
+                if self.chunk_callback_active and 200 <= resp.status < 300:
+                    partial_response = Response(
+                        url=resp.url,
+                        method=resp.method,
+                        encoding=self.encoding or resp.charset,
+                        status_code=resp.status,
+                        history=history,
+                        headers=resp.headers,
+                        meta=copy.copy(self.cb_kwargs),
+                    )
 
                 # Read the response content, and fail the response if the actual content size is too large.
-                content_read, actual_content_length = await self._read_response(resp)
+                (
+                    content_read,
+                    actual_content_length,
+                    truncated,
+                ) = await self._read_response(resp, partial_response, truncate)
                 if not content_read:
-                    return self._failed_response(413)
+                    return self._failed_response(413, history)
 
                 # Set encoding automatically from response if not specified.
                 if not self.encoding:
                     self.encoding = resp.get_encoding()
 
-                # Read response content
-                try:
-                    # Read response content as text
-                    resp_text = await resp.text(encoding=self.encoding)
-
-                    # Attempt to read response content as JSON
-                    resp_json = await self._read_json(resp_text)
-                # If response content can't be decoded then neither text or JSON can be set.
-                except UnicodeDecodeError:
-                    resp_text = None
-                    resp_json = None
-
                 # Close the asyncio response
                 if not resp.closed:
                     resp.close()
@@ -188,15 +269,14 @@ class Request(Queueable):
                     encoding=self.encoding,
                     status_code=resp.status,
                     history=history,
-                    text=resp_text,
                     data=resp._body,
-                    json=resp_json,
                     headers=resp.headers,
                     xml_parser=self._parse_xml,
                     cookies=resp.cookies,
                     redirect_history=resp.history,
                     content_length=actual_content_length,
                     meta=copy.copy(self.cb_kwargs),
+                    truncated=truncated,
                 )
 
                 # Raise exception after the Response object is created, because we only catch TimeoutErrors and
@@ -204,7 +284,7 @@ class Request(Queueable):
                 resp.raise_for_status()
 
         except asyncio.TimeoutError:
-            history.append(self.url)
+            history = URLHistory(self.url, history)
             response = self._failed_response(408, history)
         except aiohttp.ClientResponseError as e:
             if not response:
@@ -248,56 +328,74 @@ class Request(Queueable):
                 "HTTP method %s is not valid. Must be GET or POST", self.method
             )
 
-    async def _read_response(self, resp) -> Tuple[bool, int]:
+    async def _read_response(
+        self, resp, partial_response: Optional[Response] = None, truncate: bool = False
+    ) -> Tuple[bool, int, bool]:
         """
         Read HTTP Response content as bytes.
 
+        If a partial Response is provided then each chunk is passed to the chunk callback as it is read.
+
         :param resp: asyncio HTTP Response
-        :return: Tuple (read status, content length in bytes)
+        :param partial_response: Response with headers only, passed to the chunk callback
+        :param truncate: Stop reading at truncate_content_length instead of failing if the content is too large
+        :return: Tuple (read status, content length in bytes, whether the content was truncated)
         """
-        body: bytes = b""
+        max_length = self.max_content_length
+        if truncate and self.truncate_content_length:
+            max_length = min(max_length, self.truncate_content_length)
+
+        chunks = []
+        length = 0
+        truncated = False
         try:
             async for chunk in resp.content.iter_chunked(1024):
                 if not chunk:
                     break
-                body += chunk
-                if len(body) > self.max_content_length:
-                    return False, 0
+                if length + len(chunk) > max_length:
+                    if not truncate:
+                        return False, 0, False
+                    chunk = chunk[: max_length - length]
+                    truncated = True
+                chunks.append(chunk)
+                length += len(chunk)
+                if partial_response and self.chunk_callback_active and chunk:
+                    await self._run_chunk_callback(partial_response, chunk)
+                if truncated:
+                    break
         except (IncompleteReadError, LimitOverrunError) as e:
-            return False, 0
-        resp._body = body
-        return True, len(body)
-
-    @staticmethod
-    async def _read_json(resp_text: Union[str, None]) -> Optional[dict]:
+            return False, 0, False
+        finally:
+            # An empty chunk tells the chunk callback that the download has ended.
+            if partial_response and self.chunk_callback_active:
+                await self._run_chunk_callback(partial_response, b"")
+        resp._body = b"".join(chunks)
+        return True, length, truncated
+
+    async def _run_chunk_callback(
+        self, partial_response: Response, chunk: bytes
+    ) -> None:
         """
-        Attempt to read Response content as JSON.
+        Run the chunk callback. Errors in the chunk callback must not fail the Request.
 
-        :param resp_text: HTTP response context as text string
-        :return: JSON dict or None
+        :param partial_response: Response with headers only
+        :param chunk: Chunk of the Response body as bytes
         """
-
-        # If the text hasn't been parsed then we won't be able to parse JSON either.
-        if not resp_text:
-            return None
-
-        stripped = resp_text.strip()  # type: ignore
-        if not stripped:
-            return None
-
         try:
-            return json.loads(stripped)
-        except ValueError:
-            return None
+            await self._chunk_callback(
+                request=self, response=partial_response, chunk=chunk
+            )
+        except Exception as e:
+            logger.exception("Chunk callback failed for %s: %s", self.url, e)
 
     def _failed_response(
-        self, status: int, history: List[URL] = None, headers=None
+        self, status: int, history: URLHistory = None, headers=None
     ) -> Response:
         """
         Create a failed Response object with the provided Status Code.
 
         :param status: HTTP Status Code
-        :param history: Response History as list of URLs
+        :param history: Response History as chain of URLs
         :param headers: Response Headers
         :return: Failed Response object
         """
@@ -305,7 +403,7 @@ class Request(Queueable):
             url=self.url,
             method=self.method,
             encoding=self.encoding,
-            history=history or [],
+            history=history,
             status_code=status,
             headers=headers or {},
         )
@@ -1,23 +1,48 @@
+import codecs
+import json
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 
 from yarl import URL
 
-from feedsearch_crawler.crawler.lib import is_same_domain
+from feedsearch_crawler.crawler.lib import is_same_domain, URLHistory
+
+
+# Marks a lazily created value that has not been created yet.
+_UNSET = object()
 
 
 class Response:
-    _xml = None
+    __slots__ = (
+        "url",
+        "encoding",
+        "method",
+        "_text",
+        "_json",
+        "data",
+        "history",
+        "headers",
+        "status_code",
+        "cookies",
+        "_id",
+        "_xml",
+        "_xml_parser",
+        "redirect_history",
+        "content_length",
+        "meta",
+        "_origin",
+        "truncated",
+    )
 
     def __init__(
         self,
         url: URL,
         method: str,
         encoding: str = "",
-        text: str = "",
+        text: str = None,
         json: Dict = None,
         data: bytes = b"",
-        history: List[URL] = None,
+        history: URLHistory = None,
         headers=None,
         status_code: int = -1,
         cookies=None,
@@ -25,23 +50,108 @@ class Response:
         redirect_history=None,
         content_length: int = 0,
         meta: Dict = None,
+        truncated: bool = False,
     ):
         self.url = url
         self.encoding = encoding
         self.method = method
-        self.text = text
-        self.json = json
+        # Text and JSON are decoded from the content when first requested, so that content which is never
+        # read as text, such as feeds and images, is never decoded.
+        self._text: Any = text if text is not None else _UNSET
+        self._json: Any = json if json is not None else _UNSET
         self.data = data
-        self.history = history or []
+        self.history: Optional[URLHistory] = history
         self.headers = headers or {}
         self.status_code = status_code
         self.cookies = cookies
-        self.id = uuid.uuid4()
+        # Unique id, only created when requested.
+        self._id: Optional[uuid.UUID] = None
+        self._xml = None
         self._xml_parser = xml_parser
         self.redirect_history = redirect_history
         self.content_length = content_length
         self.meta = meta
-        self.origin: URL = url.origin()
+        # Origin URL, only created when requested.
+        self._origin: Optional[URL] = None
+        # True if the content was cut off at the maximum content length.
+        self.truncated: bool = truncated
+
+    @property
+    def id(self) -> uuid.UUID:
+        if self._id is None:
+            self._id = uuid.uuid4()
+        return self._id
+
+    @property
+    def origin(self) -> URL:
+        if self._origin is None:
+            self._origin = self.url.origin()
+        return self._origin
+
+    @property
+    def text(self) -> Optional[str]:
+        """
+        Response content decoded as text, or None if the content can't be decoded.
+        """
+        if self._text is _UNSET:
+            self._text = self._decode_text()
+        return self._text
+
+    @text.setter
+    def text(self, value: Optional[str]) -> None:
+        self._text = value
+
+    @property
+    def json(self) -> Optional[Dict]:
+        """
+        Response content parsed as JSON, or None if the content is not JSON.
+        """
+        if self._json is _UNSET:
+            self._json = self._read_json(self.text)
+        return self._json
+
+    @json.setter
+    def json(self, value: Optional[Dict]) -> None:
+        self._json = value
+
+    def _decode_text(self) -> Optional[str]:
+        """
+        Decode the Response content with the Response encoding.
+
+        :return: Text string, or None if the content can't be decoded
+        """
+        if not self.data:
+            return ""
+        try:
+            if self.truncated:
+                # A truncated body may end partway through a multi-byte character. The incremental decoder
+                # holds back only that incomplete character, so any other invalid bytes still fail.
+                decoder = codecs.getincrementaldecoder(self.encoding or "utf-8")()
+                return decoder.decode(self.data, final=False)
+            return self.data.decode(self.encoding or "utf-8")
+        except (UnicodeDecodeError, LookupError):
+            return None
+
+    @staticmethod
+    def _read_json(text: Optional[str]) -> Optional[Dict]:
+        """
+        Attempt to read Response text as JSON.
+
+        :param text: Response content as text string
+        :return: JSON dict or None
+        """
+        # If the text hasn't been decoded then we won't be able to parse JSON either.
+        if not text:
+            return None
+
+        stripped = text.strip()
+        if not stripped:
+            return None
+
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            return None
 
     @property
     def ok(self) -> bool:
@@ -59,13 +169,13 @@ class Response:
     def previous_domain(self) -> str:
         if not self.history:
             return ""
-        return self.history[-1].host
+        return self.history.url.host
 
     @property
     def originator_url(self) -> Optional[URL]:
-        if not self.history or len(self.history) == 1:
+        if not self.history or not self.history.parent:
             return None
-        return self.history[-2]
+        return self.history.parent.url
 
     @property
     async def xml(self) -> Any:
@@ -75,9 +185,6 @@ class Response:
         if not self._xml_parser:
             return None
 
-        if not self.text and self.data and self.encoding:
-            self.text = self.data.decode(self.encoding)
-
         self._xml = await self._xml_parser(self.text)
         return self._xml
 
@@ -88,7 +195,7 @@ class Response:
         :param max_depth: Max length of response history
         :return: boolean
         """
-        if max_depth and len(self.history) >= max_depth:
+        if max_depth and self.history and self.history.depth >= max_depth:
             return True
         return False
 
@@ -99,10 +206,10 @@ class Response:
         :return: boolean
         """
         # This is the first Response in the chain
-        if len(self.history) < 2:
+        if not self.history or self.history.depth < 2:
             return True
         # URL is same domain or sub-domain
-        if is_same_domain(self.history[0].host, self.url.host):
+        if is_same_domain(self.history.root.host, self.url.host):
             return True
 
         return False
@@ -8,6 +8,7 @@ from feedsearch_crawler.crawler import Item, to_string
 
 class FeedInfo(Item):
     bozo: int = 0
+    confidence: float = 1.0
     content_length: int = 0
     content_type: str = ""
     description: str = ""
@@ -32,6 +33,7 @@ class FeedInfo(Item):
 
         return dict(
             bozo=self.bozo,
+            confidence=self.confidence,
             description=self.description,
             content_length=self.content_length,
             content_type=self.content_type,
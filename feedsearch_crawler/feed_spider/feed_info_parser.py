@@ -1,7 +1,10 @@
+import copy
+import hashlib
+import html
 from datetime import datetime, date
-from statistics import mean
+from itertools import islice
 from types import AsyncGeneratorType
-from typing import Tuple, List, Union, Dict
+from typing import Tuple, List, Union, Dict, Iterable, Optional
 
 import feedparser
 import time
@@ -10,18 +13,56 @@ from bs4 import BeautifulSoup
 from yarl import URL
 
 from feedsearch_crawler.crawler import ItemParser, Request, Response, to_string
-from feedsearch_crawler.crawler.lib import headers_to_dict, remove_www
+from feedsearch_crawler.crawler.lib import headers_to_dict, remove_www, Stats
 from feedsearch_crawler.feed_spider.favicon import Favicon
 from feedsearch_crawler.feed_spider.feed_info import FeedInfo
+from feedsearch_crawler.feed_spider.feed_xml_parser import parse_feed_xml
+from feedsearch_crawler.feed_spider.link_filter import LinkFilter
 from feedsearch_crawler.feed_spider.lib import (
     parse_header_links,
     datestring_to_utc_datetime,
     create_content_type,
     ParseTypes,
+    DateWindow,
+)
+from feedsearch_crawler.feed_spider.regexes import (
+    markup_tag_regex,
+    special_text_tag_regex,
 )
 
 
 class FeedInfoParser(ItemParser):
+    # Number of the most recent distinct entry dates used to calculate feed velocity.
+    date_window_size: int = 100
+    # Max number of entries to parse dates from, as entries are usually newest first. 0 parses all entries.
+    date_parse_limit: int = 0
+    # Fields of a FeedInfo that are parsed from the feed content and headers, and are cached by content hash.
+    # The URL, content length, and score of each feed are always set from its own Response.
+    content_fields: List[str] = [
+        "bozo",
+        "description",
+        "favicon",
+        "hubs",
+        "is_podcast",
+        "is_push",
+        "item_count",
+        "last_updated",
+        "self_url",
+        "title",
+        "velocity",
+        "version",
+    ]
+
+    # Confidence that an alternate link is a valid feed, by link type. Other feed link types use the default.
+    candidate_confidence: Dict[str, float] = {
+        "application/rss+xml": 0.9,
+        "application/atom+xml": 0.9,
+        "application/feed+json": 0.9,
+        "application/rdf+xml": 0.7,
+        "application/json": 0.4,
+    }
+    default_candidate_confidence: float = 0.5
+
     async def parse_item(
         self, request: Request, response: Response, *args, **kwargs
     ) -> AsyncGeneratorType:
@@ -39,6 +80,60 @@ class FeedInfoParser(ItemParser):
 
         item = FeedInfo(url=response.url, content_type=content_type)
 
+        if not self.parse_content(item, response, parse_type):
+            return
+
+        if item.favicon and self.crawler.favicon_data_uri:
+            favicon = Favicon(
+                url=item.favicon,
+                priority=1,
+            )
+            yield self.follow(
+                item.favicon,
+                self.crawler.parse_favicon_data_uri,
+                cb_kwargs=dict(favicon=favicon),
+            )
+
+        self.validate_self_url(item)
+
+        # Stop other URLs of the same feed from being fetched and parsed again.
+        if self.crawler.collapse_feed_aliases:
+            aliases = self.feed_aliases(item, response)
+            await self.crawler.register_aliases(
+                aliases, variants=self.trailing_slash_variants(aliases)
+            )
+
+        item.content_length = response.content_length
+        self.score_item(item, response.history[0])
+        yield item
+
+    def parse_content(
+        self, item: FeedInfo, response: Response, parse_type: ParseTypes
+    ) -> bool:
+        """
+        Parse the feed content into the FeedInfo item.
+
+        The same feed is often served at several URLs, so parse results are cached by a hash of the content,
+        along with every other value the result depends on. Only the fields in content_fields are cached.
+
+        :param item: FeedInfo object
+        :param response: Feed Response
+        :param parse_type: Type of feed content
+        :return: True if the content is a valid feed
+        """
+        cache = self.crawler.feed_cache
+        if cache is not None:
+            key = self.feed_cache_key(response, parse_type)
+            cached = cache.get(key)
+            if cached is not None:
+                self.crawler.stats[Stats.FEED_CACHE_HITS] += 1
+                if not cached:
+                    return False
+                for name, value in zip(self.content_fields, cached):
+                    setattr(item, name, copy.copy(value))
+                return True
+            self.crawler.stats[Stats.FEED_CACHE_MISSES] += 1
+
         # Check link headers first for WebSub content discovery
         # https://www.w3.org/TR/websub/#discovery
         if response.headers:
@@ -56,28 +151,65 @@ class FeedInfoParser(ItemParser):
                     response.encoding,
                     headers_to_dict(response.headers),
                 )
-
-            if not valid_feed:
-                return
         except Exception as e:
-            return
+            valid_feed = False
 
-        if item.favicon and self.crawler.favicon_data_uri:
-            favicon = Favicon(
-                url=item.favicon,
-                priority=1,
-            )
-            yield self.follow(
-                item.favicon,
-                self.crawler.parse_favicon_data_uri,
-                cb_kwargs=dict(favicon=favicon),
+        if cache is not None:
+            cache.set(
+                key,
+                tuple(
+                    copy.copy(getattr(item, name)) for name in self.content_fields
+                )
+                if valid_feed
+                else (),
             )
 
-        self.validate_self_url(item)
+        return valid_feed
 
-        item.content_length = response.content_length
+    def feed_cache_key(self, response: Response, parse_type: ParseTypes) -> tuple:
+        """
+        Create the feed cache key of a Response: a hash of the content, and every other value the parse
+        result depends on. The URL is not part of the key, so the same feed at another URL is a cache hit.
+
+        :param response: Feed Response
+        :param parse_type: Type of feed content
+        :return: Cache key tuple
+        """
+        fields = self.crawler.fields
+        # Entry dates later than the current date are ignored, so cached results expire each day.
+        return (
+            parse_type,
+            hashlib.blake2b(response.data, digest_size=16).digest(),
+            response.encoding,
+            response.headers.get(hdrs.CONTENT_TYPE, ""),
+            to_string(response.headers.get("Link", "")),
+            datetime.utcnow().date(),
+            frozenset(fields) if fields is not None else None,
+        )
+
+    def parse_candidate(
+        self, url: URL, link: Dict[str, Optional[str]], response: Response
+    ) -> FeedInfo:
+        """
+        Create an unvalidated FeedInfo from an alternate link to a possible feed, without fetching it.
+
+        :param url: Absolute URL of the link
+        :param link: Dictionary of link element attributes
+        :param response: Response of the page that contains the link
+        :return: FeedInfo with a confidence below 1
+        """
+        link_type = (link.get("type") or "").lower().strip()
+        confidence = self.candidate_confidence.get(
+            link_type, self.default_candidate_confidence
+        )
+        # JSON alternate links are often API endpoints or oEmbed data rather than JSON Feeds.
+        if "json" in link_type and not LinkFilter.is_feedlike_href(str(url)):
+            confidence = min(confidence, 0.2)
+
+        item = FeedInfo(url=url, content_type=link_type, confidence=confidence)
+        item.title = self.clean_title(link.get("title") or "")
         self.score_item(item, response.history[0])
-        yield item
+        return item
 
     def parse_xml(
         self, item: FeedInfo, data: Union[str, bytes], encoding: str, headers: Dict
@@ -121,22 +253,23 @@ class FeedInfoParser(ItemParser):
         item.version = parsed.get("version")
         item.title = self.feed_title(feed)
         item.description = self.feed_description(feed)
-        item.is_podcast = self.is_podcast(parsed)
+        if self.crawler.wants_field("is_podcast"):
+            item.is_podcast = self.is_podcast(parsed)
+
+        entries = parsed.get("entries", [])
+        item.item_count = len(entries)
+
+        if not self.wants_dates():
+            return True
 
         try:
-            dates = []
             now_date = datetime.utcnow().date()
 
-            entries = parsed.get("entries", [])
-            item.item_count = len(entries)
-
-            dates.extend(
-                FeedInfoParser.entry_dates(entries, ["updated", "published"], now_date)
-            )
+            window = self.dates_window(entries, ["updated", "published"], now_date)
 
-            if dates:
-                item.last_updated = sorted(dates, reverse=True)[0]
-                item.velocity = self.entry_velocity(dates)
+            if window.latest:
+                item.last_updated = window.latest
+                item.velocity = window.velocity()
             elif feed.get("updated"):
                 item.last_updated = datestring_to_utc_datetime(feed.get("updated"))
         except Exception as e:
@@ -177,27 +310,35 @@ class FeedInfoParser(ItemParser):
         if item.hubs:
             item.is_push = True
 
+        entries = data.get("items", [])
+        item.item_count = len(entries)
+
+        if not self.wants_dates():
+            return True
+
         try:
-            dates = []
             now_date: date = datetime.utcnow().date()
 
-            entries = data.get("items", [])
-            item.item_count = len(entries)
-
-            dates.extend(
-                FeedInfoParser.entry_dates(
-                    entries, ["date_modified", "date_published"], now_date
-                )
+            window = self.dates_window(
+                entries, ["date_modified", "date_published"], now_date
             )
 
-            if dates:
-                item.last_updated = sorted(dates, reverse=True)[0]
-                item.velocity = self.entry_velocity(dates)
+            if window.latest:
+                item.last_updated = window.latest
+                item.velocity = window.velocity()
         except Exception as e:
             pass
 
         return True
 
+    def wants_dates(self) -> bool:
+        """
+        Check if entry dates should be parsed. The score includes the velocity.
+
+        :return: boolean
+        """
+        return self.crawler.wants_field("last_updated", "velocity", "score")
+
     @staticmethod
     def parse_raw_data(
         raw_data: Union[str, bytes], encoding: str = "utf-8", headers: Dict = None
@@ -238,9 +379,13 @@ class FeedInfoParser(ItemParser):
             raw_data = raw_data.strip()
             content_length = len(raw_data)
 
+            # Most feeds can be read with a single lxml pass, which is much faster than feedparser.
+            data = parse_feed_xml(raw_data, h)
+
             # We want to pass data into feedparser as bytes, otherwise if we accidentally pass a url string
             # it will attempt a fetch
-            data = feedparser.parse(raw_data, response_headers=h)
+            if data is None:
+                data = feedparser.parse(raw_data, response_headers=h)
 
             dur = int((time.perf_counter() - start) * 1000)
 
@@ -269,13 +414,46 @@ class FeedInfoParser(ItemParser):
         :return: str
         """
         try:
-            title = BeautifulSoup(title, self.crawler.htmlparser).get_text()
+            # Most titles contain no markup or entities.
+            if "<" in title or "&" in title:
+                title = self.strip_markup(title)
+            else:
+                title = self.collapse_whitespace(title)
             if len(title) > 1024:
                 title = title[:1020] + "..."
             return title
         except Exception as ex:
             return ""
 
+    def strip_markup(self, text: str) -> str:
+        """
+        Remove HTML tags from a string and replace HTML entities.
+        Returns the same text as BeautifulSoup, except that entities are replaced by html.unescape.
+
+        :param text: String that may contain HTML
+        :return: str
+        """
+        strings = markup_tag_regex.split(text)
+        # Leave anything else that looks like markup, such as unclosed tags or scripts, to BeautifulSoup.
+        unparsed = any("<" in string for string in strings)
+        if unparsed or special_text_tag_regex.search(text):
+            return BeautifulSoup(text, self.crawler.htmlparser).get_text()
+        return "".join(
+            self.collapse_whitespace(html.unescape(string)) for string in strings
+        )
+
+    @staticmethod
+    def collapse_whitespace(string: str) -> str:
+        """
+        Replace a string that is only whitespace with a single newline or space, as BeautifulSoup does.
+
+        :param string: Text between HTML tags
+        :return: str
+        """
+        if string and not string.strip(" \n\t\f\r"):
+            return "\n" if "\n" in string else " "
+        return string
+
     @staticmethod
     def is_podcast(parsed: dict) -> bool:
         """
@@ -423,11 +601,11 @@ class FeedInfoParser(ItemParser):
         item.score = score
 
     @staticmethod
-    def entry_dates(entries: List[Dict], date_names: List[str], current_date: date):
+    def entry_dates(entries: Iterable[Dict], date_names: List[str], current_date: date):
         """
         Return published or updated dates from feed entries.
 
-        :param entries: List of feed entries as dicts.
+        :param entries: Iterable of feed entries as dicts.
         :param date_names: List of key names of entry published or updated values.
         :param current_date: The current date.
         :return: generator that returns datetimes.
@@ -441,6 +619,27 @@ class FeedInfoParser(ItemParser):
                 except (KeyError, ValueError):
                     pass
 
+    def dates_window(
+        self, entries: List[Dict], date_names: List[str], current_date: date
+    ) -> DateWindow:
+        """
+        Stream the published or updated dates of feed entries into a window of the most recent dates.
+
+        Only the first date_parse_limit entries are date parsed, if the limit is set.
+
+        :param entries: List of feed entries as dicts.
+        :param date_names: List of key names of entry published or updated values.
+        :param current_date: The current date.
+        :return: DateWindow
+        """
+        if self.date_parse_limit:
+            entries = islice(entries, self.date_parse_limit)
+
+        window = DateWindow(self.date_window_size)
+        for entry_date in self.entry_dates(entries, date_names, current_date):
+            window.add(entry_date)
+        return window
+
     @staticmethod
     def entry_velocity(dates: List[datetime]) -> float:
         """
@@ -449,27 +648,57 @@ class FeedInfoParser(ItemParser):
         :param dates: List of entry dates
         :return: Average entries per day
         """
-        if not dates or len(dates) < 3:
-            return 0
+        window = DateWindow(len(dates))
+        for entry_date in dates:
+            window.add(entry_date)
+        return window.velocity()
 
-        dates = sorted(dates)
-        deltas = []
-        previous_date: datetime = dates[0]
+    @staticmethod
+    def feed_aliases(item: FeedInfo, response: Response) -> List[URL]:
+        """
+        Find the other URLs at which the feed was fetched: the URLs of its redirect chain on the same host.
 
-        for current_date in dates[1:]:
-            if current_date == previous_date:
-                continue
-            delta = current_date - previous_date
-            deltas.append(delta.total_seconds())
-            previous_date = current_date
+        The self url is not an alias, as it is not known to serve this feed, and may even point to another feed.
 
-        if not deltas:
-            return 0
+        :param item: FeedInfo item
+        :param response: Feed Response
+        :return: List of alias URLs
+        """
+        urls = [item.url, response.url]
+        for redirect in response.redirect_history or ():
+            urls.append(redirect.url)
+
+        aliases = []
+        for url in urls:
+            if (
+                isinstance(url, URL)
+                and url.is_absolute()
+                and url.host == response.url.host
+                and url not in aliases
+            ):
+                aliases.append(url)
+        return aliases
 
-        mean_seconds_delta = mean(deltas)
+    @staticmethod
+    def trailing_slash_variants(urls: List[URL]) -> List[URL]:
+        """
+        Find the URLs that differ from the feed URLs only by a trailing slash, which usually serve the same feed.
 
-        result = round(86400 / mean_seconds_delta, 3)
-        return result
+        :param urls: Feed URLs
+        :return: List of trailing slash variant URLs
+        """
+        variants = []
+        for url in urls:
+            # Only plain paths are likely to be served with and without a trailing slash.
+            if url.query_string or url.path in ("", "/"):
+                continue
+            if url.path.endswith("/"):
+                variant = url.with_path(url.path.rstrip("/"))
+            else:
+                variant = url.with_path(url.path + "/")
+            if variant not in urls and variant not in variants:
+                variants.append(variant)
+        return variants
 
     @staticmethod
     def validate_self_url(item: FeedInfo) -> None:
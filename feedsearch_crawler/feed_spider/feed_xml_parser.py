@@ -0,0 +1,414 @@
+import codecs
+import re
+from io import BytesIO
+from typing import Optional, Dict, List, Tuple
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from feedsearch_crawler.feed_spider.lib import parse_content_type
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RSS10_NS = "http://purl.org/rss/1.0/"
+RSS090_NS = "http://my.netscape.com/rdf/simple/0.9/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+DCTERMS_NS = "http://purl.org/dc/terms/"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# iTunes namespace URIs, which feedparser always reports under the "itunes" prefix.
+itunes_namespaces = [
+    "http://www.itunes.com/dtds/podcast-1.0.dtd",
+    "http://example.com/dtds/podcast-1.0.dtd",
+]
+
+# RSS version attributes, as reported by feedparser.
+rss_versions: Dict[str, str] = {
+    "0.92": "rss092",
+    "0.93": "rss093",
+    "0.94": "rss094",
+}
+
+# Enclosure attribute names, and the feedparser keys of their values.
+rss_enclosure_keys: Dict[str, str] = {
+    "url": "href",
+    "type": "type",
+    "length": "length",
+}
+atom_enclosure_keys: Dict[str, str] = {
+    "href": "href",
+    "type": "type",
+    "length": "length",
+}
+
+# Content types of feeds that are parsed by the fast parser. Other content types use feedparser, as feedparser
+# applies its own encoding rules to them.
+xml_content_types: List[str] = [
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/rdf+xml",
+    "application/xml",
+    "text/xml",
+]
+
+xml_declaration_regex = re.compile(
+    b"^<\\?xml[^>]*encoding=[\"']([A-Za-z0-9._:-]+)[\"']", re.IGNORECASE
+)
+
+
+class UnsupportedFeed(Exception):
+    """
+    The feed contains something that the fast parser does not handle exactly like feedparser.
+    """
+
+    pass
+
+
+def parse_feed_xml(data: bytes, headers: Dict = None) -> Optional[dict]:
+    """
+    Extract the values used by FeedInfoParser from an RSS or Atom feed, with a single lxml iterparse pass.
+
+    The result has the same shape as the feedparser result for the values that are extracted:
+    version, namespaces, the feed title, subtitle, links, and dates, and the dates and enclosures of entries.
+
+    Returns None if lxml is not installed, or if the feed is malformed or contains anything that feedparser
+    would handle differently, such as markup in the title or description, relative links,
+    or a character encoding that differs from the HTTP headers. The caller should then use feedparser.
+
+    :param data: Feed XML as bytes
+    :param headers: Dictionary of HTTP headers with lowercase keys
+    :return: feedparser style dictionary, or None
+    """
+    if etree is None or not data:
+        return None
+
+    try:
+        if not is_supported_encoding(data, headers or {}):
+            return None
+        return FeedXMLParser().parse(data)
+    except (UnsupportedFeed, etree.LxmlError, ValueError, LookupError):
+        return None
+
+
+def is_supported_encoding(data: bytes, headers: Dict) -> bool:
+    """
+    Check that the feed content type and encoding will be decoded the same way as feedparser would decode them.
+
+    :param data: Feed XML as bytes
+    :param headers: Dictionary of HTTP headers with lowercase keys
+    :return: boolean
+    """
+    content_type, params = parse_content_type(headers.get("content-type", ""))
+    if content_type.lower() not in xml_content_types:
+        return False
+
+    # Documents with a DOCTYPE may define entities, which feedparser resolves differently.
+    if b"<!DOCTYPE" in data[:1024] or b"<!doctype" in data[:1024]:
+        return False
+
+    # Byte order marks and other multi-byte encodings are left to feedparser.
+    if not data.startswith(b"<"):
+        return False
+
+    match = xml_declaration_regex.match(data)
+    declared = codecs.lookup(match.group(1).decode()).name if match else "utf-8"
+    charset = params.get("charset")
+
+    # feedparser treats text/xml without a charset as us-ascii.
+    if not charset:
+        return content_type.lower() != "text/xml" and declared == "utf-8"
+
+    return codecs.lookup(charset).name == declared == "utf-8"
+
+
+def split_tag(tag: str) -> Tuple[Optional[str], str]:
+    """
+    Split an lxml element tag into its namespace and local name.
+
+    :param tag: Element tag, e.g. "{http://www.w3.org/2005/Atom}feed"
+    :return: Tuple of namespace and local name
+    """
+    if tag[0] == "{":
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return None, tag
+
+
+class FeedXMLParser:
+    """
+    Single pass RSS and Atom parser. Each entry is processed and released as soon as it has been parsed.
+    """
+
+    def __init__(self):
+        self.version: str = ""
+        # Namespace of the RSS or Atom elements of the feed. RSS 0.9x and 2.0 elements have no namespace.
+        self.feed_ns: Optional[str] = None
+        self.namespaces: Dict[str, str] = {}
+        self.entries: List[dict] = []
+        self.feed: dict = {}
+
+    def parse(self, data: bytes) -> Optional[dict]:
+        """
+        Parse feed XML.
+
+        :param data: Feed XML as bytes
+        :return: feedparser style dictionary, or None if the document is not an RSS or Atom feed
+        """
+        root = None
+        entry_tag = None
+
+        for event, element in etree.iterparse(
+            BytesIO(data),
+            events=("start-ns", "start", "end"),
+            resolve_entities=False,
+            no_network=True,
+        ):
+            if event == "start-ns":
+                self.add_namespace(*element)
+                continue
+
+            if event == "start":
+                if root is None:
+                    root = element
+                    entry_tag = self.start_root(element)
+                if element.get(f"{{{XML_NS}}}base") is not None:
+                    raise UnsupportedFeed("xml:base")
+                continue
+
+            if element.tag == entry_tag:
+                self.entries.append(self.parse_entry(element))
+                # Release the contents of the entry, as it is no longer needed.
+                element.clear()
+                # Remove the cleared entries before it, so that the tree doesn't keep an empty element
+                # for every entry. Other elements of the channel are parsed after the entries.
+                previous = element.getprevious()
+                while previous is not None and previous.tag == entry_tag:
+                    element.getparent().remove(previous)
+                    previous = element.getprevious()
+
+        if root is None:
+            return None
+
+        if self.version == "atom10":
+            channel = root
+        else:
+            channel = root.find(self.feed_tag("channel"))
+            if channel is None:
+                return None
+        self.feed = self.parse_feed(channel)
+
+        return {
+            "bozo": 0,
+            "version": self.version,
+            "namespaces": self.namespaces,
+            "feed": self.feed,
+            "entries": self.entries,
+        }
+
+    def add_namespace(self, prefix: str, uri: str) -> None:
+        """
+        Record a namespace declaration.
+
+        :param prefix: Namespace prefix, empty for the default namespace
+        :param uri: Namespace URI
+        """
+        if uri.lower() in itunes_namespaces:
+            prefix = "itunes"
+        self.namespaces[prefix or ""] = uri
+
+    def start_root(self, root) -> str:
+        """
+        Find the feed version from the root element.
+
+        :param root: Root element
+        :return: Tag of the entry elements
+        :raises UnsupportedFeed: If the feed version is not supported
+        """
+        namespace, local = split_tag(root.tag)
+        if namespace is None and local == "rss":
+            version = root.get("version", "")
+            if version.startswith("2."):
+                self.version = "rss20"
+            elif version in rss_versions:
+                self.version = rss_versions[version]
+            else:
+                raise UnsupportedFeed(f"RSS version {version}")
+            self.feed_ns = None
+        elif namespace == RDF_NS and local == "RDF":
+            default_ns = root.nsmap.get(None)
+            if default_ns == RSS10_NS:
+                self.version = "rss10"
+            elif default_ns == RSS090_NS:
+                self.version = "rss090"
+            else:
+                raise UnsupportedFeed("RDF namespace")
+            self.feed_ns = default_ns
+        elif namespace == ATOM_NS and local == "feed":
+            self.version = "atom10"
+            self.feed_ns = ATOM_NS
+            return self.feed_tag("entry")
+        else:
+            raise UnsupportedFeed("Root element")
+        return self.feed_tag("item")
+
+    def feed_tag(self, local: str) -> str:
+        """
+        Create the tag of an element in the feed namespace.
+
+        :param local: Local element name
+        :return: Element tag
+        """
+        if self.feed_ns:
+            return f"{{{self.feed_ns}}}{local}"
+        return local
+
+    def parse_entry(self, element) -> dict:
+        """
+        Parse the dates and enclosures of an RSS item or Atom entry.
+
+        :param element: Item or entry element
+        :return: Entry dictionary
+        """
+        entry = {}
+        enclosures = []
+        for child in element:
+            if not isinstance(child.tag, str):
+                continue
+            namespace, local = split_tag(child.tag)
+            key = self.date_key(namespace, local)
+            if key:
+                entry[key] = self.text(child)
+            elif local == "enclosure" and namespace == self.feed_ns:
+                enclosures.append(self.link_attributes(child, rss_enclosure_keys))
+            elif (
+                local == "link"
+                and namespace == ATOM_NS
+                and child.get("rel") == "enclosure"
+            ):
+                enclosures.append(self.link_attributes(child, atom_enclosure_keys))
+
+        self.add_updated_fallback(entry)
+        if enclosures:
+            entry["enclosures"] = enclosures
+        return entry
+
+    def parse_feed(self, channel) -> dict:
+        """
+        Parse the title, subtitle, links, and dates of the feed.
+
+        :param channel: RSS channel element, or Atom feed element
+        :return: Feed dictionary
+        """
+        feed = {}
+        links = []
+        for child in channel:
+            if not isinstance(child.tag, str):
+                continue
+            namespace, local = split_tag(child.tag)
+            key = self.date_key(namespace, local)
+            if key:
+                feed[key] = self.text(child)
+            elif namespace == ATOM_NS and local == "link":
+                href = child.get("href", "")
+                if href and "://" not in href:
+                    raise UnsupportedFeed("Relative link")
+                link = {"rel": child.get("rel", "alternate"), "href": href}
+                if child.get("type"):
+                    link["type"] = child.get("type")
+                links.append(link)
+            elif namespace != self.feed_ns:
+                continue
+            elif local == "title":
+                feed["title"] = self.plain_text(child)
+            elif local in ("description", "subtitle"):
+                # feedparser also returns the subtitle as the description.
+                feed["subtitle"] = feed["description"] = self.plain_text(child)
+            elif local == "link" and self.version != "atom10":
+                links.append(
+                    {"rel": "alternate", "type": "text/html", "href": self.text(child)}
+                )
+
+        self.add_updated_fallback(feed)
+        if links:
+            feed["links"] = links
+        return feed
+
+    def date_key(self, namespace: Optional[str], local: str) -> Optional[str]:
+        """
+        Find the feedparser key of a date element.
+
+        :param namespace: Element namespace
+        :param local: Element local name
+        :return: "updated", "published", or None if the element is not a date
+        """
+        if namespace == self.feed_ns and namespace is None:
+            if local == "lastBuildDate":
+                return "updated"
+            if local == "pubDate":
+                return "published"
+        elif namespace == ATOM_NS:
+            if local in ("updated", "published"):
+                return local
+        elif namespace == DC_NS and local == "date":
+            return "updated"
+        elif namespace == DCTERMS_NS:
+            if local == "modified":
+                return "updated"
+            if local == "issued":
+                return "published"
+        return None
+
+    @staticmethod
+    def add_updated_fallback(values: dict) -> None:
+        """
+        feedparser returns the published date as the updated date if there is no updated date.
+
+        :param values: Feed or entry dictionary
+        """
+        if "updated" not in values and "published" in values:
+            values["updated"] = values["published"]
+
+    @staticmethod
+    def link_attributes(element, names: Dict[str, str]) -> dict:
+        """
+        Copy the attributes of an enclosure element that are present.
+
+        :param element: Enclosure element
+        :param names: Dictionary of attribute names to feedparser key names
+        :return: Enclosure dictionary
+        """
+        return {
+            key: element.get(name)
+            for name, key in names.items()
+            if element.get(name) is not None
+        }
+
+    @staticmethod
+    def text(element) -> str:
+        """
+        Get the stripped text of an element that may only contain text.
+
+        :param element: Element
+        :return: Text string
+        :raises UnsupportedFeed: If the element contains other elements
+        """
+        if len(element):
+            raise UnsupportedFeed("Element content")
+        return (element.text or "").strip()
+
+    def plain_text(self, element) -> str:
+        """
+        Get the text of a title or description, which feedparser may treat as HTML.
+
+        :param element: Element
+        :return: Text string
+        :raises UnsupportedFeed: If the text contains markup or entities, or is Atom XHTML
+        """
+        if element.get("type") == "xhtml":
+            raise UnsupportedFeed("XHTML content")
+        text = self.text(element)
+        if "<" in text or "&" in text:
+            raise UnsupportedFeed("Markup in text")
+        return text
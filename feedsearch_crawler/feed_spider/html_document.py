@@ -0,0 +1,564 @@
+import codecs
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Iterator, Optional, Tuple, Dict, Type, List
+
+import bs4
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    # Older versions of selectolax only provide the Modest parser.
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+
+class HeadIndex:
+    """
+    Index of the link and meta elements of a page by rel and property, and the page title.
+    Built in a single pass over the document, so that repeated lookups don't search the document again.
+    """
+
+    __slots__ = ("links_by_rel", "meta_by_property", "title")
+
+    def __init__(self):
+        # Attributes of each link element, in document order, by each rel value and by the whole rel attribute.
+        self.links_by_rel: Dict[str, List[Dict[str, Optional[str]]]] = {}
+        # Content of the first meta element with each property.
+        self.meta_by_property: Dict[str, Optional[str]] = {}
+        # Text of the first title element.
+        self.title: str = ""
+
+    def add_link(self, attributes: Dict[str, Optional[str]]) -> None:
+        """
+        Add a link element to the index.
+        The rel attribute is a space separated list, so the link is indexed by each value and by the whole list.
+
+        :param attributes: Dictionary of link element attributes
+        """
+        rel = attributes.get("rel")
+        if not rel:
+            return
+        values = rel.lower().split()
+        keys = set(values)
+        keys.add(" ".join(values))
+        for key in keys:
+            self.links_by_rel.setdefault(key, []).append(attributes)
+
+    def add_meta(self, prop: Optional[str], content: Optional[str]) -> None:
+        """
+        Add a meta element to the index. Only the first meta element with each property is kept.
+
+        :param prop: Meta property attribute
+        :param content: Meta content attribute
+        """
+        if prop:
+            self.meta_by_property.setdefault(prop, content)
+
+    def find_links(self, rel: str) -> List[Dict[str, Optional[str]]]:
+        """
+        Find the attributes of all link elements with a matching rel attribute.
+
+        :param rel: Rel value, e.g. "alternate" or "shortcut icon"
+        :return: List of link attribute dictionaries, in document order
+        """
+        return self.links_by_rel.get(rel.lower(), [])
+
+    def find_link(self, rel: str) -> Optional[str]:
+        """
+        Find the href of the first link element with a matching rel attribute.
+
+        :param rel: Rel value, e.g. "canonical"
+        :return: href string or None
+        """
+        links = self.links_by_rel.get(rel.lower())
+        if links:
+            return links[0].get("href")
+        return None
+
+    def find_meta(self, prop: str) -> Optional[str]:
+        """
+        Find the content of the first meta element with a matching property attribute.
+
+        :param prop: Property value, e.g. "og:site_name"
+        :return: content string or None
+        """
+        return self.meta_by_property.get(prop)
+
+
+class HTMLDocument(ABC):
+    """
+    A parsed HTML document. Wraps an HTML parser backend to provide the lookups used to find feeds and
+    site metadata.
+    """
+
+    # Name of the backend used to select this document class.
+    backend: str = ""
+    # Name of the package that provides the parser library, if it is not a dependency of this library.
+    package: str = ""
+    # Index of link and meta elements, built on first use.
+    _head_index: Optional[HeadIndex] = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Check that the parser library required by the backend is installed.
+
+        :return: boolean
+        """
+        return True
+
+    @abstractmethod
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Find all tags that contain links, in document order.
+
+        :return: Iterator of tuples of the href and type attributes of each tag with an href attribute
+        """
+        raise NotImplementedError("Not Implemented")
+
+    @property
+    def head_index(self) -> HeadIndex:
+        """
+        Index of the document link and meta elements and title. Built once on first use.
+        Shared by every lookup on this document, including those of other ItemParsers using the same Response.
+
+        :return: HeadIndex
+        """
+        if self._head_index is None:
+            self._head_index = HeadIndex()
+            self.build_head_index(self._head_index)
+        return self._head_index
+
+    @abstractmethod
+    def build_head_index(self, index: HeadIndex) -> None:
+        """
+        Add all link and meta elements and the first title of the document to the index, in a single pass.
+
+        :param index: Empty HeadIndex
+        """
+        raise NotImplementedError("Not Implemented")
+
+    def find_link(self, rel: str) -> Optional[str]:
+        """
+        Find the href of the first link tag with a matching rel attribute.
+
+        :param rel: Rel value, e.g. "canonical"
+        :return: href string or None
+        """
+        return self.head_index.find_link(rel)
+
+    def find_meta(self, prop: str) -> Optional[str]:
+        """
+        Find the content of the first meta tag with a matching property attribute.
+
+        :param prop: Property value, e.g. "og:site_name"
+        :return: content string or None
+        """
+        return self.head_index.find_meta(prop)
+
+    def title(self) -> str:
+        """
+        Find the document title.
+
+        :return: Title text, or empty string if no title
+        """
+        return self.head_index.title
+
+
+class BS4Document(HTMLDocument):
+    """
+    HTMLDocument using BeautifulSoup.
+    """
+
+    backend = "bs4"
+
+    def __init__(self, text: str, features: str = "html.parser"):
+        """
+        :param text: HTML as string
+        :param features: BeautifulSoup parser name
+        """
+        self.soup = bs4.BeautifulSoup(text, features)
+
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for tag in self.soup.find_all(self.tag_has_href):
+            yield tag.get("href"), tag.get("type")
+
+    def build_head_index(self, index: HeadIndex) -> None:
+        for tag in self.soup.find_all(name=["link", "meta", "title"]):
+            if tag.name == "link":
+                attributes = dict(tag.attrs)
+                rel = attributes.get("rel")
+                # BeautifulSoup splits the multi-valued rel attribute into a list.
+                if isinstance(rel, list):
+                    attributes["rel"] = " ".join(rel)
+                index.add_link(attributes)
+            elif tag.name == "meta":
+                index.add_meta(tag.get("property"), tag.get("content"))
+            elif not index.title:
+                index.title = tag.text
+
+    @staticmethod
+    def tag_has_href(tag: bs4.Tag) -> bool:
+        """
+        Find all tags that contain links.
+
+        :param tag: XML tag
+        :return: boolean
+        """
+        return tag.has_attr("href")
+
+
+class LxmlDocument(HTMLDocument):
+    """
+    HTMLDocument using lxml.html.
+    """
+
+    backend = "lxml"
+    package = "lxml"
+
+    def __init__(self, text: str):
+        """
+        :param text: HTML as string
+        """
+        # lxml rejects unicode strings that contain an encoding declaration, so parse as UTF-8 bytes.
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        try:
+            self.root = lxml.html.document_fromstring(
+                text.encode("utf-8", "replace"), parser=parser
+            )
+        except etree.ParserError:
+            # lxml raises "Document is empty" when there are no elements, e.g. only a doctype or comment.
+            self.root = lxml.html.Element("html")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return lxml is not None
+
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for element in self.root.iter(etree.Element):
+            href = element.get("href")
+            if href is not None:
+                yield href, element.get("type")
+
+    def build_head_index(self, index: HeadIndex) -> None:
+        title_found = False
+        for element in self.root.iter("link", "meta", "title"):
+            if element.tag == "link":
+                index.add_link(dict(element.attrib))
+            elif element.tag == "meta":
+                index.add_meta(element.get("property"), element.get("content"))
+            elif not title_found:
+                index.title = element.text_content()
+                title_found = True
+
+
+class SelectolaxDocument(HTMLDocument):
+    """
+    HTMLDocument using selectolax.
+    """
+
+    backend = "selectolax"
+    package = "selectolax"
+
+    def __init__(self, text: str):
+        """
+        :param text: HTML as string
+        """
+        self.tree = SelectolaxParser(text)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return SelectolaxParser is not None
+
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for node in self.tree.css("[href]"):
+            attributes = node.attributes
+            yield attributes.get("href") or "", attributes.get("type")
+
+    def build_head_index(self, index: HeadIndex) -> None:
+        title_found = False
+        for node in self.tree.css("link, meta, title"):
+            if node.tag == "link":
+                # Attributes without a value are empty strings, as in BeautifulSoup.
+                index.add_link(
+                    {name: value or "" for name, value in node.attributes.items()}
+                )
+            elif node.tag == "meta":
+                attributes = node.attributes
+                index.add_meta(attributes.get("property"), attributes.get("content"))
+            elif not title_found:
+                index.title = node.text()
+                title_found = True
+
+
+class LinkMetaExtractor(HTMLParser):
+    """
+    Event driven HTML parser that extracts only the values needed for feed discovery, without building a DOM.
+
+    Events are tuples:
+        ("href", href, type) for each tag with an href attribute.
+        ("link", attributes) for each link tag with a rel attribute, where attributes is a dictionary.
+        ("meta", property, content) for each meta tag with a property attribute.
+        ("title", text) for the first title tag.
+        ("body",) for each body tag.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Events extracted since the last drain.
+        self.events: List[tuple] = []
+        # Text parts of the title while inside the first title tag.
+        self._title_parts: Optional[List[str]] = None
+        self._title_found: bool = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == "body":
+            self.events.append(("body",))
+
+        if not attrs:
+            if tag == "title" and not self._title_found:
+                self._title_parts = []
+            return
+
+        # Attributes without a value are empty strings, as in BeautifulSoup.
+        attributes = {name: value or "" for name, value in attrs}
+        if "href" in attributes:
+            self.events.append(("href", attributes["href"], attributes.get("type")))
+
+        if tag == "link":
+            if attributes.get("rel"):
+                self.events.append(("link", attributes))
+        elif tag == "meta":
+            prop = attributes.get("property")
+            if prop:
+                self.events.append(("meta", prop, attributes.get("content")))
+        elif tag == "title" and not self._title_found:
+            self._title_parts = []
+
+    def handle_data(self, data: str):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def handle_endtag(self, tag: str):
+        if tag == "title":
+            self._end_title()
+
+    def close(self):
+        super().close()
+        # Emit an unterminated title.
+        self._end_title()
+
+    def _end_title(self):
+        if self._title_parts is None:
+            return
+        self.events.append(("title", "".join(self._title_parts)))
+        self._title_parts = None
+        self._title_found = True
+
+    def drain(self) -> List[tuple]:
+        """
+        Return the events extracted since the last drain.
+
+        :return: List of event tuples
+        """
+        events = self.events
+        self.events = []
+        return events
+
+
+def extract_events(text: str, chunk_size: int = 65536) -> Iterator[tuple]:
+    """
+    Extract link and meta events from an HTML string in a single pass.
+    The text is fed to the parser in chunks, and events are yielded after each chunk.
+
+    :param text: HTML as string
+    :param chunk_size: Number of characters fed to the parser at a time
+    :return: Iterator of event tuples, see LinkMetaExtractor
+    """
+    extractor = LinkMetaExtractor()
+    for start in range(0, len(text), chunk_size):
+        extractor.feed(text[start : start + chunk_size])
+        yield from extractor.drain()
+    extractor.close()
+    yield from extractor.drain()
+
+
+class IncrementalLinkParser:
+    """
+    Extract links from the head of an HTML page while the page is downloading.
+    Chunks of bytes are decoded and fed to a LinkMetaExtractor as they arrive, until the body is reached.
+    """
+
+    __slots__ = ("_decoder", "_extractor", "done")
+
+    def __init__(self, encoding: Optional[str] = None):
+        """
+        :param encoding: Character encoding of the page. Defaults to UTF-8 if unknown.
+        """
+        try:
+            decoder_class = codecs.getincrementaldecoder(encoding or "utf-8")
+        except LookupError:
+            decoder_class = codecs.getincrementaldecoder("utf-8")
+        self._decoder = decoder_class(errors="replace")
+        self._extractor = LinkMetaExtractor()
+        # True once the head has been parsed, or parsing has been stopped.
+        self.done: bool = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Optional[str]]]:
+        """
+        Parse a chunk of the page.
+
+        :param chunk: Chunk of the page as bytes
+        :return: List of tuples of href and type found in the chunk
+        """
+        if self.done:
+            return []
+
+        self._extractor.feed(self._decoder.decode(chunk))
+        links = []
+        for event in self._extractor.drain():
+            if event[0] == "href":
+                links.append((event[1], event[2]))
+            elif event[0] == "body":
+                self.stop()
+                break
+        return links
+
+    def stop(self) -> None:
+        """
+        Stop parsing, and release the parser.
+        """
+        self.done = True
+        self._extractor = None
+        self._decoder = None
+
+
+class StreamDocument(HTMLDocument):
+    """
+    HTMLDocument read from the events of a streaming parser, without building a DOM.
+    Links are yielded as the page is parsed rather than stored, and the head index is built in the same pass.
+    """
+
+    backend = "stream"
+
+    def __init__(self, text: str):
+        """
+        :param text: HTML as string
+        """
+        self.text = text
+
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        # Build the head index from the same pass, if it hasn't already been built.
+        index = HeadIndex() if self._head_index is None else None
+        for event in extract_events(self.text):
+            if event[0] == "href":
+                yield event[1], event[2]
+            elif index is not None:
+                self.add_to_index(index, event)
+        if index is not None and self._head_index is None:
+            self._head_index = index
+
+    def build_head_index(self, index: HeadIndex) -> None:
+        for event in extract_events(self.text):
+            self.add_to_index(index, event)
+
+    @staticmethod
+    def add_to_index(index: HeadIndex, event: tuple) -> None:
+        """
+        Add a link, meta, or title event to the head index.
+
+        :param index: HeadIndex
+        :param event: Event tuple, see LinkMetaExtractor
+        """
+        kind = event[0]
+        if kind == "link":
+            index.add_link(event[1])
+        elif kind == "meta":
+            index.add_meta(event[1], event[2])
+        elif kind == "title":
+            index.title = event[1]
+
+
+class HeadDocument(HTMLDocument):
+    """
+    HTMLDocument of only the head of a page, along with links found by scanning the body without parsing it.
+    """
+
+    def __init__(self, head: HTMLDocument, body_links: List[Tuple[str, Optional[str]]]):
+        """
+        :param head: HTMLDocument of the page head
+        :param body_links: List of tuples of href and type found in the page body
+        """
+        self.head = head
+        self.body_links = body_links
+        self.backend = head.backend
+
+    def links(self) -> Iterator[Tuple[str, Optional[str]]]:
+        yield from self.head.links()
+        yield from self.body_links
+
+    @property
+    def head_index(self) -> HeadIndex:
+        return self.head.head_index
+
+    def build_head_index(self, index: HeadIndex) -> None:
+        # The head index of the head document is used.
+        pass
+
+
+# HTMLDocument classes by backend name.
+html_backends: Dict[str, Type[HTMLDocument]] = {
+    BS4Document.backend: BS4Document,
+    LxmlDocument.backend: LxmlDocument,
+    SelectolaxDocument.backend: SelectolaxDocument,
+    StreamDocument.backend: StreamDocument,
+}
+
+
+def get_html_backend(backend: str) -> Type[HTMLDocument]:
+    """
+    Get the HTMLDocument class for a backend name.
+
+    :param backend: Backend name, e.g. "bs4", "lxml", "selectolax", or "stream"
+    :return: HTMLDocument class
+    :raises ValueError: If the backend name is unknown
+    :raises ImportError: If the parser library required by the backend is not installed
+    """
+    document_class = html_backends.get(backend)
+    if not document_class:
+        raise ValueError(
+            f"Unknown HTML parser backend '{backend}'. Must be one of {list(html_backends)}"
+        )
+    if not document_class.is_available():
+        raise ImportError(
+            f"HTML parser backend '{backend}' requires the '{document_class.package}' package, "
+            f"which is not installed. Install it with: pip install feedsearch-crawler[{backend}]"
+        )
+    return document_class
+
+
+def parse_html(
+    text: str, backend: str = "bs4", features: str = "html.parser"
+) -> HTMLDocument:
+    """
+    Parse an HTML string with the chosen parser backend.
+
+    :param text: HTML as string
+    :param backend: Backend name, e.g. "bs4", "lxml", "selectolax", or "stream"
+    :param features: BeautifulSoup parser name, only used by the bs4 backend
+    :return: HTMLDocument
+    """
+    document_class = get_html_backend(backend)
+    if document_class is BS4Document:
+        return BS4Document(text, features)
+    return document_class(text)
@@ -0,0 +1,199 @@
+import json
+import re
+from typing import Optional, List, Tuple
+
+# Top level keys of JSON Feed versions 1.0 and 1.1. https://www.jsonfeed.org/version/1.1/
+json_feed_keys: List[str] = [
+    "version",
+    "title",
+    "home_page_url",
+    "feed_url",
+    "description",
+    "user_comment",
+    "next_url",
+    "icon",
+    "favicon",
+    "author",
+    "authors",
+    "language",
+    "expired",
+    "hubs",
+    "items",
+]
+
+json_feed_version = "https://jsonfeed.org/version/"
+# Regex to find a JSON Feed version value in JSON text, with or without escaped slashes.
+json_feed_version_regex = re.compile(r'"https:\\?/\\?/jsonfeed\.org\\?/version\\?/')
+
+_decoder = json.JSONDecoder()
+_whitespace_regex = re.compile(r"[ \t\n\r]*")
+# Regex to find JSON strings and brackets, to skip over JSON values without decoding them.
+_skip_regex = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+
+
+def parse_json_feed(
+    text: str, max_keys: int = 10, max_items: int = 1000, first_item_only: bool = False
+) -> Optional[dict]:
+    """
+    Read a JSON Feed one top level value at a time, without decoding the whole document.
+
+    JSON that is not a JSON Feed is rejected as soon as a top level key is found that is not a JSON Feed key,
+    or if the version key is not one of the first max_keys keys, so large JSON API responses are never decoded.
+    Items that come before the version key are only decoded if a JSON Feed version follows them.
+    Only the first max_items items are decoded. Keys after a truncated items list are only read
+    if the version key hasn't been read yet.
+
+    :param text: Response content as text string
+    :param max_keys: Max number of top level keys that may come before the version key
+    :param max_items: Max number of items to decode
+    :param first_item_only: Only decode the first item if the version key comes before the items,
+        when the items are only needed to check that the feed has items
+    :return: Dictionary of the JSON Feed top level values, or None if the text is not a JSON Feed
+    """
+    if not text:
+        return None
+
+    try:
+        return read_json_feed(text, max_keys, max_items, first_item_only)
+    except (ValueError, IndexError):
+        return None
+
+
+def read_json_feed(
+    text: str, max_keys: int, max_items: int, first_item_only: bool = False
+) -> dict:
+    """
+    Read the top level object of a JSON Feed.
+
+    :param text: Response content as text string
+    :param max_keys: Max number of top level keys that may come before the version key
+    :param max_items: Max number of items to decode
+    :param first_item_only: Only decode the first item if the version key comes before the items
+    :return: Dictionary of the JSON Feed top level values
+    :raises ValueError: If the text is not a JSON Feed
+    """
+    idx = skip_whitespace(text, 0)
+    if text[idx] != "{":
+        raise ValueError("Not a JSON object")
+    idx = skip_whitespace(text, idx + 1)
+
+    feed = {}
+    num_keys = 0
+    while True:
+        key, idx = _decoder.raw_decode(text, idx)
+        idx = skip_whitespace(text, idx)
+        if not isinstance(key, str) or text[idx] != ":":
+            raise ValueError("Invalid object key")
+        idx = skip_whitespace(text, idx + 1)
+        num_keys += 1
+
+        # Extension keys start with an underscore.
+        if "version" not in feed and not (key in json_feed_keys or key[:1] == "_"):
+            raise ValueError(f"Not a JSON Feed key: {key}")
+
+        if key == "items":
+            if "version" in feed:
+                limit = 1 if first_item_only else max_items
+            # Don't decode the items of other JSON, unless a JSON Feed version may follow them.
+            elif json_feed_version_regex.search(text, idx):
+                limit = max_items
+            else:
+                raise ValueError("No JSON Feed version")
+            # The version key may still follow items that are over the limit, so the rest of the items are skipped.
+            skip_rest = "version" not in feed
+            feed["items"], idx, complete = read_items(text, idx, limit, skip_rest)
+            if not complete and not skip_rest:
+                break
+        else:
+            feed[key], idx = _decoder.raw_decode(text, idx)
+
+        if key == "version":
+            if not isinstance(feed["version"], str) or (
+                json_feed_version not in feed["version"]
+            ):
+                raise ValueError("Not a JSON Feed version")
+        elif "version" not in feed and num_keys >= max_keys:
+            raise ValueError("No JSON Feed version")
+
+        idx = skip_whitespace(text, idx)
+        if text[idx] == ",":
+            idx = skip_whitespace(text, idx + 1)
+        elif text[idx] == "}":
+            break
+        else:
+            raise ValueError("Invalid object")
+
+    if "version" not in feed:
+        raise ValueError("No JSON Feed version")
+    return feed
+
+
+def read_items(
+    text: str, idx: int, max_items: int, skip_rest: bool = False
+) -> Tuple[list, int, bool]:
+    """
+    Read the items array of a JSON Feed, up to max_items items.
+
+    :param text: Response content as text string
+    :param idx: Index of the start of the items array
+    :param max_items: Max number of items to decode
+    :param skip_rest: Skip over the items after max_items without decoding them, to the end of the array
+    :return: Tuple of the items, the index after the last item read or after the array if the rest of the items
+        were skipped, and whether every item was read
+    :raises ValueError: If the items are not a valid JSON array
+    """
+    if text[idx] != "[":
+        raise ValueError("Items must be an array")
+    idx = skip_whitespace(text, idx + 1)
+
+    items = []
+    if text[idx] == "]":
+        return items, idx + 1, True
+
+    while len(items) < max_items:
+        item, idx = _decoder.raw_decode(text, idx)
+        items.append(item)
+        idx = skip_whitespace(text, idx)
+        if text[idx] == ",":
+            idx = skip_whitespace(text, idx + 1)
+        elif text[idx] == "]":
+            return items, idx + 1, True
+        else:
+            raise ValueError("Invalid array")
+
+    if skip_rest:
+        idx = skip_array(text, idx)
+    return items, idx, False
+
+
+def skip_array(text: str, idx: int) -> int:
+    """
+    Skip over the rest of a JSON array without decoding its values.
+    The values are not validated.
+
+    :param text: Text string
+    :param idx: Index within the array, outside of any string
+    :return: Index after the end of the array
+    :raises ValueError: If the array doesn't end
+    """
+    depth = 1
+    for match in _skip_regex.finditer(text, idx):
+        token = match.group()
+        if token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+            if not depth:
+                return match.end()
+    raise ValueError("Unterminated array")
+
+
+def skip_whitespace(text: str, idx: int) -> int:
+    """
+    Find the index of the next character that is not JSON whitespace.
+
+    :param text: Text string
+    :param idx: Index to start from
+    :return: Index of the next non-whitespace character
+    """
+    return _whitespace_regex.match(text, idx).end()
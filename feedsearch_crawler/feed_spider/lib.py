@@ -1,16 +1,65 @@
-import cgi
-from datetime import datetime
-from typing import Union, List
+import codecs
+import heapq
+import re
+from datetime import datetime, timedelta
+from email.message import Message
+from email.utils import parsedate_tz
+from functools import lru_cache
+from typing import Union, List, Optional, Set, Tuple, Dict
 
 from dateutil import tz, parser
 from yarl import URL
 
+from feedsearch_crawler.feed_spider.regexes import rss_regex
+
 
 class ParseTypes:
     JSON = "json"
     XML = "xml"
 
 
+# Byte order marks of encodings that are not ASCII compatible, and the codecs to decode them.
+utf_boms = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def sniff_feed_type(data: bytes, limit: int = 1000) -> Optional[str]:
+    """
+    Check if raw Response content looks like an XML or JSON feed, without decoding the whole content.
+
+    Only the first bytes of the content are checked. A byte order mark, whitespace, or an XML declaration may
+    come before the feed, and RSS, RDF, or Atom root elements are matched as XML feeds.
+    Content that starts with a JSON object may be a JSON feed.
+
+    :param data: Response content as bytes
+    :param limit: Number of bytes at the start of the content to check
+    :return: ParseTypes.XML, ParseTypes.JSON, or None if the content doesn't look like a feed
+    """
+    if not data:
+        return None
+
+    prefix = data[:limit]
+    for bom, encoding in utf_boms:
+        if prefix.startswith(bom):
+            text = prefix.decode(encoding, "ignore")
+            break
+    else:
+        # Latin-1 maps each byte to one character, so the ASCII markup is matched in any ASCII compatible encoding.
+        text = prefix.decode("latin-1")
+        if text.startswith("\xef\xbb\xbf"):
+            text = text[3:]
+
+    if text.lstrip().startswith("{"):
+        return ParseTypes.JSON
+    if rss_regex.search(text):
+        return ParseTypes.XML
+    return None
+
+
 def get_site_root(url: Union[str, URL]) -> str:
     """
     Find the root domain of a url
@@ -26,6 +75,21 @@ def create_allowed_domains(url: Union[str, URL]) -> List[str]:
     return [URL(url).host]
 
 
+def parse_content_type(value: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Parse a Content-Type header into the media type and a dictionary of its parameters.
+    Parameter names are lowercase and values are unquoted. The media type is returned as it is in the header.
+
+    :param value: Content-Type header string
+    :return: Tuple of the media type and the parameters dictionary
+    """
+    message = Message()
+    message["content-type"] = value
+    params = message.get_params() or [("", "")]
+    media_type = params[0][0]
+    return media_type, dict(params[1:])
+
+
 def parse_header_links(value):
     """
     Return a list of Dicts of parsed link headers proxies.
@@ -73,17 +137,147 @@ def force_utc(dt: datetime) -> datetime:
     return dt.astimezone(tz.tzutc())
 
 
+# RFC 822 dates with a four digit year, and a numeric or UTC timezone. e.g. "Mon, 02 Jan 2006 15:04:05 -0700"
+rfc822_date_regex = re.compile(
+    r"^\s*(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+\d{1,2}:\d{2}(?::\d{2})?"
+    r"(?:\s*(?:[+-]\d{4}|GMT|UTC|UT|Z))?\s*$"
+)
+
+# ISO 8601 dates and datetimes. e.g. "2006-01-02T15:04:05.123+07:00"
+iso8601_date_regex = re.compile(
+    r"^\s*(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?"
+    r"\s*(Z|[+-]\d{2}(?::?\d{2})?)?\s*$"
+)
+
+
+def parse_rfc822_date(date_string: str) -> Optional[datetime]:
+    """
+    Parse an RFC 822 date string, as used by RSS, to a tz-aware UTC datetime.
+
+    :param date_string: Date string
+    :return: tz-aware UTC datetime, or None if the string is not a supported RFC 822 date
+    """
+    if not rfc822_date_regex.match(date_string):
+        return None
+
+    parsed = parsedate_tz(date_string)
+    if not parsed:
+        return None
+
+    # Dates without a timezone are UTC.
+    offset = parsed[9] or 0
+    dt = datetime(*parsed[:6], tzinfo=tz.tzutc())
+    return dt - timedelta(seconds=offset)
+
+
+def parse_iso8601_date(date_string: str) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 date string, as used by Atom and JSON Feed, to a tz-aware UTC datetime.
+
+    :param date_string: Date string
+    :return: tz-aware UTC datetime, or None if the string is not a supported ISO 8601 date
+    """
+    match = iso8601_date_regex.match(date_string)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    microsecond = int(fraction[:6].ljust(6, "0")) if fraction else 0
+    dt = datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour or 0),
+        int(minute or 0),
+        int(second or 0),
+        microsecond,
+        tzinfo=tz.tzutc(),
+    )
+
+    # Dates without a timezone are UTC.
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        dt -= sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+    return dt
+
+
+@lru_cache(maxsize=4096)
 def datestring_to_utc_datetime(date_string: str) -> datetime:
     """
     Convert a date string to a tz-aware UTC datetime.
 
+    RFC 822 and ISO 8601 dates, which are used by almost all feeds, are parsed directly.
+    Other formats are parsed by dateutil. Results are cached, as feeds often repeat the same date strings.
+
     :param date_string: A datetime as a string in almost any format.
     :return: tz-aware UTC datetime
     """
+    dt = parse_rfc822_date(date_string) or parse_iso8601_date(date_string)
+    if dt:
+        return dt
+
     dt = parser.parse(date_string)
     return force_utc(dt)
 
 
+class DateWindow:
+    """
+    Streaming record of the latest date, and of a bounded window of the most recent distinct dates.
+    Uses O(size) memory however many dates are added.
+    """
+
+    __slots__ = ("size", "count", "latest", "_heap", "_seen")
+
+    def __init__(self, size: int = 100):
+        """
+        :param size: Maximum number of distinct dates kept in the window
+        """
+        self.size = size
+        # Number of dates added, including duplicates.
+        self.count: int = 0
+        # Most recent date added.
+        self.latest: Optional[datetime] = None
+        # Min-heap of the most recent distinct dates, so the oldest date in the window is first.
+        self._heap: List[datetime] = []
+        self._seen: Set[datetime] = set()
+
+    def add(self, dt: datetime) -> None:
+        """
+        Add a date to the window.
+
+        :param dt: tz-aware datetime
+        """
+        self.count += 1
+        if self.latest is None or dt > self.latest:
+            self.latest = dt
+
+        if dt in self._seen:
+            return
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, dt)
+        elif self._heap and dt > self._heap[0]:
+            self._seen.discard(heapq.heapreplace(self._heap, dt))
+        else:
+            return
+        self._seen.add(dt)
+
+    def velocity(self) -> float:
+        """
+        Calculate the average number of entries posted per day, over the dates in the window.
+
+        :return: Average entries per day
+        """
+        if self.count < 3 or len(self._heap) < 2:
+            return 0
+
+        mean_seconds_delta = (self.latest - self._heap[0]).total_seconds() / (
+            len(self._heap) - 1
+        )
+        return round(86400 / mean_seconds_delta, 3)
+
+
 def create_content_type(parse_type: str, encoding: str, content_type: str) -> str:
     """
     Create the actual content type of the feed.
@@ -93,7 +287,7 @@ def create_content_type(parse_type: str, encoding: str, content_type: str) -> st
     :param content_type: Content-Type header string of the response
     :return: Content-Type string
     """
-    ctype, pdict = cgi.parse_header(content_type)
+    ctype, _ = parse_content_type(content_type)
 
     if parse_type == ParseTypes.JSON and ParseTypes.JSON not in ctype.lower():
         ctype = "application/json"
@@ -1,9 +1,6 @@
-import pathlib
 import re
 from typing import Optional, Tuple, List
 
-import bs4
-from w3lib.url import url_query_cleaner
 from yarl import URL
 
 from feedsearch_crawler.crawler import Response, Request
@@ -60,8 +57,126 @@ low_priority_urls: List[str] = [
     "video",
 ]
 
+# List of href prefixes that can never point to a crawlable page
+invalid_href_prefixes: Tuple[str, ...] = ("mailto:", "javascript:", "#")
+
 # Link Types that should always be searched for feeds
-feed_link_types: List[str] = ["application/json", "rss", "atom", "rdf"]
+feed_link_types: List[str] = [
+    "application/json",
+    "application/feed+json",
+    "rss",
+    "atom",
+    "rdf",
+]
+
+
+def compile_contains_regex(values: List[str]) -> re.Pattern:
+    """
+    Compile a list of strings into a single alternation regex that matches if any string is contained in the text.
+
+    :param values: List of strings
+    :return: Compiled regex
+    """
+    return re.compile("|".join(re.escape(value) for value in values))
+
+
+# Rule lists compiled once, for matching against lowercase strings.
+invalid_url_contents_regex = compile_contains_regex(invalid_url_contents)
+low_priority_urls_regex = compile_contains_regex(low_priority_urls)
+feed_link_types_regex = compile_contains_regex(feed_link_types)
+
+
+def split_href(href: str) -> Tuple[str, str]:
+    """
+    Split an href string into the part before the querystring, and the querystring.
+    The fragment is removed.
+
+    :param href: href string
+    :return: Tuple of the href without querystring, and the querystring
+    """
+    href = href.split("#", 1)[0]
+    path, _, query = href.partition("?")
+    return path, query
+
+
+def href_suffix(path: str) -> str:
+    """
+    Get the lowercase file extension of the last segment of an href path, without the leading period.
+
+    :param path: href without querystring or fragment
+    :return: file extension string, or empty string
+    """
+    name = path.rstrip("/").rsplit("/", 1)[-1]
+    index = name.rfind(".")
+    if 0 < index < len(name) - 1:
+        return name[index + 1 :].lower()
+    return ""
+
+
+class HrefFlags:
+    """
+    Classification of an href string by the LinkFilter rules.
+    """
+
+    __slots__ = (
+        "is_feedlike_href",
+        "is_feedlike_querystring",
+        "is_podcast_href",
+        "is_podcast_querystring",
+        "has_author_info",
+        "is_low_priority",
+        "has_invalid_contents",
+        "is_valid_filetype",
+        "has_invalid_querystring",
+    )
+
+    def __init__(self, href: str):
+        """
+        Classify an href string, checking every rule in a single pass.
+
+        The feed and podcast rules are checked against the URL path and querystring keys as they are
+        decoded by yarl. Only hrefs with percent-encoded characters are parsed to a URL to decode them,
+        as the raw href is the same for all others. The other rules are checked against the raw href.
+
+        :param href: href string
+        """
+        lowercase_href = href.lower()
+        path, query = split_href(href)
+        url_path = path
+        query_keys = [param.split("=", 1)[0] for param in query.split("&") if param]
+        if "%" in href:
+            url = parse_href_to_url(href)
+            if url:
+                url_path, _ = split_href(str(url))
+                query_keys = list(url.query)
+
+        self.is_feedlike_href: bool = bool(feedlike_regex.search(url_path))
+        self.is_feedlike_querystring: bool = any(
+            feedlike_regex.search(key) for key in query_keys
+        )
+        self.is_podcast_href: bool = bool(podcast_regex.search(url_path))
+        self.is_podcast_querystring: bool = any(
+            podcast_regex.search(key) for key in query_keys
+        )
+        self.has_author_info: bool = bool(author_regex.search(path))
+        self.is_low_priority: bool = bool(
+            low_priority_urls_regex.search(lowercase_href) or date_regex.search(href)
+        )
+        self.has_invalid_contents: bool = bool(
+            invalid_url_contents_regex.search(lowercase_href)
+        )
+        self.is_valid_filetype: bool = href_suffix(path) not in invalid_filetypes
+        self.has_invalid_querystring: bool = any(
+            key in invalid_querystring_keys for key in query_keys
+        )
+
+    @property
+    def is_feedlike_url(self) -> bool:
+        return self.is_feedlike_href or self.is_feedlike_querystring
+
+    @property
+    def is_podcast_url(self) -> bool:
+        return self.is_podcast_href or self.is_podcast_querystring
 
 
 class LinkFilter:
@@ -70,41 +185,34 @@ class LinkFilter:
         self.request = request
         self.full_crawl = full_crawl
 
-    def should_follow_link(self, link: bs4.Tag) -> Optional[Tuple[URL, int]]:
+    def should_follow_link(
+        self, href: str, link_type: Optional[str] = None
+    ) -> Optional[Tuple[URL, int]]:
         """
         Check that the link should be followed if it may contain feed information.
 
-        :param link: Link tag
-        :return: boolean
+        :param href: href attribute of the link tag
+        :param link_type: type attribute of the link tag
+        :return: Tuple of the URL to follow and its queue priority, or None
         """
-        href: str = link.get("href")
-        link_type: str = link.get("type")
-
-        url: URL = parse_href_to_url(href)
-        if not url:
+        if not href:
             return None
 
         # If the link may have a valid feed type then follow it regardless of the url text.
-        if (
-            link_type
-            and any(map(link_type.lower().count, feed_link_types))
-            and "json+oembed" not in link_type
-        ):
+        if self.is_feed_link_type(link_type):
+            url: URL = parse_href_to_url(href)
+            if not url:
+                return None
             # A link with a possible feed type has the highest priority after callbacks.
             return url, 2
 
-        is_feedlike_href: bool = self.is_href_matching(str(url), feedlike_regex)
-        is_feedlike_querystring: bool = self.is_querystring_matching(
-            url, feedlike_regex
-        )
-
-        is_podcast_href: bool = self.is_href_matching(str(url), podcast_regex)
-        is_podcast_querystring: bool = self.is_querystring_matching(url, podcast_regex)
-
-        is_feedlike_url = is_feedlike_querystring or is_feedlike_href
-        is_podcast_url = is_podcast_href or is_podcast_querystring
+        flags = HrefFlags(href)
 
-        if not self.full_crawl and not is_feedlike_url and not is_podcast_url:
+        if (
+            not self.full_crawl
+            and not flags.is_feedlike_url
+            and not flags.is_podcast_url
+        ):
             return
 
         # This check is deprecated, as it has been moved to the spider to prevent the crawling of any links
@@ -114,40 +222,93 @@ class LinkFilter:
         # if not is_one_jump:
         #     return
 
-        has_author_info: bool = self.is_href_matching(href, author_regex)
-        is_low_priority: bool = self.is_low_priority(href)
-
-        priority: int = Request.priority
+        priority: int = Request.default_priority
         # A low priority url should be fetched last.
-        if is_low_priority:
-            priority = Request.priority + 2
+        if flags.is_low_priority:
+            priority = Request.default_priority + 2
         # Podcast pages are lower priority than authors or feeds.
-        if is_podcast_url:
+        if flags.is_podcast_url:
             priority = 5
         # Potential author info has a medium priority.
-        if has_author_info:
+        if flags.has_author_info:
             priority = 4
         # A feedlike url has high priority.
-        if is_feedlike_url:
+        if flags.is_feedlike_url:
             priority = 3
 
         # Validate the actual URL string.
         follow = (
             # is_one_jump
-            not self.has_invalid_contents(href)
-            and self.is_valid_filetype(href)
-            and not self.has_invalid_querystring(url)
+            not flags.has_invalid_contents
+            and flags.is_valid_filetype
+            and not flags.has_invalid_querystring
         )
         # If full_crawl then follow all valid URLs regardless of the feedlike quality of the URL.
         # Otherwise only follow URLs if they look like they might contain feed information.
-        if follow and (self.full_crawl or is_feedlike_url or is_podcast_href):
+        if follow and (
+            self.full_crawl or flags.is_feedlike_url or flags.is_podcast_href
+        ):
+            # Only create the URL once the href is known to be worth following.
+            url: URL = parse_href_to_url(href)
+            if not url:
+                return None
 
             # Remove the querystring unless it may point to a feed.
-            if not is_feedlike_querystring:
+            if not flags.is_feedlike_querystring:
                 url = url.with_query(None)
 
             return url, priority
 
+    @staticmethod
+    def is_feed_link_type(link_type: Optional[str]) -> bool:
+        """
+        Check if the link type attribute is a possible feed type.
+
+        :param link_type: type attribute of the link tag
+        :return: boolean
+        """
+        return bool(
+            link_type
+            and feed_link_types_regex.search(link_type.lower())
+            and "json+oembed" not in link_type
+        )
+
+    @staticmethod
+    def is_prescreened_href(href: str, link_type: Optional[str] = None) -> bool:
+        """
+        Cheap string check for hrefs that should be dropped before any URL is built.
+        Drops empty, mailto, javascript, and fragment-only hrefs, and hrefs with an invalid filetype,
+        unless the link has a possible feed type.
+
+        :param href: href attribute of the link tag
+        :param link_type: type attribute of the link tag
+        :return: True if the href should be dropped
+        """
+        href = href.strip() if href else ""
+        if not href or href[:11].lower().startswith(invalid_href_prefixes):
+            return True
+        if LinkFilter.is_feed_link_type(link_type):
+            return False
+        path, _ = split_href(href)
+        return href_suffix(path) in invalid_filetypes
+
+    @staticmethod
+    def is_feedlike_href(href: str) -> bool:
+        """
+        Check if the href string looks like it may point to a feed or podcast.
+        Checks the whole href, including the querystring, and hrefs with percent-encoded characters
+        are also checked as they are decoded by HrefFlags, so that no href that LinkFilter would follow is missed.
+
+        :param href: href string
+        :return: boolean
+        """
+        if feedlike_regex.search(href) or podcast_regex.search(href):
+            return True
+        if "%" in href:
+            flags = HrefFlags(href)
+            return flags.is_feedlike_url or flags.is_podcast_url
+        return False
+
     @staticmethod
     def is_one_jump_from_original_domain(url: URL, response: Response) -> bool:
         """
@@ -172,7 +333,7 @@ class LinkFilter:
         """
 
         # This is the first Response in the chain
-        if len(response.history) < 2:
+        if not response.history or len(response.history) < 2:
             return True
 
         # The URL is relative, so on the same domain
@@ -196,85 +357,6 @@ class LinkFilter:
 
         return True
 
-    @staticmethod
-    def is_valid_filetype(url: str) -> bool:
-        """
-        Check if url string has an invalid filetype extension.
-
-        :param url: URL string
-        :return: boolean
-        """
-        # if file_regex.search(url.strip()):
-        #     return False
-        # return True
-        suffix = pathlib.Path(url_query_cleaner(url)).suffix.strip(".").lower()
-        if suffix in invalid_filetypes:
-            return False
-        return True
-
-    @staticmethod
-    def has_invalid_querystring(url: URL) -> bool:
-        """
-        Check if URL querystring contains invalid keys.
-
-        :param url: URL object
-        :return: boolean
-        """
-        return any(key in url.query for key in invalid_querystring_keys)
-
-    @staticmethod
-    def is_href_matching(url_string: str, regex: re) -> bool:
-        """
-        Check if the regex has any match in the url string.
-
-        :param url_string: URL as string
-        :param regex: Regex used to search URL
-        :return: boolean
-        """
-        if regex.search(url_query_cleaner(url_string)):
-            return True
-        return False
-
-    @staticmethod
-    def is_querystring_matching(url: URL, regex: re) -> bool:
-        """
-        Check if the regex has any match in the URL query parameters.
-
-        :param url: URL object
-        :param regex: Regex used to search query
-        :return: boolean
-        """
-        for key in url.query:
-            if regex.search(key):
-                return True
-        return False
-
-    @staticmethod
-    def has_invalid_contents(string: str) -> bool:
-        """
-        Ignore any string containing the following strings.
-
-        :param string: String to check
-        :return: boolean
-        """
-        return any(value in string.lower() for value in invalid_url_contents)
-
-    @staticmethod
-    def is_low_priority(url_string: str) -> bool:
-        """
-        Check if the url contains any strings that indicate the url should be low priority.
-
-        :param url_string: URL string
-        :return: boolean
-        """
-        if any(value in url_string.lower() for value in low_priority_urls):
-            return True
-
-        # Search for dates in url, this generally indicates an article page.
-        if date_regex.search(url_string):
-            return True
-        return False
-
     @staticmethod
     def is_subdomain_matching(url: URL, regex: re) -> bool:
         """
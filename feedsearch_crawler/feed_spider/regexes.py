@@ -24,3 +24,32 @@ file_regex = re.compile(
 
 # Regex to match year and month in URLs, e.g. /2019/07/
 date_regex = re.compile("/(\\d{4}/\\d{2})/")
+
+# Regex to scan unparsed HTML for comments, script and style elements, and start tags.
+# Comments and script and style elements are matched whole, so that the tags inside them are skipped.
+# Start tags capture the tag name, the attributes string, and the closing ">". Attribute values may contain ">"
+# if quoted. As in a browser, an unterminated quote or tag runs to the end of the text, and its closing ">" group
+# is empty. Every "<" followed by a letter starts a match, so the scan never backtracks and restarts inside a
+# failed tag, which would make scanning quadratic in the length of the text.
+html_tag_regex = re.compile(
+    "<!--.*?(?:-->|\\Z)"
+    "|<(script|style)\\b(?:[^>\"']|\"[^\"]*(?:\"|\\Z)|'[^']*(?:'|\\Z))*"
+    "(?:>.*?(?:</\\1\\s*>|\\Z)|\\Z)"
+    "|<([a-zA-Z][^\\s/>]*)((?:[^>\"']|\"[^\"]*(?:\"|\\Z)|'[^']*(?:'|\\Z))*)(>|\\Z)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Regex to find the attributes in the attributes string of a tag.
+# The value may be double quoted, single quoted, unquoted, or missing.
+html_attribute_regex = re.compile(
+    "([^\\s\"'>/=]+)(?:\\s*=\\s*(?:\"([^\"]*)\"|'([^']*)'|([^\\s\"'>]+)))?"
+)
+
+# Regex to match HTML tags, comments, and declarations in a short string such as a feed title.
+# CDATA sections contain text, so they are not matched.
+markup_tag_regex = re.compile(
+    "<(?:/?[A-Za-z][^<>]*|!--.*?--|!(?!\\[CDATA\\[)[^<>]*|\\?[^<>]*)>", re.DOTALL
+)
+
+# Regex to find HTML elements whose text BeautifulSoup treats differently from other text.
+special_text_tag_regex = re.compile("<(script|style|pre|textarea)\\b", re.IGNORECASE)
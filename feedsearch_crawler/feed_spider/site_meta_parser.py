@@ -5,6 +5,7 @@ from yarl import URL
 from feedsearch_crawler.crawler import ItemParser, Request, Response
 from feedsearch_crawler.crawler.lib import remove_www
 from feedsearch_crawler.feed_spider.favicon import Favicon
+from feedsearch_crawler.feed_spider.html_document import HTMLDocument, HeadIndex
 from feedsearch_crawler.feed_spider.site_meta import SiteMeta
 
 
@@ -13,14 +14,21 @@ class SiteMetaParser(ItemParser):
         url = response.url
         site_meta: SiteMeta = SiteMeta(url)
 
-        xml = await response.xml
-        if not xml:
+        document: HTMLDocument = await response.xml
+        if not document:
             return
 
-        site_meta.url = self.find_site_url(xml, url)
+        # All lookups share the index built from a single pass over the document.
+        index: HeadIndex = document.head_index
+
+        site_meta.url = self.find_site_url(index, url)
         site_meta.host = remove_www(site_meta.url.host)
-        site_meta.site_name = self.find_site_name(xml)
-        site_meta.possible_icons = self.find_site_icon_urls(xml, url, site_meta.host)
+        if self.crawler.wants_field("site_name"):
+            site_meta.site_name = self.find_site_name(index)
+        if self.crawler.wants_field("favicon", "favicon_data_uri"):
+            site_meta.possible_icons = self.find_site_icon_urls(
+                index, url, site_meta.host
+            )
 
         for icon in site_meta.possible_icons:
             if icon.url:
@@ -39,7 +47,7 @@ class SiteMetaParser(ItemParser):
         yield site_meta
 
     @staticmethod
-    def find_site_icon_urls(soup, url, host) -> List[Favicon]:
+    def find_site_icon_urls(index: HeadIndex, url, host) -> List[Favicon]:
         search_icons = [
             Favicon(
                 url=url.join(URL("favicon.ico")),
@@ -53,28 +61,25 @@ class SiteMetaParser(ItemParser):
 
         possible_icons = []
         for icon in search_icons:
-            link = soup.find(name="link", rel=icon.rel)
-            if link:
-                href = link.get("href", None)
-                if href:
-                    icon.url = url.join(URL(href))
+            href = index.find_link(icon.rel)
+            if href:
+                icon.url = url.join(URL(href))
             if icon.url:
                 possible_icons.append(icon)
 
         return sorted(possible_icons, key=lambda x: x.priority)
 
     @staticmethod
-    def find_site_url(soup, url: URL) -> URL:
+    def find_site_url(index: HeadIndex, url: URL) -> URL:
         """
         Attempts to find the canonical Url of the Site
 
-        :param soup: BeautifulSoup of site
+        :param index: HeadIndex of site
         :param url: Current Url of site
         :return: str
         """
         try:
-            canonical = soup.find(name="link", rel="canonical")
-            site = canonical.get("href")
+            site = index.find_link("canonical")
             if site:
                 if site.strip() == "/":
                     return url
@@ -83,8 +88,7 @@ class SiteMetaParser(ItemParser):
             pass
 
         try:
-            meta = soup.find(name="meta", property="og:url")
-            site = meta.get("content")
+            site = index.find_meta("og:url")
             if site:
                 if site.strip() == "/":
                     return url
@@ -95,11 +99,11 @@ class SiteMetaParser(ItemParser):
         return url.origin()
 
     @staticmethod
-    def find_site_name(soup) -> str:
+    def find_site_name(index: HeadIndex) -> str:
         """
         Attempts to find Site Name
 
-        :param soup: BeautifulSoup of site
+        :param index: HeadIndex of site
         :return: str
         """
         site_name_meta = [
@@ -110,18 +114,8 @@ class SiteMetaParser(ItemParser):
         ]
 
         for p in site_name_meta:
-            try:
-                name = soup.find(name="meta", property=p).get("content")
-                if name:
-                    return name
-            except AttributeError:
-                pass
-
-        try:
-            title = soup.find(name="title").text
-            if title:
-                return title
-        except AttributeError:
-            pass
+            name = index.find_meta(p)
+            if name:
+                return name
 
-        return ""
+        return index.title
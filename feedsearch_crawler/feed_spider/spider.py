@@ -1,19 +1,42 @@
+import asyncio
 import base64
+import html
+import time
 from types import AsyncGeneratorType
-from typing import Union, Any, List, Set
-
-import bs4
+from typing import (
+    Union,
+    List,
+    Set,
+    Tuple,
+    Optional,
+    Dict,
+    Iterable,
+    Coroutine,
+)
+
+from aiohttp import hdrs
 from yarl import URL
 
 from feedsearch_crawler.crawler import Crawler, Item, Request, Response
-from feedsearch_crawler.crawler.lib import parse_href_to_url
+from feedsearch_crawler.crawler.lib import parse_href_to_url, Stats, LRUCache
 from feedsearch_crawler.feed_spider.dupefilter import NoQueryDupeFilter
 from feedsearch_crawler.feed_spider.favicon import Favicon
 from feedsearch_crawler.feed_spider.feed_info import FeedInfo
 from feedsearch_crawler.feed_spider.feed_info_parser import FeedInfoParser
-from feedsearch_crawler.feed_spider.lib import ParseTypes
+from feedsearch_crawler.feed_spider.html_document import (
+    HTMLDocument,
+    HeadDocument,
+    IncrementalLinkParser,
+    parse_html,
+    get_html_backend,
+)
+from feedsearch_crawler.feed_spider.json_feed_parser import parse_json_feed
+from feedsearch_crawler.feed_spider.lib import ParseTypes, sniff_feed_type
 from feedsearch_crawler.feed_spider.link_filter import LinkFilter
-from feedsearch_crawler.feed_spider.regexes import rss_regex
+from feedsearch_crawler.feed_spider.regexes import (
+    html_tag_regex,
+    html_attribute_regex,
+)
 from feedsearch_crawler.feed_spider.site_meta import SiteMeta
 from feedsearch_crawler.feed_spider.site_meta_parser import SiteMetaParser
 
@@ -21,10 +44,45 @@ from feedsearch_crawler.feed_spider.site_meta_parser import SiteMetaParser
 class FeedsearchSpider(Crawler):
     duplicate_filter_class = NoQueryDupeFilter
     htmlparser = "html.parser"
+    html_backend: str = "bs4"
     favicon_data_uri = True
     try_urls: Union[List[str], bool] = False
     full_crawl: bool = False
     crawl_hosts: bool = True
+    # Oversized HTML pages are truncated and parsed, as feed links are usually near the start of the page.
+    # Oversized feeds still fail, as a truncated feed can't be parsed.
+    truncate_content_types: List[str] = ["text/html", "application/xhtml+xml"]
+    # Max number of links checked on each page.
+    max_links_per_page: int = 10000
+    # Yield to the event loop after checking this many links on a page. 0 disables slicing by link count.
+    parse_slice_links: int = 500
+    # Yield to the event loop after checking links on a page for this many milliseconds. 0 disables slicing by time.
+    parse_slice_ms: float = 10
+    # Only parse the page head, and pre-scan the body for feed-like hrefs, unless full_crawl is enabled.
+    head_only: bool = True
+    # Max number of JSON Feed items read. Feeds with more items report this number as their item count.
+    json_feed_max_items: int = 1000
+    # FeedInfo fields read from JSON Feed values other than the version. If none are requested, only the first
+    # JSON Feed item is read, to check that the feed has items.
+    json_feed_fields: List[str] = [
+        "description",
+        "favicon",
+        "favicon_data_uri",
+        "hubs",
+        "is_push",
+        "item_count",
+        "last_updated",
+        "score",
+        "self_url",
+        "title",
+        "velocity",
+    ]
+    # Max number of feed parse results cached by content hash. 0 disables the cache.
+    feed_cache_size: int = 1000
+    # Drop queued Requests to the same-host redirects, and trailing slash variants, of each parsed feed.
+    collapse_feed_aliases: bool = True
+    # Only fetch the start URLs, and return feed links in their head as unvalidated candidates.
+    discovery_only: bool = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -33,6 +91,10 @@ class FeedsearchSpider(Crawler):
         self.site_metas = set()
         self.favicons = dict()
         self.feeds_seen = dict()
+        # Unvalidated feeds found in discovery_only mode.
+        self.feed_candidates: Set[FeedInfo] = set()
+        # Incremental parsers of Responses that are downloading, by Request.
+        self._incremental_parsers: Dict[Request, IncrementalLinkParser] = dict()
         self.post_crawl_callback = self.populate_feed_site_meta
         if "try_urls" in kwargs:
             self.try_urls = kwargs["try_urls"]
@@ -42,6 +104,47 @@ class FeedsearchSpider(Crawler):
             self.full_crawl = kwargs["full_crawl"]
         if "crawl_hosts" in kwargs:
             self.crawl_hosts = kwargs["crawl_hosts"]
+        if "head_only" in kwargs:
+            self.head_only = kwargs["head_only"]
+        if "html_backend" in kwargs:
+            self.html_backend = kwargs["html_backend"]
+        if "collapse_feed_aliases" in kwargs:
+            self.collapse_feed_aliases = kwargs["collapse_feed_aliases"]
+        if "discovery_only" in kwargs:
+            self.discovery_only = kwargs["discovery_only"]
+        # Discovery only makes a single request to each start URL, so favicons are not fetched.
+        if self.discovery_only:
+            self.favicon_data_uri = False
+        # FeedInfo fields requested by the caller. Work that only populates other fields is skipped.
+        # None requests all fields.
+        self.fields: Optional[Set[str]] = None
+        if kwargs.get("fields") is not None:
+            self.fields = set(kwargs["fields"])
+            unknown = self.fields - set(FeedInfo().serialize())
+            if unknown:
+                names = ", ".join(sorted(unknown))
+                raise ValueError(f"Unknown FeedInfo fields: {names}")
+        if not self.wants_field("favicon_data_uri"):
+            self.favicon_data_uri = False
+        # Feed parse results by content hash. A cache may be passed in to share parse results between searches.
+        self.feed_cache: Optional[LRUCache] = kwargs.get("feed_cache")
+        if self.feed_cache is None and self.feed_cache_size:
+            self.feed_cache = LRUCache(self.feed_cache_size)
+        # LinkFilter results keyed by the Response origin, the href, and the link type, so that hrefs repeated
+        # across the pages of a site are only classified and parsed once.
+        # Values are a tuple of the URL to follow and its priority, or an empty tuple if the link is not followed.
+        self._link_cache = LRUCache(self.url_cache_size)
+        # Fail on creation if the HTML parser backend is unknown or not installed.
+        get_html_backend(self.html_backend)
+
+    def wants_field(self, *names: str) -> bool:
+        """
+        Check if any of the FeedInfo fields were requested by the caller.
+
+        :param names: FeedInfo field names
+        :return: boolean
+        """
+        return self.fields is None or any(name in self.fields for name in names)
 
     async def parse(self, request: Request, response: Response) -> AsyncGeneratorType:
         """
@@ -49,16 +152,30 @@ class FeedsearchSpider(Crawler):
 
         :param request: Request
         :param response: Response
-        :return: AsyncGenerator yielding Items, Requests, or iterative AsyncGenerators
+        :return: AsyncGenerator yielding Items, Requests, lists of Requests, or iterative AsyncGenerators
         """
 
         # If the Response is not OK then there's no data to parse.
         if not response.ok:
             return
 
-        # If the Response contains JSON then attempt to parse it as a JsonFeed.
-        if response.json:
-            if "version" and "jsonfeed" and "feed_url" in response.json:
+        # Check the raw content for feeds first, so that feeds are parsed from bytes and never decoded as text.
+        feed_type = sniff_feed_type(response.data)
+        if feed_type == ParseTypes.XML:
+            yield self.feed_info_parser.parse_item(
+                request, response, parse_type=ParseTypes.XML
+            )
+            return
+
+        # If the Response contains JSON then attempt to read it as a JsonFeed, without decoding other JSON.
+        if feed_type == ParseTypes.JSON:
+            json_feed = parse_json_feed(
+                response.text,
+                max_items=self.json_feed_max_items,
+                first_item_only=not self.wants_field(*self.json_feed_fields),
+            )
+            if json_feed:
+                response.json = json_feed
                 yield self.feed_info_parser.parse_item(
                     request, response, parse_type=ParseTypes.JSON
                 )
@@ -69,40 +186,197 @@ class FeedsearchSpider(Crawler):
 
         yield self.parse_site_meta(request, response)
 
-        # Restrict the RSS check to the first 1000 characters, otherwise it's almost definitely not an actual feed.
-        if rss_regex.search(response.text, endpos=1000):
-            yield self.feed_info_parser.parse_item(
-                request, response, parse_type=ParseTypes.XML
-            )
+        if self.discovery_only:
+            yield self.discover_feeds(request, response)
             return
 
         # Don't waste time trying to parse and follow urls if the max depth is already reached.
         if response.is_max_depth_reached(self.max_depth):
             return
 
-        # Make sure the Response XML has been parsed if it exists.
-        soup = await response.xml
-        if not soup:
+        # Make sure the Response HTML has been parsed if it exists.
+        document: HTMLDocument = await response.xml
+        if not document:
             return
 
         # Don't crawl links from pages that are not from the original domain
         if not response.is_original_domain():
             return
 
+        # Find and follow all links in the Response.
+        requests = await self.follow_links(request, response, document.links())
+
+        # Queue all the followed links from this page in a single batch.
+        if requests:
+            yield requests
+
+    async def discover_feeds(
+        self, request: Request, response: Response
+    ) -> AsyncGeneratorType:
+        """
+        Find links to feeds in the head of a page, and yield them as unvalidated FeedInfo candidates
+        without fetching them.
+
+        :param request: Request
+        :param response: Response
+        :return: AsyncGenerator yielding FeedInfo items
+        """
+        document: HTMLDocument = await response.xml
+        if not document:
+            return
+
+        for link in document.head_index.find_links("alternate"):
+            href = link.get("href")
+            if not href or not LinkFilter.is_feed_link_type(link.get("type")):
+                continue
+            url = parse_href_to_url(href)
+            if not url:
+                continue
+            if not url.is_absolute():
+                url = response.url.join(url)
+            if url.scheme not in ("http", "https"):
+                continue
+            yield self.feed_info_parser.parse_candidate(url, link, response)
+
+    def parse_chunk(
+        self, request: Request, response: Response, chunk: bytes
+    ) -> Optional[Coroutine]:
+        """
+        Parse the head of an HTML page while it downloads, so that links with a feed type are queued
+        before the download finishes. Responses that are not HTML, or that are sniffed as feeds or JSON
+        from the first chunk, are not parsed. No more chunks are passed once the head has been parsed.
+
+        :param request: Request
+        :param response: Response containing only the HTTP headers
+        :param chunk: Chunk of the Response body. An empty chunk means the download has ended.
+        :return: Coroutine returning a list of Requests, or None
+        """
+        if not chunk:
+            self._incremental_parsers.pop(request, None)
+            return None
+
+        parser = self._incremental_parsers.get(request)
+        if parser is None:
+            if not self.should_parse_incrementally(response, chunk):
+                request.stop_chunk_callback()
+                return None
+            parser = IncrementalLinkParser(response.encoding)
+            self._incremental_parsers[request] = parser
+
+        links = [
+            (href, link_type)
+            for href, link_type in parser.feed(chunk)
+            if LinkFilter.is_feed_link_type(link_type)
+        ]
+        if parser.done:
+            del self._incremental_parsers[request]
+            request.stop_chunk_callback()
+
+        if not links:
+            return None
+        return self.follow_links(request, response, links, record_stats=False)
+
+    def should_parse_incrementally(
+        self, response: Response, first_chunk: bytes
+    ) -> bool:
+        """
+        Check whether links should be extracted from a Response while it downloads.
+
+        :param response: Response containing only the HTTP headers
+        :param first_chunk: First chunk of the Response body
+        :return: boolean
+        """
+        # Don't follow links past the max depth, or from pages that are not from the original domain.
+        if self.discovery_only:
+            return False
+        if response.is_max_depth_reached(self.max_depth):
+            return False
+        if not response.is_original_domain():
+            return False
+
+        # Only HTML pages have links to parse. Feeds and JSON documents are parsed when the download ends.
+        content_type = response.headers.get(hdrs.CONTENT_TYPE, "").lower()
+        if "html" not in content_type:
+            return False
+        return sniff_feed_type(first_chunk) is None
+
+    async def follow_links(
+        self,
+        request: Request,
+        response: Response,
+        links: Iterable[Tuple[str, Optional[str]]],
+        record_stats: bool = True,
+    ) -> List[Request]:
+        """
+        Follow the links from a page that pass the LinkFilter.
+
+        Duplicate and pre-screened hrefs are dropped before any URL is parsed, and at most max_links_per_page
+        links are checked. LinkFilter results are cached, so hrefs repeated on other pages of the site skip
+        classification, and the Crawler URL cache skips resolving and fingerprinting them again.
+        The loop yields to the event loop every parse_slice_links links or parse_slice_ms milliseconds,
+        so that pages with many links don't stall other Requests.
+
+        :param request: Request
+        :param response: Response that contains the links
+        :param links: Iterable of tuples of href and type
+        :param record_stats: Record the dropped links in the crawl stats. Links found while the page
+            is downloading are followed again when the whole page is parsed, so they are only counted then.
+        :return: List of new Requests
+        """
         link_filter = LinkFilter(
             request=request, response=response, full_crawl=self.full_crawl
         )
-
-        # Find all links in the Response.
-        links = soup.find_all(self.tag_has_href)
-        for link in links:
-            # Check each href for validity and queue priority.
-            values = link_filter.should_follow_link(link)
+        origin = response.origin if response else None
+
+        requests = []
+        hrefs_seen = set()
+        duplicates = 0
+        prescreened = 0
+        slice_start = time.perf_counter()
+        for count, (href, link_type) in enumerate(links, 1):
+            if count > self.max_links_per_page:
+                self.stats[Stats.LINK_LISTS_TRUNCATED] += 1
+                break
+
+            # Give other tasks a chance to run during long loops.
+            if (self.parse_slice_links and count % self.parse_slice_links == 0) or (
+                self.parse_slice_ms
+                and (time.perf_counter() - slice_start) * 1000 >= self.parse_slice_ms
+            ):
+                await asyncio.sleep(0)
+                slice_start = time.perf_counter()
+
+            # Navigation links are often repeated on the same page, so drop them before any URL parsing.
+            key = (href, link_type)
+            if key in hrefs_seen:
+                duplicates += 1
+                continue
+            hrefs_seen.add(key)
+
+            if LinkFilter.is_prescreened_href(href, link_type):
+                prescreened += 1
+                continue
+
+            # Check each href for validity and queue priority, unless it has been checked on another page.
+            cache_key = (origin, href, link_type)
+            values = self._link_cache.get(cache_key)
+            if values is None:
+                values = link_filter.should_follow_link(href, link_type) or ()
+                self._link_cache.set(cache_key, values)
             if values:
                 url, priority = values
-                yield await self.follow(
+                new_request = await self.follow(
                     url, self.parse, response, priority=priority, allow_domain=True
                 )
+                if new_request:
+                    requests.append(new_request)
+
+        if record_stats:
+            self.stats[Stats.LINKS_DUPLICATE] += duplicates
+            self.stats[Stats.LINKS_PRESCREENED] += prescreened
+            self._stats_links_dropped.append(duplicates + prescreened)
+
+        return requests
 
     async def parse_site_meta(
         self, request: Request, response: Response
@@ -117,21 +391,133 @@ class FeedsearchSpider(Crawler):
         :param response: Response
         :return: AsyncGenerator yielding SiteMeta items
         """
+        # Site metadata only populates the site and favicon fields.
+        if not self.wants_field("site_name", "site_url", "favicon", "favicon_data_uri"):
+            return
+
         url_origin = response.url.origin()
         request_url_origin = request.url.origin()
 
         if response.url == url_origin or request.url == request_url_origin:
             yield self.site_meta_processor.parse_item(request, response)
 
-    async def parse_xml(self, response_text: str) -> Any:
+    async def parse_xml(self, response_text: str) -> HTMLDocument:
         """
-        Parse Response text as XML.
+        Parse Response text as HTML, using the configured HTML parser backend.
         Used to allow implementations to provide their own XML parser.
 
         :param response_text: Response text as string.
-        :return: None
+        :return: HTMLDocument
+        """
+        if self.discovery_only:
+            # Only the head is needed to find feed links, as no other links are followed.
+            body_start = self.find_body_start(response_text, self.max_content_length)
+            if body_start >= 0 and self.has_elements(response_text, 0, body_start):
+                response_text = response_text[:body_start]
+            return parse_html(response_text, self.html_backend, self.htmlparser)
+        if self.full_crawl or not self.head_only:
+            return parse_html(response_text, self.html_backend, self.htmlparser)
+        return self.parse_html_head(response_text)
+
+    def parse_html_head(self, response_text: str) -> HTMLDocument:
+        """
+        Parse only the head of an HTML page, and scan the body for feed-like hrefs without parsing it.
+
+        Feed discovery links, site metadata, and favicons are almost always in the head.
+        Falls back to parsing the whole page if neither the head nor the body scan found any possible feed links.
+
+        :param response_text: Response text as string.
+        :return: HTMLDocument
+        """
+        body_start = self.find_body_start(response_text, self.max_content_length)
+        # The body may be the first element, with nothing before it but a doctype, comments or whitespace.
+        if body_start < 0 or not self.has_elements(response_text, 0, body_start):
+            return parse_html(response_text, self.html_backend, self.htmlparser)
+
+        head = parse_html(
+            response_text[:body_start], self.html_backend, self.htmlparser
+        )
+        body_links = self.scan_feedlike_hrefs(
+            response_text, body_start, self.max_content_length
+        )
+
+        if body_links or any(
+            LinkFilter.is_feed_link_type(link_type) for _, link_type in head.links()
+        ):
+            return HeadDocument(head, body_links)
+
+        return parse_html(response_text, self.html_backend, self.htmlparser)
+
+    @staticmethod
+    def find_body_start(text: str, end: Optional[int] = None) -> int:
         """
-        return bs4.BeautifulSoup(response_text, self.htmlparser)
+        Find the start of the body tag in unparsed HTML.
+        Body tags inside comments and script or style elements are ignored.
+
+        :param text: HTML as string
+        :param end: Optional position in the text to stop scanning at
+        :return: Position of the body tag, or -1 if there is no body tag
+        """
+        for match in html_tag_regex.finditer(text, 0, end or len(text)):
+            tag, closed = match.group(2, 4)
+            if tag and closed and tag.lower() == "body":
+                return match.start()
+        return -1
+
+    @staticmethod
+    def has_elements(text: str, start: int = 0, end: Optional[int] = None) -> bool:
+        """
+        Check whether unparsed HTML contains any elements.
+        Doctypes, comments, and whitespace are not elements.
+
+        :param text: HTML as string
+        :param start: Position in the text to start scanning from
+        :param end: Optional position in the text to stop scanning at
+        :return: boolean
+        """
+        end = len(text) if end is None else end
+        for match in html_tag_regex.finditer(text, start, end):
+            if match.group(1) or match.group(2):
+                return True
+        return False
+
+    @staticmethod
+    def scan_feedlike_hrefs(
+        text: str, start: int = 0, end: Optional[int] = None
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Find the href and type attributes of tags in unparsed HTML that may link to a feed,
+        either because the href looks like a feed or because the type is a feed type.
+        Tags inside comments and script or style elements are ignored.
+
+        :param text: HTML as string
+        :param start: Position in the text to start scanning from
+        :param end: Optional position in the text to stop scanning at
+        :return: List of tuples of href and type
+        """
+        links = []
+        for match in html_tag_regex.finditer(text, start, end or len(text)):
+            attributes, closed = match.group(3, 4)
+            if not closed or not attributes or "href" not in attributes.lower():
+                continue
+
+            values = {}
+            for attribute in html_attribute_regex.finditer(attributes):
+                name = attribute.group(1).lower()
+                if name in ("href", "type") and name not in values:
+                    double, single, unquoted = attribute.group(2, 3, 4)
+                    value = double or single or unquoted or ""
+                    values[name] = html.unescape(value) if "&" in value else value
+
+            href = values.get("href")
+            if href is None:
+                continue
+            link_type = values.get("type")
+            if LinkFilter.is_feedlike_href(href) or LinkFilter.is_feed_link_type(
+                link_type
+            ):
+                links.append((href, link_type))
+        return links
 
     async def process_item(self, item: Item) -> None:
         """
@@ -141,7 +527,10 @@ class FeedsearchSpider(Crawler):
         :return: None
         """
         if isinstance(item, FeedInfo):
-            self.items.add(item)
+            if item.confidence < 1:
+                self.feed_candidates.add(item)
+            else:
+                self.items.add(item)
         elif isinstance(item, SiteMeta):
             self.site_metas.add(item)
         elif isinstance(item, Favicon):
@@ -163,6 +552,9 @@ class FeedsearchSpider(Crawler):
         """
         Populate FeedInfo site information with data from the relevant SiteMeta item
         """
+        # Candidates are only returned if their URL was not fetched and parsed as a feed.
+        self.items.update(self.feed_candidates)
+
         for feed in self.items:
             # Check each SiteMeta for a url host match
             site_meta = next(
@@ -298,13 +690,3 @@ class FeedsearchSpider(Crawler):
             crawl_start_urls.update(origins)
 
         return list(crawl_start_urls)
-
-    @staticmethod
-    def tag_has_href(tag: bs4.Tag) -> bool:
-        """
-        Find all tags that contain links.
-
-        :param tag: XML tag
-        :return: boolean
-        """
-        return tag.has_attr("href")
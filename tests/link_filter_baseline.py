@@ -0,0 +1,96 @@
+"""
+The original LinkFilter rule logic and the corpus of real-world href values it is compared on.
+Used by the LinkFilter tests and the link_filter benchmark.
+"""
+import pathlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from w3lib.url import url_query_cleaner
+from yarl import URL
+
+from feedsearch_crawler.crawler import Request
+from feedsearch_crawler.crawler.lib import parse_href_to_url
+from feedsearch_crawler.feed_spider.link_filter import (
+    feed_link_types,
+    invalid_filetypes,
+    invalid_querystring_keys,
+    invalid_url_contents,
+    low_priority_urls,
+)
+from feedsearch_crawler.feed_spider.regexes import (
+    feedlike_regex,
+    podcast_regex,
+    author_regex,
+    date_regex,
+)
+
+corpus_path = Path(__file__).parent / "data" / "links.txt"
+
+
+def read_corpus() -> List[str]:
+    with corpus_path.open(encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f]
+    return [line for line in lines if line and not line.startswith("# ")]
+
+
+def baseline_should_follow_link(
+    href: str, link_type: Optional[str] = None, full_crawl: bool = False
+) -> Optional[Tuple[URL, int]]:
+    """
+    The original LinkFilter.should_follow_link rule logic, before hrefs were classified with HrefFlags.
+    Kept as the reference that HrefFlags must match.
+    """
+    url = parse_href_to_url(href)
+    if not url:
+        return None
+
+    if (
+        link_type
+        and any(map(link_type.lower().count, feed_link_types))
+        and "json+oembed" not in link_type
+    ):
+        return url, 2
+
+    def is_href_matching(url_string: str, regex) -> bool:
+        return bool(regex.search(url_query_cleaner(url_string)))
+
+    def is_querystring_matching(regex) -> bool:
+        return any(regex.search(key) for key in url.query)
+
+    is_feedlike_href = is_href_matching(str(url), feedlike_regex)
+    is_feedlike_querystring = is_querystring_matching(feedlike_regex)
+    is_podcast_href = is_href_matching(str(url), podcast_regex)
+    is_podcast_querystring = is_querystring_matching(podcast_regex)
+    is_feedlike_url = is_feedlike_querystring or is_feedlike_href
+    is_podcast_url = is_podcast_href or is_podcast_querystring
+
+    if not full_crawl and not is_feedlike_url and not is_podcast_url:
+        return None
+
+    has_author_info = is_href_matching(href, author_regex)
+    is_low_priority = any(value in href.lower() for value in low_priority_urls) or bool(
+        date_regex.search(href)
+    )
+
+    priority = Request.default_priority
+    if is_low_priority:
+        priority = Request.default_priority + 2
+    if is_podcast_url:
+        priority = 5
+    if has_author_info:
+        priority = 4
+    if is_feedlike_url:
+        priority = 3
+
+    suffix = pathlib.Path(url_query_cleaner(href)).suffix.strip(".").lower()
+    follow = (
+        not any(value in href.lower() for value in invalid_url_contents)
+        and suffix not in invalid_filetypes
+        and not any(key in url.query for key in invalid_querystring_keys)
+    )
+    if follow and (full_crawl or is_feedlike_url or is_podcast_href):
+        if not is_feedlike_querystring:
+            url = url.with_query(None)
+        return url, priority
+    return None
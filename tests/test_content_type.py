@@ -0,0 +1,50 @@
+import pytest
+
+from feedsearch_crawler.feed_spider.lib import (
+    ParseTypes,
+    create_content_type,
+    parse_content_type,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", ("", {})),
+        ("text/xml", ("text/xml", {})),
+        ("text/html;charset=ISO-8859-1", ("text/html", {"charset": "ISO-8859-1"})),
+        (
+            'Application/RSS+XML; Charset="UTF-8"',
+            ("Application/RSS+XML", {"charset": "UTF-8"}),
+        ),
+        (" text/xml ; charset = utf-8", ("text/xml", {"charset": "utf-8"})),
+        ("text/xml; charset='utf-8'", ("text/xml", {"charset": "'utf-8'"})),
+        (
+            "application/atom+xml; charset=utf-8; type=feed",
+            ("application/atom+xml", {"charset": "utf-8", "type": "feed"}),
+        ),
+        ("xml", ("xml", {})),
+        ("foo/bar/baz", ("foo/bar/baz", {})),
+    ],
+)
+def test_parse_content_type(value, expected):
+    assert parse_content_type(value) == expected
+
+
+@pytest.mark.parametrize(
+    "parse_type, content_type, expected",
+    [
+        (ParseTypes.XML, "application/rss+xml", "application/rss+xml; charset=utf-8"),
+        (ParseTypes.XML, "Text/XML; charset=latin-1", "text/xml; charset=utf-8"),
+        (ParseTypes.XML, "text/html", "application/xml; charset=utf-8"),
+        (ParseTypes.XML, "", "application/xml; charset=utf-8"),
+        (
+            ParseTypes.JSON,
+            "application/feed+json",
+            "application/feed+json; charset=utf-8",
+        ),
+        (ParseTypes.JSON, "text/plain", "application/json; charset=utf-8"),
+    ],
+)
+def test_create_content_type(parse_type, content_type, expected):
+    assert create_content_type(parse_type, "UTF-8", content_type) == expected
@@ -0,0 +1,722 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from feedsearch_crawler.crawler.lib import Stats, LRUCache
+from feedsearch_crawler.crawler.request import Request
+from feedsearch_crawler.crawler.response import Response
+from feedsearch_crawler.feed_spider import FeedsearchSpider
+from feedsearch_crawler.feed_spider import spider as spider_module
+from feedsearch_crawler.feed_spider.feed_info import FeedInfo
+from feedsearch_crawler.feed_spider.feed_info_parser import FeedInfoParser
+from feedsearch_crawler.feed_spider.html_document import IncrementalLinkParser
+from feedsearch_crawler.feed_spider.site_meta_parser import SiteMetaParser
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Test Feed</title><link>http://example.com/</link>
+<description>Description</description>
+<item><title>Item</title><pubDate>Mon, 02 Jan 2006 15:04:05 -0700</pubDate></item>
+</channel></rss>"""
+
+
+def crawl(routes: dict, **kwargs) -> FeedsearchSpider:
+    """
+    Serve the routes from a local test server, and crawl the server root with a FeedsearchSpider.
+
+    :param routes: Dictionary of paths to aiohttp request handlers
+    :param kwargs: FeedsearchSpider keyword arguments
+    :return: FeedsearchSpider after the crawl
+    """
+
+    async def run() -> FeedsearchSpider:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            kwargs.setdefault("favicon_data_uri", False)
+            spider = FeedsearchSpider(delay=0, **kwargs)
+            await spider.crawl(str(server.make_url("/")))
+            return spider
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("incremental_parse", [False, True])
+def test_truncated_page_yields_head_links(incremental_parse):
+    head = (
+        "<html><head><title>Big page</title>"
+        '<link rel="alternate" type="application/rss+xml" href="/rss.xml">'
+        "</head><body>"
+    )
+    # The page is cut partway through a multi-byte character.
+    page = head + "<p>Café</p>" * 10000 + "</body></html>"
+    truncate_at = len(head.encode()) + len("<p>Caf".encode()) + 1
+
+    async def home(request):
+        return web.Response(text=page, content_type="text/html")
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    spider = crawl(
+        {"/": home, "/rss.xml": rss},
+        truncate_content_length=truncate_at,
+        incremental_parse=incremental_parse,
+    )
+
+    assert spider.stats[Stats.RESPONSES_TRUNCATED] == 1
+    assert [str(feed.url.path) for feed in spider.items] == ["/rss.xml"]
+
+
+def test_feed_over_max_content_length_is_not_truncated():
+    async def home(request):
+        return web.Response(
+            text='<link rel="alternate" type="application/rss+xml" href="/rss.xml">',
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    spider = crawl(
+        {"/": home, "/rss.xml": rss},
+        max_content_length=len(RSS) - 1,
+        truncate_content_length=10000,
+    )
+
+    assert spider.stats[Stats.RESPONSES_TRUNCATED] == 0
+    assert spider.stats[Stats.REQUESTS_FAILED] == 1
+    assert not spider.items
+
+
+def rss_with_self_url(title: str, self_url: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+        f"<title>{title}</title><description>Description</description>"
+        f'<atom:link rel="self" href="{self_url}"/>'
+        "<item><pubDate>Mon, 02 Jan 2006 15:04:05 -0700</pubDate></item>"
+        "</channel></rss>"
+    ).encode()
+
+
+def test_self_url_does_not_suppress_another_feed():
+    async def home(request):
+        return web.Response(
+            text='<link rel="alternate" type="application/rss+xml" href="/a.xml">'
+            '<a href="/blog">Blog</a>',
+            content_type="text/html",
+        )
+
+    async def blog(request):
+        return web.Response(text='<a href="/b.xml">Feed</a>', content_type="text/html")
+
+    async def feed_a(request):
+        # Feed A wrongly declares feed B as its self url.
+        body = rss_with_self_url("A", str(request.url.with_path("/b.xml")))
+        return web.Response(body=body, content_type="application/rss+xml")
+
+    async def feed_b(request):
+        body = rss_with_self_url("B", str(request.url))
+        return web.Response(body=body, content_type="application/rss+xml")
+
+    spider = crawl(
+        {"/": home, "/blog": blog, "/a.xml": feed_a, "/b.xml": feed_b},
+        concurrency=1,
+    )
+
+    assert sorted(feed.url.path for feed in spider.items) == ["/a.xml", "/b.xml"]
+
+
+def test_trailing_slash_variant_is_not_fetched_or_seen():
+    async def home(request):
+        return web.Response(
+            text='<link rel="alternate" type="application/rss+xml" href="/feed/">'
+            '<a href="/blog">Blog</a>',
+            content_type="text/html",
+        )
+
+    async def blog(request):
+        return web.Response(text='<a href="/feed">Feed</a>', content_type="text/html")
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    spider = crawl(
+        {"/": home, "/blog": blog, "/feed/": rss, "/feed": rss}, concurrency=1
+    )
+
+    assert [feed.url.path for feed in spider.items] == ["/feed/"]
+    seen_urls = spider._duplicate_filter.fingerprints.values()
+    seen_paths = [URL(url).path for url in seen_urls]
+    assert "/feed" not in seen_paths
+    assert spider.stats[Stats.URLS_SEEN] == len(seen_paths)
+
+
+def test_queued_alias_request_is_dropped():
+    fetched = []
+
+    async def home(request):
+        # All the links are queued before any are fetched. The typed links have the highest priority.
+        return web.Response(
+            text='<link rel="alternate" type="application/rss+xml" href="/feed/">'
+            '<link rel="alternate" type="application/rss+xml" href="/slow.xml">'
+            '<a href="/feed">Feed</a>',
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        fetched.append(request.path)
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    async def slow_rss(request):
+        # Keep the other worker busy while /feed/ is parsed and /feed is taken from the queue.
+        await asyncio.sleep(0.3)
+        return await rss(request)
+
+    routes = {"/": home, "/feed/": rss, "/feed": rss, "/slow.xml": slow_rss}
+    spider = crawl(routes, concurrency=1)
+
+    assert sorted(feed.url.path for feed in spider.items) == ["/feed/", "/slow.xml"]
+    # The Request to /feed was queued, then dropped once /feed/ was parsed.
+    assert "/feed" in seen_paths(spider)
+    assert "/feed" not in fetched
+    assert spider.stats[Stats.ALIAS_REQUESTS_DROPPED] == 1
+
+
+def test_feed_aliases_are_same_host_redirects():
+    url = URL("https://example.com/feed/")
+    response = Response(
+        url=url,
+        method="GET",
+        redirect_history=[
+            SimpleNamespace(url=URL("http://example.com/rss")),
+            SimpleNamespace(url=URL("https://feeds.example.net/example")),
+            SimpleNamespace(url=url),
+        ],
+    )
+    item = FeedInfo(url=url, self_url=URL("https://example.com/other.xml"))
+
+    aliases = FeedInfoParser.feed_aliases(item, response)
+
+    assert aliases == [url, URL("http://example.com/rss")]
+    assert FeedInfoParser.trailing_slash_variants(aliases) == [
+        URL("https://example.com/feed"),
+        URL("http://example.com/rss/"),
+    ]
+
+
+def feed_routes(feed: bytes, *paths: str) -> dict:
+    """
+    Routes of a home page that links to the same feed served at each path.
+    """
+
+    async def home(request):
+        links = "".join(
+            f'<link rel="alternate" type="application/rss+xml" href="{path}">'
+            for path in paths
+        )
+        return web.Response(text=links, content_type="text/html")
+
+    async def rss(request):
+        return web.Response(body=feed, content_type="application/rss+xml")
+
+    routes = {"/": home}
+    routes.update((path, rss) for path in paths)
+    return routes
+
+
+def test_feed_cache_hit_validates_self_url():
+    # The relative self url is resolved against each feed URL, even on a cache hit.
+    feed = rss_with_self_url("Feed", "rss.xml")
+    spider = crawl(feed_routes(feed, "/a/rss.xml", "/b/rss.xml"), concurrency=1)
+
+    assert spider.stats[Stats.FEED_CACHE_MISSES] == 1
+    assert spider.stats[Stats.FEED_CACHE_HITS] == 1
+    items = sorted(spider.items, key=lambda feed_info: str(feed_info.url))
+    assert [item.url.path for item in items] == ["/a/rss.xml", "/b/rss.xml"]
+    assert [item.self_url for item in items] == [item.url for item in items]
+    assert items[0].title == items[1].title == "Feed"
+    assert items[0].last_updated == items[1].last_updated is not None
+
+
+def test_feed_cache_disabled(monkeypatch):
+    monkeypatch.setattr(FeedsearchSpider, "feed_cache_size", 0)
+    spider = crawl(feed_routes(RSS, "/a/rss.xml", "/b/rss.xml"))
+
+    assert spider.feed_cache is None
+    assert len(spider.items) == 2
+    assert spider.stats[Stats.FEED_CACHE_HITS] == 0
+    assert spider.stats[Stats.FEED_CACHE_MISSES] == 0
+
+
+def test_shared_feed_cache_between_searches_with_different_fields():
+    cache = LRUCache(10)
+    routes = feed_routes(RSS, "/rss.xml")
+
+    titles_only = crawl(routes, feed_cache=cache, fields=["title"])
+    assert titles_only.stats[Stats.FEED_CACHE_MISSES] == 1
+    [item] = titles_only.items
+    assert item.title == "Test Feed"
+    assert item.last_updated is None
+
+    # A search for other fields must not reuse the result of the title-only search.
+    all_fields = crawl(routes, feed_cache=cache)
+    assert all_fields.stats[Stats.FEED_CACHE_MISSES] == 1
+    assert all_fields.stats[Stats.FEED_CACHE_HITS] == 0
+    [item] = all_fields.items
+    assert item.last_updated is not None
+
+    for fields in (["title"], None):
+        spider = crawl(routes, feed_cache=cache, fields=fields)
+        assert spider.stats[Stats.FEED_CACHE_HITS] == 1
+        assert spider.stats[Stats.FEED_CACHE_MISSES] == 0
+        assert [item.title for item in spider.items] == ["Test Feed"]
+    assert len(cache) == 2
+
+
+def site_routes() -> dict:
+    """
+    Routes of a site with feed links in the page heads and bodies, and long pages that
+    are downloaded in many chunks.
+    """
+    filler = "<p>Text</p>" * 5000
+
+    async def home(request):
+        return web.Response(
+            text="<html><head><title>Site</title>"
+            '<link rel="alternate" type="application/rss+xml" href="/rss.xml">'
+            '<link rel="alternate" type="application/atom+xml" href="/atom.xml">'
+            '<link rel="stylesheet" href="/style.css">'
+            f'</head><body>{filler}<a href="/blog">Blog</a><a href="/about">About</a>'
+            '<a href="/feed.json">JSON</a></body></html>',
+            content_type="text/html",
+        )
+
+    async def blog(request):
+        return web.Response(
+            text="<html><head>"
+            '<link rel="alternate" type="application/rss+xml" href="/blog/rss.xml">'
+            f'</head><body>{filler}<a href="/podcast/rss">Podcast</a></body></html>',
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    async def json_feed(request):
+        return web.json_response(
+            {
+                "version": "https://jsonfeed.org/version/1.1",
+                "title": "JSON",
+                "feed_url": str(request.url),
+                "items": [{"id": "1", "content_text": "Item"}],
+            }
+        )
+
+    async def not_found(request):
+        return web.Response(status=404)
+
+    routes = {"/": home, "/blog": blog, "/feed.json": json_feed}
+    routes.update((path, rss) for path in ("/rss.xml", "/atom.xml", "/blog/rss.xml"))
+    routes.update((path, not_found) for path in ("/about", "/podcast/rss"))
+    return routes
+
+
+def seen_paths(spider: FeedsearchSpider) -> list:
+    urls = spider._duplicate_filter.fingerprints.values()
+    return sorted(URL(url).path for url in urls)
+
+
+def test_incremental_parse_matches_full_parse():
+    spiders = [
+        crawl(site_routes(), incremental_parse=incremental_parse)
+        for incremental_parse in (False, True)
+    ]
+
+    full, incremental = spiders
+    assert sorted(feed.url.path for feed in incremental.items) == sorted(
+        feed.url.path for feed in full.items
+    )
+    assert len(full.items) == 4
+    assert seen_paths(incremental) == seen_paths(full)
+
+
+def test_incremental_parse_stops_after_head(monkeypatch):
+    chunks = []
+    parse_chunk = FeedsearchSpider.parse_chunk
+
+    def record_chunk(self, request, response, chunk):
+        chunks.append((request.url.path, len(chunk)))
+        return parse_chunk(self, request, response, chunk)
+
+    monkeypatch.setattr(FeedsearchSpider, "parse_chunk", record_chunk)
+    spider = crawl(site_routes(), incremental_parse=True)
+
+    assert len(spider.items) == 4
+    # The heads of the HTML pages are in their first chunks. Feeds are not HTML.
+    paths = [path for path, _ in chunks]
+    for path in ("/", "/blog", "/rss.xml", "/atom.xml", "/blog/rss.xml", "/feed.json"):
+        assert paths.count(path) == 1, path
+    assert all(length for _, length in chunks)
+    assert spider._incremental_parsers == {}
+
+
+def test_incremental_parse_counts_dropped_links_once():
+    filler = "<p>Text</p>" * 5000
+
+    async def home(request):
+        return web.Response(
+            text="<html><head>"
+            '<link rel="alternate" type="application/rss+xml" href="/rss.xml">'
+            '<link rel="alternate" type="application/rss+xml" href="/rss.xml">'
+            '<link rel="alternate" type="application/rss+xml" href="#rss">'
+            f"</head><body>{filler}</body></html>",
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    routes = {"/": home, "/rss.xml": rss}
+    full, incremental = [
+        crawl(routes, incremental_parse=incremental_parse)
+        for incremental_parse in (False, True)
+    ]
+
+    # The head links are found while downloading and again when the whole page is parsed.
+    assert full.stats[Stats.LINKS_DUPLICATE] == 1
+    assert full.stats[Stats.LINKS_PRESCREENED] == 1
+    for stat in (Stats.LINKS_PRESCREENED, Stats.LINKS_DUPLICATE):
+        assert incremental.stats[stat] == full.stats[stat], stat
+    assert incremental._stats_links_dropped == full._stats_links_dropped == [2]
+
+
+def fetch(handler, chunk_callback, fetches: int = 1) -> list:
+    """
+    Fetch a Request from a local test server one or more times.
+
+    :param handler: aiohttp request handler of the server root
+    :param chunk_callback: Request chunk callback
+    :param fetches: Number of times to fetch the Request
+    :return: List of Responses
+    """
+
+    async def run() -> list:
+        app = web.Application()
+        app.router.add_get("/", handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                request = Request(
+                    server.make_url("/"), session, chunk_callback=chunk_callback
+                )
+                return [(await request.fetch_callback())[1] for _ in range(fetches)]
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+async def html_page(request):
+    return web.Response(text="<html><head></head><body>Page</body></html>")
+
+
+def test_chunk_callback_errors_are_logged(caplog):
+    async def failing_callback(request, response, chunk):
+        raise ValueError("bad chunk")
+
+    with caplog.at_level(logging.ERROR, logger="feedsearch_crawler.crawler.request"):
+        (response,) = fetch(html_page, failing_callback)
+
+    # The Request doesn't fail.
+    assert response.ok
+    assert response.data.startswith(b"<html>")
+    assert "Chunk callback failed" in caplog.text
+    assert str(response.url) in caplog.text
+    assert "bad chunk" in caplog.text
+
+
+def test_chunk_callback_restarts_on_each_fetch():
+    chunks = []
+
+    async def stopping_callback(request, response, chunk):
+        chunks.append(chunk)
+        request.stop_chunk_callback()
+
+    responses = fetch(html_page, stopping_callback, fetches=2)
+
+    assert all(response.ok for response in responses)
+    # Each fetch passes its first chunk, and no end of download chunk once stopped.
+    assert len(chunks) == 2
+    assert all(chunk.startswith(b"<html>") for chunk in chunks)
+
+
+def test_incremental_parse_only_html(monkeypatch):
+    created = []
+
+    class RecordingParser(IncrementalLinkParser):
+        __slots__ = ()
+
+        def __init__(self, encoding=None):
+            created.append(encoding)
+            super().__init__(encoding)
+
+    monkeypatch.setattr(spider_module, "IncrementalLinkParser", RecordingParser)
+    spider = crawl(site_routes(), incremental_parse=True)
+
+    # Only the home page and blog page are parsed while downloading.
+    assert len(created) == 2
+    assert len(spider.items) == 4
+
+
+def test_feeds_are_not_decoded_as_text(monkeypatch):
+    decoded = []
+    decode_text = Response._decode_text
+
+    def record_decode(self):
+        decoded.append(self.url.path)
+        return decode_text(self)
+
+    monkeypatch.setattr(Response, "_decode_text", record_decode)
+    spider = crawl(site_routes())
+
+    assert len(spider.items) == 4
+    # XML feeds are parsed from bytes. JSON feeds are decoded once, to be read as JSON.
+    assert sorted(decoded) == ["/", "/blog", "/feed.json"]
+
+
+def test_non_feed_json_is_not_a_feed():
+    async def home(request):
+        return web.Response(
+            text='<link rel="alternate" type="application/json" href="/data.json">'
+            '<link rel="alternate" type="application/rss+xml" href="/rss.xml">',
+            content_type="text/html",
+        )
+
+    async def data(request):
+        return web.json_response({"data": [1, 2, 3], "items": [{"id": "1"}]})
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    spider = crawl({"/": home, "/data.json": data, "/rss.xml": rss})
+
+    assert "/data.json" in seen_paths(spider)
+    assert [feed.url.path for feed in spider.items] == ["/rss.xml"]
+
+
+def discovery_routes() -> dict:
+    async def home(request):
+        return web.Response(
+            text="<html><head><title>Site</title>"
+            '<link rel="icon" href="/favicon.png">'
+            '<link rel="alternate" type="application/rss+xml" href="/rss.xml">'
+            '<link rel="alternate" type="application/atom+xml" href="/atom.xml">'
+            '<link rel="alternate" type="application/feed+json" href="/feed.json">'
+            '<link rel="alternate" type="application/rdf+xml" href="/index.rdf">'
+            '<link rel="alternate" type="application/x-rss+xml" href="/x-rss">'
+            '<link rel="alternate" type="application/json" href="/feeds/json">'
+            '<link rel="alternate" type="application/json" href="/api/page?id=1">'
+            '<link rel="alternate" href="/untyped.xml">'
+            '<link rel="alternate" type="text/html" hreflang="fr" href="/fr/">'
+            '<link rel="alternate" type="application/json+oembed" href="/oembed">'
+            "</head><body>"
+            '<a href="/feed">Feed</a><a href="/blog/rss.xml">RSS</a></body></html>',
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    routes = {"/": home}
+    routes.update(
+        (path, rss)
+        for path in ("/rss.xml", "/atom.xml", "/untyped.xml", "/feed", "/blog/rss.xml")
+    )
+    return routes
+
+
+def test_discovery_only_returns_typed_alternate_links():
+    spider = crawl(discovery_routes(), discovery_only=True, favicon_data_uri=True)
+
+    confidence = {str(feed.url.relative()): feed.confidence for feed in spider.items}
+    assert confidence == {
+        "/rss.xml": 0.9,
+        "/atom.xml": 0.9,
+        "/feed.json": 0.9,
+        "/index.rdf": 0.7,
+        "/x-rss": 0.5,
+        "/feeds/json": 0.4,
+        "/api/page?id=1": 0.2,
+    }
+    # Only the start URL is fetched. Candidates, body links, and favicons are not.
+    assert seen_paths(spider) == ["/"]
+    assert not any(favicon.data_uri for favicon in spider.favicons.values())
+
+
+def test_discovery_only_parses_feed_start_url():
+    spider = crawl(discovery_routes(), discovery_only=True)
+    assert seen_paths(spider) == ["/"]
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    spider = crawl({"/": rss}, discovery_only=True)
+    assert [(feed.url.path, feed.confidence) for feed in spider.items] == [("/", 1.0)]
+
+
+def test_crawl_without_discovery_only_fetches_candidates():
+    spider = crawl(discovery_routes(), favicon_data_uri=True)
+
+    assert {feed.confidence for feed in spider.items} == {1.0}
+    assert {"/rss.xml", "/atom.xml", "/favicon.png"} <= set(seen_paths(spider))
+
+
+def test_empty_fields_still_return_url():
+    spider = crawl(site_routes(), fields=[], favicon_data_uri=True)
+
+    assert sorted(feed.url.path for feed in spider.items) == [
+        "/atom.xml",
+        "/blog/rss.xml",
+        "/feed.json",
+        "/rss.xml",
+    ]
+    for feed in spider.items:
+        serialized = feed.serialize()
+        assert serialized["url"] == str(feed.url)
+        assert serialized["last_updated"] == ""
+        assert serialized["site_name"] == ""
+        assert serialized["favicon"] == ""
+    assert spider.site_metas == set()
+    assert spider.favicons == {}
+
+
+@pytest.mark.parametrize(
+    "fields, parses_site_meta",
+    [
+        (["url", "title", "score", "velocity", "is_podcast"], False),
+        (["site_name"], True),
+        (["site_url"], True),
+        (["favicon"], True),
+        (["favicon_data_uri"], True),
+        (None, True),
+    ],
+)
+def test_site_meta_only_parsed_for_site_fields(monkeypatch, fields, parses_site_meta):
+    parsed = []
+    parse_item = SiteMetaParser.parse_item
+
+    def record_parse(self, request, response, *args, **kwargs):
+        parsed.append(response.url.path)
+        return parse_item(self, request, response, *args, **kwargs)
+
+    monkeypatch.setattr(SiteMetaParser, "parse_item", record_parse)
+    spider = crawl(site_routes(), fields=fields)
+
+    assert len(spider.items) == 4
+    assert bool(parsed) == parses_site_meta
+    assert bool(spider.site_metas) == parses_site_meta
+    site_names = {feed.site_name for feed in spider.items}
+    assert site_names == ({"Site"} if fields in (["site_name"], None) else {""})
+
+
+def test_links_dropped_per_page_stats():
+    async def home(request):
+        return web.Response(
+            text="<html><head><title>Site</title></head><body>"
+            '<a href="mailto:me@example.com">Mail</a><a href="#top">Top</a>'
+            '<a href="/logo.png">Logo</a><a href="/podcast">Podcast</a>'
+            '<a href="/podcast">Podcast</a></body></html>',
+            content_type="text/html",
+        )
+
+    async def podcast(request):
+        return web.Response(
+            text="<html><head></head><body>"
+            '<a href="/rss.xml">RSS</a><a href="/rss.xml">RSS</a></body></html>',
+            content_type="text/html",
+        )
+
+    async def rss(request):
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    routes = {"/": home, "/podcast": podcast, "/rss.xml": rss}
+    spider = crawl(routes, head_only=False)
+    stats = spider.stats
+
+    assert [feed.url.path for feed in spider.items] == ["/rss.xml"]
+    assert stats[Stats.LINKS_PRESCREENED] == 3
+    assert stats[Stats.LINKS_DUPLICATE] == 2
+    # The home page drops 4 links and the podcast page drops 1.
+    assert sorted(spider._stats_links_dropped) == [1, 4]
+    assert stats[Stats.LINKS_DROPPED_PER_PAGE_MAX] == 4
+    assert stats[Stats.LINKS_DROPPED_PER_PAGE_AVG] == 2
+
+
+@pytest.mark.parametrize("inline_callbacks", [False, True])
+def test_batched_requests_stats(inline_callbacks):
+    spider = crawl(site_routes(), inline_callbacks=inline_callbacks)
+    stats = spider.stats
+
+    assert len(spider.items) == 4
+    # The links from the home page and blog page are queued as two batches.
+    assert stats[Stats.REQUESTS_BATCHED] == len(seen_paths(spider)) - 1
+    if inline_callbacks:
+        # No CallbackResults are queued inline, so batching saves no queue operations.
+        assert spider._stats_queue_ops_saved == []
+        assert stats[Stats.QUEUE_OPS_SAVED] == 0
+        assert stats[Stats.QUEUE_OPS_SAVED_MAX] == 0
+        assert stats[Stats.QUEUE_OPS_SAVED_AVG] == 0
+    else:
+        assert stats[Stats.QUEUE_OPS_SAVED] == stats[Stats.REQUESTS_BATCHED] * 2
+        assert stats[Stats.QUEUE_OPS_SAVED_MAX] == max(spider._stats_queue_ops_saved)
+        assert len(spider._stats_queue_ops_saved) == 2
+    assert stats[Stats.REQUESTS_QUEUED] == len(seen_paths(spider))
+
+
+@pytest.mark.parametrize(
+    "fields, first_item_only",
+    [
+        (None, False),
+        (["url"], True),
+        (["url", "item_count"], False),
+        (["title"], False),
+    ],
+)
+def test_json_feed_first_item_only(monkeypatch, fields, first_item_only):
+    calls = []
+    parse_json_feed = spider_module.parse_json_feed
+
+    def record_parse(text, **kwargs):
+        calls.append(kwargs["first_item_only"])
+        return parse_json_feed(text, **kwargs)
+
+    monkeypatch.setattr(spider_module, "parse_json_feed", record_parse)
+
+    async def json_feed(request):
+        items = [{"id": str(i), "content_text": "Item"} for i in range(5)]
+        return web.json_response(
+            {
+                "version": "https://jsonfeed.org/version/1.1",
+                "title": "JSON",
+                "items": items,
+            }
+        )
+
+    spider = crawl({"/": json_feed}, fields=fields)
+
+    assert calls == [first_item_only]
+    [item] = spider.items
+    assert item.item_count == (1 if first_item_only else 5)
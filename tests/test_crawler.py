@@ -0,0 +1,220 @@
+import asyncio
+from collections import Counter
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from feedsearch_crawler.crawler import Crawler, Item, Request, CallbackResult
+from feedsearch_crawler.crawler.lib import CrawlerPriorityQueue, Stats
+
+
+class NamedItem(Item):
+    name = ""
+
+    def __repr__(self):
+        return f"NamedItem({self.name})"
+
+
+class RecordingCrawler(Crawler):
+    """
+    Crawler that records processed Items, and records Requests taken off the queue
+    instead of fetching them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.processed = []
+        self.fetched = []
+
+    async def parse(self, request, response):
+        pass
+
+    async def parse_xml(self, response_text):
+        pass
+
+    async def process_item(self, item):
+        self.processed.append(item.name)
+
+    async def run(self, result) -> "RecordingCrawler":
+        """
+        Process a callback result, then take each value off the queue as the workers do.
+
+        :param result: Function that creates the callback result from the Crawler
+        """
+        self._request_queue = CrawlerPriorityQueue()
+        async with aiohttp.ClientSession() as self._session:
+            await self._process_request_callback_result(result(self), 0)
+            while not self._request_queue.empty():
+                value = self._request_queue.get_nowait()
+                if isinstance(value, CallbackResult):
+                    await self._process_request_callback_result(
+                        value.result, value.callback_recursion
+                    )
+                elif isinstance(value, Request):
+                    self.fetched.append(value.url.path)
+                self._request_queue.task_done()
+        return self
+
+
+def request(
+    crawler: Crawler, path: str, priority: int = Request.default_priority
+) -> Request:
+    req = Request(URL("http://example.com").with_path(path), crawler._session)
+    req.priority = priority
+    return req
+
+
+async def item(name: str) -> NamedItem:
+    await asyncio.sleep(0)
+    return NamedItem(name=name)
+
+
+async def fail(name: str) -> NamedItem:
+    await asyncio.sleep(0)
+    raise RuntimeError(name)
+
+
+async def nested(crawler, depth: int):
+    yield NamedItem(name=f"item-{depth}")
+    yield request(crawler, f"/request-{depth}")
+    yield item(f"coroutine-{depth}")
+    if depth < 3:
+        yield nested(crawler, depth + 1)
+    yield [
+        request(crawler, f"/batch-{depth}-a"),
+        request(crawler, f"/batch-{depth}-b"),
+    ]
+    yield None
+
+
+async def failing_generator(crawler):
+    yield NamedItem(name="before-error")
+    yield nested(crawler, 1)
+    raise RuntimeError("generator")
+
+
+async def generator_from_coroutine(crawler):
+    return nested(crawler, 2)
+
+
+async def results(crawler):
+    yield NamedItem(name="first")
+    yield nested(crawler, 0)
+    yield failing_generator(crawler)
+    yield fail("coroutine")
+    yield generator_from_coroutine(crawler)
+    yield (request(crawler, "/tuple-a"), request(crawler, "/tuple-b"))
+    yield NamedItem(name="last")
+
+
+async def deep(crawler, depth: int):
+    yield NamedItem(name=f"deep-{depth}")
+    yield request(crawler, f"/deep-{depth}")
+    yield deep(crawler, depth + 1)
+
+
+def start_deep(crawler):
+    return deep(crawler, 0)
+
+
+def run_crawler(result, inline_callbacks: bool) -> RecordingCrawler:
+    crawler = RecordingCrawler(inline_callbacks=inline_callbacks)
+    return asyncio.run(crawler.run(result))
+
+
+@pytest.mark.parametrize("result", [results, start_deep])
+def test_inline_callbacks_match_queued_callbacks(result):
+    queued = run_crawler(result, inline_callbacks=False)
+    inline = run_crawler(result, inline_callbacks=True)
+
+    assert queued.processed
+    assert Counter(inline.processed) == Counter(queued.processed)
+    assert Counter(inline.fetched) == Counter(queued.fetched)
+    for stat in (Stats.ITEMS_PROCESSED, Stats.REQUESTS_QUEUED, Stats.REQUESTS_BATCHED):
+        assert inline.stats[stat] == queued.stats[stat], stat
+    # Only Requests are put on the queue when callbacks are processed inline.
+    assert inline.stats[Stats.QUEUED_TOTAL] == inline.stats[Stats.REQUESTS_QUEUED]
+    assert queued.stats[Stats.QUEUED_TOTAL] > queued.stats[Stats.REQUESTS_QUEUED]
+
+
+def test_callback_results():
+    crawler = run_crawler(results, inline_callbacks=True)
+
+    assert Counter(crawler.processed) == Counter(
+        ["first", "before-error", "last"]
+        + [f"item-{depth}" for depth in (0, 1, 2, 3, 1, 2, 3, 2, 3)]
+        + [f"coroutine-{depth}" for depth in (0, 1, 2, 3, 1, 2, 3, 2, 3)]
+    )
+    # Values yielded before an exception are kept, and the exception doesn't stop the
+    # parent generator.
+    assert crawler.processed[-1] == "last"
+    assert sorted(set(crawler.fetched)) == sorted(
+        [f"/request-{depth}" for depth in range(4)]
+        + [f"/batch-{depth}-{x}" for depth in range(4) for x in "ab"]
+        + ["/tuple-a", "/tuple-b"]
+    )
+
+
+def test_callback_recursion_limit():
+    for inline_callbacks in (False, True):
+        crawler = run_crawler(start_deep, inline_callbacks=inline_callbacks)
+        # Values of the generator at the recursion limit are not processed.
+        depths = range(crawler.max_callback_recursion - 1)
+        assert sorted(crawler.processed) == [f"deep-{depth}" for depth in depths]
+        assert sorted(crawler.fetched) == [f"/deep-{depth}" for depth in depths]
+
+
+async def batches(crawler):
+    yield request(crawler, "/single-100")
+    yield [
+        request(crawler, "/batch-1-3a", 3),
+        request(crawler, "/batch-1-2a", 2),
+        request(crawler, "/batch-1-100", 100),
+        request(crawler, "/batch-1-3b", 3),
+        request(crawler, "/batch-1-2b", 2),
+    ]
+    yield request(crawler, "/single-3", 3)
+    yield []
+    # Values that are not Requests are dropped from a batch.
+    yield (request(crawler, "/batch-2-3", 3), None, NamedItem(name="not-queued"))
+    yield [request(crawler, "/batch-3-100", 100), request(crawler, "/batch-3-2", 2)]
+
+
+def test_batched_requests_are_fifo_within_priority():
+    crawler = run_crawler(batches, inline_callbacks=True)
+
+    assert crawler.fetched == [
+        "/batch-1-2a",
+        "/batch-1-2b",
+        "/batch-3-2",
+        "/batch-1-3a",
+        "/batch-1-3b",
+        "/single-3",
+        "/batch-2-3",
+        "/single-100",
+        "/batch-1-100",
+        "/batch-3-100",
+    ]
+    assert crawler.processed == []
+
+    # Queued callback results are processed before Requests. Batches keep their order.
+    queued = run_crawler(batches, inline_callbacks=False)
+    assert [path for path in queued.fetched if path.startswith("/batch")] == [
+        path for path in crawler.fetched if path.startswith("/batch")
+    ]
+
+
+@pytest.mark.parametrize("inline_callbacks", [False, True])
+def test_batched_requests_stats(inline_callbacks):
+    crawler = run_crawler(batches, inline_callbacks=inline_callbacks)
+
+    assert crawler.stats[Stats.REQUESTS_QUEUED] == 10
+    assert crawler.stats[Stats.REQUESTS_BATCHED] == 8
+    # Each batched Request saves putting and getting a CallbackResult on the queue,
+    # unless callback results are processed inline and never queued.
+    queue_ops_saved = [] if inline_callbacks else [10, 2, 4]
+    assert crawler._stats_queue_ops_saved == queue_ops_saved
+    # Single Requests are queued as callback results first, unless processed inline.
+    callback_results = 0 if inline_callbacks else 2
+    assert crawler.stats[Stats.QUEUED_TOTAL] == 10 + callback_results
@@ -0,0 +1,165 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from statistics import mean
+from typing import List
+
+import pytest
+from yarl import URL
+
+from feedsearch_crawler.feed_spider.feed_info import FeedInfo
+from feedsearch_crawler.feed_spider.feed_info_parser import FeedInfoParser
+from feedsearch_crawler.feed_spider.lib import DateWindow
+from feedsearch_crawler.feed_spider.spider import FeedsearchSpider
+
+start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+end = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def old_entry_velocity(dates: List[datetime]) -> float:
+    """
+    Velocity as calculated before DateWindow, from the sorted list of every entry date.
+    """
+    if not dates or len(dates) < 3:
+        return 0
+
+    dates = sorted(dates)
+    deltas = []
+    previous_date = dates[0]
+    for current_date in dates[1:]:
+        if current_date == previous_date:
+            continue
+        deltas.append((current_date - previous_date).total_seconds())
+        previous_date = current_date
+
+    if not deltas:
+        return 0
+    return round(86400 / mean(deltas), 3)
+
+
+def irregular_dates(count: int) -> List[datetime]:
+    """
+    Dates up to the end date that are posted more often over time, in random order,
+    with some duplicates.
+    """
+    random.seed(count)
+    dates = []
+    date = end
+    for i in range(count):
+        dates.append(date)
+        date -= timedelta(hours=random.randint(1, 48) * (1 + i // 5))
+    dates += random.sample(dates, count // 10)
+    random.shuffle(dates)
+    return dates
+
+
+def window_of(dates: List[datetime], size: int) -> DateWindow:
+    window = DateWindow(size)
+    for date in dates:
+        window.add(date)
+    return window
+
+
+def test_empty_window():
+    window = DateWindow(10)
+    assert window.latest is None
+    assert window.count == 0
+    assert window.velocity() == 0
+
+
+def test_latest_is_independent_of_order():
+    dates = [start + timedelta(days=day) for day in range(20)]
+    for order in (dates, list(reversed(dates)), random.Random(1).sample(dates, 20)):
+        window = window_of(order, 5)
+        assert window.latest == dates[-1]
+        assert window.count == 20
+
+
+def test_keeps_most_recent_distinct_dates():
+    dates = irregular_dates(50)
+    window = window_of(dates, 10)
+
+    assert sorted(window._heap) == sorted(set(dates))[-10:]
+    assert window._seen == set(window._heap)
+
+
+def test_evicts_oldest_date():
+    window = window_of([start + timedelta(days=day) for day in range(3)], 3)
+
+    window.add(start + timedelta(days=10))
+    assert sorted(window._heap) == [
+        start + timedelta(days=1),
+        start + timedelta(days=2),
+        start + timedelta(days=10),
+    ]
+    assert start not in window._seen
+
+    # Dates older than the whole window are counted, but not kept.
+    window.add(start - timedelta(days=1))
+    assert window.count == 5
+    assert min(window._heap) == start + timedelta(days=1)
+
+
+def test_duplicate_dates():
+    day = timedelta(days=1)
+    window = window_of([start, start, start + day, start + day, start + 2 * day], 10)
+
+    assert window.count == 5
+    assert sorted(window._heap) == [start, start + day, start + 2 * day]
+    assert window.velocity() == 1
+
+    # A duplicate of an evicted date does not re-enter the window.
+    window = window_of([start, start + day, start + 2 * day, start], 2)
+    assert sorted(window._heap) == [start + day, start + 2 * day]
+
+
+def test_duplicates_only_velocity():
+    assert window_of([start] * 5, 10).velocity() == 0
+    assert old_entry_velocity([start] * 5) == 0
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 10, 99, 100])
+def test_velocity_matches_old_within_window_size(count):
+    dates = irregular_dates(count)
+    assert window_of(dates, 100).velocity() == old_entry_velocity(dates)
+    assert FeedInfoParser.entry_velocity(dates) == old_entry_velocity(dates)
+
+
+@pytest.mark.parametrize("count", [101, 150, 500])
+def test_velocity_over_window_size(count):
+    dates = irregular_dates(count)
+    most_recent = sorted(set(dates))[-100:]
+
+    # The window only measures the most recent distinct dates.
+    assert window_of(dates, 100).velocity() == old_entry_velocity(most_recent)
+    assert window_of(dates, 100).velocity() > old_entry_velocity(dates)
+    # entry_velocity uses a window as large as its list of dates.
+    assert FeedInfoParser.entry_velocity(dates) == old_entry_velocity(dates)
+
+
+def rss_feed(dates: List[datetime]) -> bytes:
+    items = "".join(
+        f"<item><pubDate>{format_datetime(date)}</pubDate></item>" for date in dates
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Feed</title><description>Description</description>{items}"
+        "</channel></rss>"
+    ).encode()
+
+
+@pytest.mark.parametrize("window_size,recent", [(100, 100), (1000, None)])
+def test_feed_velocity(window_size, recent):
+    dates = irregular_dates(150)
+    parser = FeedInfoParser(FeedsearchSpider())
+    parser.date_window_size = window_size
+    item = FeedInfo(url=URL("https://example.com/feed"))
+
+    assert parser.parse_xml(
+        item, rss_feed(dates), "utf-8", {"content-type": "application/rss+xml"}
+    )
+
+    distinct_dates = sorted(set(dates))
+    assert item.item_count == len(dates)
+    assert item.last_updated == distinct_dates[-1]
+    assert item.velocity == old_entry_velocity(distinct_dates[-(recent or 0) :])
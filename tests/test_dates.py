@@ -0,0 +1,85 @@
+import warnings
+from pathlib import Path
+from typing import List
+
+import pytest
+from dateutil import parser
+
+from feedsearch_crawler.feed_spider.lib import (
+    datestring_to_utc_datetime,
+    force_utc,
+    parse_iso8601_date,
+    parse_rfc822_date,
+)
+
+dates_path = Path(__file__).parent / "data" / "dates"
+
+
+def read_dates(name: str) -> List[str]:
+    lines = (dates_path / f"{name}.txt").read_text().splitlines()
+    return [line for line in lines if line and not line.startswith("# ")]
+
+
+rfc822_dates = read_dates("rfc822")
+iso8601_dates = read_dates("iso8601")
+other_dates = read_dates("other")
+
+
+def dateutil_utc(date_string: str):
+    with warnings.catch_warnings():
+        # dateutil warns about timezone names it does not know, which it ignores.
+        warnings.simplefilter("ignore")
+        return force_utc(parser.parse(date_string))
+
+
+@pytest.fixture(autouse=True)
+def clear_date_cache():
+    datestring_to_utc_datetime.cache_clear()
+    yield
+    datestring_to_utc_datetime.cache_clear()
+
+
+@pytest.mark.parametrize("date_string", rfc822_dates)
+def test_rfc822_matches_dateutil(date_string):
+    assert parse_rfc822_date(date_string) == dateutil_utc(date_string)
+    assert parse_iso8601_date(date_string) is None
+
+
+@pytest.mark.parametrize("date_string", iso8601_dates)
+def test_iso8601_matches_dateutil(date_string):
+    assert parse_iso8601_date(date_string) == dateutil_utc(date_string)
+    assert parse_rfc822_date(date_string) is None
+
+
+@pytest.mark.parametrize("date_string", other_dates)
+def test_other_dates_left_to_dateutil(date_string):
+    assert parse_rfc822_date(date_string) is None
+    assert parse_iso8601_date(date_string) is None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert datestring_to_utc_datetime(date_string) == dateutil_utc(date_string)
+
+
+@pytest.mark.parametrize("date_string", rfc822_dates + iso8601_dates)
+def test_parsed_dates_are_utc(date_string):
+    dt = datestring_to_utc_datetime(date_string)
+    assert dt == dateutil_utc(date_string)
+    assert dt.utcoffset().total_seconds() == 0
+
+
+@pytest.mark.parametrize(
+    "date_string", [" 2020-01-02T10:11:12Z ", "\tMon, 02 Jan 2006 15:04:05 GMT\n"]
+)
+def test_surrounding_whitespace(date_string):
+    assert datestring_to_utc_datetime(date_string) == dateutil_utc(date_string)
+
+
+@pytest.mark.parametrize(
+    "date_string",
+    ["2020-13-01", "2020-02-30T00:00:00Z", "Mon, 32 Jan 2006 15:04:05 GMT"],
+)
+def test_invalid_dates_raise(date_string):
+    with pytest.raises(ValueError):
+        dateutil_utc(date_string)
+    with pytest.raises(ValueError):
+        datestring_to_utc_datetime(date_string)
@@ -0,0 +1,185 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+from yarl import URL
+
+from feedsearch_crawler.crawler import Response
+from feedsearch_crawler.feed_spider import feed_info_parser
+from feedsearch_crawler.feed_spider.feed_info_parser import FeedInfoParser
+from feedsearch_crawler.feed_spider.lib import ParseTypes
+from feedsearch_crawler.feed_spider.spider import FeedsearchSpider
+
+# Pieces of feed titles, combined in pairs to make the title corpus.
+title_parts = [
+    "News",
+    " ",
+    " \n ",
+    "&amp;",
+    "&lt;b&gt;",
+    "&#39;",
+    "&#x27;",
+    "&eacute;",
+    "&nbsp;",
+    "&copy;2020",
+    "&",
+    "a < b",
+    "<",
+    ">",
+    "<3",
+    "</>",
+    "<b>",
+    "</b>",
+    "<BR>",
+    "<br/>",
+    "<i class='x'>",
+    '<a href="/?a=1&b=2">link</a>',
+    "<span> s </span>",
+    "<strong>\n</strong>",
+    "<img src=x>",
+    "<p",
+    "<!-- comment -->",
+    "<!DOCTYPE html>",
+    "<?php x ?>",
+    "<![CDATA[z]]>",
+    "<script>x</script>",
+    "<SCRIPT>y</SCRIPT>",
+    "<style>p{}</style>",
+    "<pre> p\n </pre>",
+    "<textarea>\n</textarea>",
+]
+
+
+def bs4_title(title: str) -> str:
+    """
+    Clean a title with BeautifulSoup, as clean_title did before its fast path.
+    """
+    title = BeautifulSoup(title, "html.parser").get_text()
+    if len(title) > 1024:
+        title = title[:1020] + "..."
+    return title
+
+
+@pytest.fixture
+def parser() -> FeedInfoParser:
+    return FeedInfoParser(FeedsearchSpider())
+
+
+@pytest.fixture
+def no_bs4(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("BeautifulSoup should not be used")
+
+    monkeypatch.setattr(feed_info_parser, "BeautifulSoup", fail)
+
+
+@pytest.mark.parametrize(
+    "title",
+    ["".join(parts) for parts in itertools.product(title_parts, repeat=2)],
+)
+def test_clean_title_matches_bs4(parser, title):
+    assert parser.clean_title(title) == bs4_title(title)
+
+
+@pytest.mark.parametrize(
+    "title,expected",
+    [
+        ("My Blog", "My Blog"),
+        ("  \n ", "\n"),
+        ("News &amp; Views", "News & Views"),
+        ("News & Views", "News & Views"),
+        ("Caf&eacute; &#8211; &#x27;Menu&#x27;", "Café – 'Menu'"),
+        ("<b>Bold</b> <i>title</i>", "Bold title"),
+        ("Line<br/>break", "Linebreak"),
+        ("<!-- comment -->Title", "Title"),
+        ("<span>A</span>\n<span>B</span>", "A\nB"),
+    ],
+)
+def test_clean_title_without_bs4(parser, no_bs4, title, expected):
+    assert parser.clean_title(title) == expected
+
+
+@pytest.mark.parametrize(
+    "title,expected",
+    [
+        ("Title<script>alert('x')</script>", "Title"),
+        ("<style>p { color: red }</style>Title", "Title"),
+        ("Unclosed <b tag", "Unclosed <b tag"),
+        ("a < b", "a < b"),
+        ("<![CDATA[Data]]> title", "Data title"),
+    ],
+)
+def test_strip_markup_falls_back_to_bs4(parser, monkeypatch, title, expected):
+    calls = []
+
+    def soup(*args, **kwargs):
+        calls.append(args)
+        return BeautifulSoup(*args, **kwargs)
+
+    monkeypatch.setattr(feed_info_parser, "BeautifulSoup", soup)
+
+    assert parser.strip_markup(title) == expected == bs4_title(title)
+    assert calls
+
+
+@pytest.mark.parametrize("title", ["x" * 1025, "&amp;" * 1025, "<b>x</b>" * 1025])
+def test_clean_title_max_length(parser, title):
+    cleaned = parser.clean_title(title)
+    assert cleaned == bs4_title(title)
+    assert len(cleaned) == 1023
+    assert cleaned.endswith("...")
+
+
+@pytest.mark.parametrize("title", ["x" * 1024, "&amp;" * 1024])
+def test_clean_title_at_max_length(parser, title):
+    assert len(parser.clean_title(title)) == 1024
+
+
+def feed_response(data: bytes = b"<rss/>", **headers) -> Response:
+    return Response(
+        URL("https://example.com/feed.xml"),
+        "GET",
+        data=data,
+        encoding="utf-8",
+        headers={"Content-Type": "application/rss+xml", **headers},
+    )
+
+
+def test_feed_cache_key(monkeypatch):
+    parser = FeedInfoParser(FeedsearchSpider())
+    key = parser.feed_cache_key(feed_response(), ParseTypes.XML)
+
+    # The URL is not part of the key.
+    other_url = feed_response()
+    other_url.url = URL("https://example.com/rss")
+    assert parser.feed_cache_key(other_url, ParseTypes.XML) == key
+
+    changed = [
+        parser.feed_cache_key(feed_response(b"<rss></rss>"), ParseTypes.XML),
+        parser.feed_cache_key(feed_response(), ParseTypes.JSON),
+        parser.feed_cache_key(
+            feed_response(**{"Content-Type": "text/xml"}), ParseTypes.XML
+        ),
+        parser.feed_cache_key(
+            feed_response(Link='<https://hub.example.com/>; rel="hub"'), ParseTypes.XML
+        ),
+    ]
+    latin_1 = feed_response()
+    latin_1.encoding = "latin-1"
+    changed.append(parser.feed_cache_key(latin_1, ParseTypes.XML))
+
+    parser.crawler.fields = {"url", "title"}
+    changed.append(parser.feed_cache_key(feed_response(), ParseTypes.XML))
+
+    class Tomorrow(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=1)
+
+    parser.crawler.fields = None
+    monkeypatch.setattr(feed_info_parser, "datetime", Tomorrow)
+    changed.append(parser.feed_cache_key(feed_response(), ParseTypes.XML))
+
+    assert key not in changed
+    assert len(set(changed)) == len(changed)
@@ -0,0 +1,211 @@
+import itertools
+from pathlib import Path
+from typing import Dict, Tuple, Optional
+
+import pytest
+from yarl import URL
+
+from feedsearch_crawler.feed_spider import feed_info_parser
+from feedsearch_crawler.feed_spider.feed_info import FeedInfo
+from feedsearch_crawler.feed_spider.feed_info_parser import FeedInfoParser
+from feedsearch_crawler.feed_spider.feed_xml_parser import (
+    FeedXMLParser,
+    etree,
+    parse_feed_xml,
+    split_tag,
+)
+from feedsearch_crawler.feed_spider.spider import FeedsearchSpider
+
+pytestmark = pytest.mark.skipif(etree is None, reason="lxml is not installed")
+
+feeds_path = Path(__file__).parent / "data" / "feeds"
+
+content_types: Dict[str, str] = {
+    ".rss": "application/rss+xml",
+    ".atom": "application/atom+xml",
+    ".rdf": "application/rdf+xml",
+}
+
+# Feeds that the fast parser leaves to feedparser, because their title or description contains markup or entities.
+unsupported_feeds = ["legacy.rss", "markup_title.rss", "wordpress.rss"]
+
+
+def parse_feed_info(
+    data: bytes, headers: Dict, fast: bool, monkeypatch
+) -> Tuple[bool, Optional[dict]]:
+    """
+    Parse a feed into a FeedInfo, with or without the fast parser.
+
+    :return: Tuple of whether the feed was parsed, and the serialized FeedInfo
+    """
+    with monkeypatch.context() as m:
+        if not fast:
+            m.setattr(feed_info_parser, "parse_feed_xml", lambda *args: None)
+        parser = FeedInfoParser(FeedsearchSpider())
+        item = FeedInfo(url=URL("https://example.com/feed"))
+        parsed = parser.parse_xml(item, data, "utf-8", dict(headers))
+    return parsed, item.serialize() if parsed else None
+
+
+def corpus_files():
+    for path in sorted(feeds_path.iterdir()):
+        for content_type in [
+            content_types[path.suffix],
+            content_types[path.suffix] + "; charset=utf-8",
+            "text/xml; charset=utf-8",
+            "application/xml",
+        ]:
+            yield pytest.param(
+                path.read_bytes(),
+                {"content-type": content_type},
+                path.name not in unsupported_feeds,
+                id=f"{path.name}-{content_type}",
+            )
+
+
+def generated_feeds():
+    """
+    Small feeds with every combination of the title, description, date, enclosure, namespace, and link forms
+    that the fast parser has to read the same way as feedparser.
+    """
+    rss_headers = {"content-type": "application/rss+xml; charset=utf-8"}
+    titles = ["Plain", "  Spaced  ", "A &amp; B", "<![CDATA[Cdata title]]>", ""]
+    descriptions = ["D", "<![CDATA[<p>html</p>]]>", "", "multi\n line"]
+    dates = [
+        "<pubDate>Mon, 02 Jan 2006 15:04:05 -0700</pubDate>",
+        "<dc:date>2006-01-03T10:00:00Z</dc:date>",
+        "<pubDate>Tue, 03 Jan 2006 15:04:05 GMT</pubDate>"
+        "<dc:date>2006-01-09T00:00:00Z</dc:date>",
+        "",
+        "<pubDate>garbage</pubDate>",
+    ]
+    enclosures = [
+        '<enclosure url="http://a/a.mp3" type="audio/mpeg" length="1"/>',
+        '<enclosure url="http://a/v.mp4" type="video/mp4"/>',
+        "",
+    ]
+    namespaces = [
+        'xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"',
+        'xmlns:it="http://www.itunes.com/DTDs/PodCast-1.0.dtd"',
+        "",
+    ]
+    links = [
+        '<atom:link rel="hub" href="https://hub/"/><atom:link rel="self" href="http://x/feed"/>',
+        '<atom:link rel="self" href="/relative"/>',
+        "",
+    ]
+    for i, (title, description, date, enclosure, namespace, link) in enumerate(
+        itertools.product(titles, descriptions, dates, enclosures, namespaces, links)
+    ):
+        version = ["2.0", "0.92", "0.91"][i % 3]
+        items = f"<item><title>i</title>{date}{enclosure}</item>" * 3
+        feed = (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="{version}" '
+            f'xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/" {namespace}>'
+            f"<channel><title>{title}</title><description>{description}</description>"
+            f"<link>http://x/</link><lastBuildDate>Mon, 02 Jan 2006 15:04:05 -0700</lastBuildDate>"
+            f"{link}{items}</channel></rss>"
+        )
+        yield feed.encode(), rss_headers
+
+    atom_headers = {"content-type": "application/atom+xml"}
+    for title, title_type, date, link in itertools.product(
+        ["Atom", "A &amp; B", "Atom &lt;i&gt;x&lt;/i&gt;", " s "],
+        ["", ' type="html"', ' type="text"'],
+        [
+            "<updated>2020-01-01T00:00:00Z</updated>",
+            "<published>2019-12-31T10:00:00+02:00</published>",
+            "<updated>2020-01-02T00:00:00Z</updated><published>2020-01-01T00:00:00Z</published>",
+            "",
+        ],
+        [
+            '<link rel="hub" href="https://h/"/><link rel="self" href="http://x/feed"/>',
+            '<link href="http://x/"/>',
+            '<link rel="self" href="feed"/>',
+        ],
+    ):
+        entries = (
+            f"<entry><title>e</title>{date}"
+            f'<link rel="enclosure" type="audio/mpeg" href="http://a/a.mp3"/></entry>'
+        ) * 3
+        feed = (
+            '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">'
+            f"<title{title_type}>{title}</title><subtitle>Sub</subtitle>{link}"
+            f"<updated>2020-01-01T00:00:00Z</updated>{entries}</feed>"
+        )
+        yield feed.encode(), atom_headers
+
+
+@pytest.mark.parametrize("data, headers, supported", list(corpus_files()))
+def test_corpus_matches_feedparser(data: bytes, headers: Dict, supported, monkeypatch):
+    fast = parse_feed_info(data, headers, True, monkeypatch)
+    assert fast == parse_feed_info(data, headers, False, monkeypatch)
+    assert fast[0]
+
+    is_fast = parse_feed_xml(data.strip(), headers) is not None
+    # feedparser treats text/xml without a charset as us-ascii, so the fast parser is only used with a charset.
+    if headers["content-type"] != "application/xml" or not data.startswith(b"<?xml"):
+        assert is_fast == supported
+
+
+def test_generated_feeds_match_feedparser(monkeypatch):
+    fast_count = 0
+    for data, headers in generated_feeds():
+        assert parse_feed_info(data, headers, True, monkeypatch) == parse_feed_info(
+            data, headers, False, monkeypatch
+        ), data
+        if parse_feed_xml(data, headers) is not None:
+            fast_count += 1
+    # Most of the generated feeds are read by the fast parser.
+    assert fast_count > 500
+
+
+@pytest.mark.parametrize(
+    "content_type, supported",
+    [
+        ("application/rss+xml", True),
+        ("application/rss+xml; charset=iso-8859-1", False),
+        ('Application/RSS+XML; Charset="UTF-8"', True),
+        ("application/rss+xml ; charset = utf-8", True),
+        ("text/xml; charset=utf-8", True),
+        ("text/xml", False),
+        ("text/html", False),
+    ],
+)
+def test_supported_content_types(content_type: str, supported: bool):
+    data = (feeds_path / "podcast.rss").read_bytes()
+    headers = {"content-type": content_type}
+    assert (parse_feed_xml(data, headers) is not None) == supported
+
+
+class ChannelRecordingParser(FeedXMLParser):
+    def parse_feed(self, channel) -> dict:
+        self.channel_tags = [split_tag(child.tag)[1] for child in channel]
+        return super().parse_feed(channel)
+
+
+@pytest.mark.parametrize(
+    "root, entry_tag, middle, last",
+    [
+        ('<rss version="2.0"><channel>', "item", "ttl", "description"),
+        ('<feed xmlns="http://www.w3.org/2005/Atom">', "entry", "id", "subtitle"),
+    ],
+)
+def test_parsed_entries_are_removed(root, entry_tag, middle, last):
+    entries = "".join(
+        f"<{entry_tag}><title>{i}</title></{entry_tag}>" for i in range(100)
+    )
+    end = "</channel></rss>" if entry_tag == "item" else "</feed>"
+    data = (
+        f"{root}<title>Feed</title>{entries}<{middle}>1</{middle}>{entries}"
+        f"<{last}>Text</{last}>{end}"
+    )
+
+    parser = ChannelRecordingParser()
+    parsed = parser.parse(data.encode())
+
+    assert len(parsed["entries"]) == 200
+    assert parsed["feed"]["title"] == "Feed"
+    # Only the last entry of each run of entries is kept, and it has been cleared.
+    assert parser.channel_tags == ["title", entry_tag, middle, entry_tag, last]
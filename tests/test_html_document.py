@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+
+from feedsearch_crawler.feed_spider.html_document import (
+    BS4Document,
+    LxmlDocument,
+    StreamDocument,
+    html_backends,
+    get_html_backend,
+    parse_html,
+)
+
+corpus = sorted((Path(__file__).parent / "data" / "html").glob("*.html"))
+
+
+def document_values(text: str, backend: str) -> dict:
+    document = parse_html(text, backend)
+    return {
+        "links": list(document.links()),
+        "title": document.title(),
+        "site_name": document.find_meta("og:site_name"),
+        "canonical": document.find_link("canonical"),
+        "shortcut_icon": document.find_link("shortcut icon"),
+        "alternate": document.head_index.find_links("alternate"),
+        "icon": document.head_index.find_links("icon"),
+    }
+
+
+@pytest.mark.parametrize("backend", [b for b in html_backends if b != "bs4"])
+@pytest.mark.parametrize("page", corpus, ids=lambda page: page.name)
+def test_backend_matches_bs4(page: Path, backend: str):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    text = page.read_text(encoding="utf-8")
+    assert document_values(text, backend) == document_values(text, "bs4")
+
+
+def test_bs4_values():
+    text = (Path(__file__).parent / "data" / "html" / "blog.html").read_text()
+    values = document_values(text, "bs4")
+    assert values["title"] == "Example Blog & Notes"
+    assert values["site_name"] == "Example Blog"
+    assert values["canonical"] == "https://example.com/"
+    assert values["shortcut_icon"] == "/favicon.ico"
+    assert [link["href"] for link in values["alternate"]] == [
+        "/feed.xml",
+        "https://example.com/atom.xml",
+        "/feed.json",
+    ]
+    assert ("/feed.xml", "application/rss+xml") in values["links"]
+    assert ("/not-a-link", None) not in values["links"]
+    assert ("/commented-out", None) not in values["links"]
+
+
+def test_stream_links_are_lazy():
+    text = "<title>T</title>" + "".join(f"<a href='/{i}'>x</a>" for i in range(10))
+    document = StreamDocument(text)
+    links = document.links()
+    assert next(links) == ("/0", None)
+    # The head index is only taken from the link pass once the pass is complete.
+    assert document._head_index is None
+    assert len(list(links)) == 9
+    assert document._head_index is not None
+    assert document.title() == "T"
+
+
+def test_stream_head_index_before_links():
+    document = StreamDocument("<title>T</title><a href='/a'>a</a>")
+    assert document.title() == "T"
+    assert list(document.links()) == [("/a", None)]
+
+
+def test_default_backend_is_bs4():
+    assert isinstance(parse_html("<a href='/a'>a</a>"), BS4Document)
+
+
+def test_get_html_backend():
+    assert get_html_backend("bs4") is BS4Document
+    with pytest.raises(ValueError, match="Unknown HTML parser backend"):
+        get_html_backend("html5lib")
+
+
+def test_get_html_backend_not_installed(monkeypatch):
+    monkeypatch.setattr(LxmlDocument, "is_available", classmethod(lambda cls: False))
+    with pytest.raises(ImportError, match=r"pip install feedsearch-crawler\[lxml\]"):
+        get_html_backend("lxml")
+
+
+@pytest.mark.parametrize("backend", list(html_backends))
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "  \n\t",
+        "<!DOCTYPE html>\n",
+        "<!-- comment -->",
+        "<!DOCTYPE html>\n<!-- comment -->\n",
+    ],
+    ids=["empty", "whitespace", "doctype", "comment", "doctype_comment"],
+)
+def test_backend_empty_document(text: str, backend: str):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    assert document_values(text, backend) == {
+        "links": [],
+        "title": "",
+        "site_name": None,
+        "canonical": None,
+        "shortcut_icon": None,
+        "alternate": [],
+        "icon": [],
+    }
+
+
+@pytest.mark.parametrize("backend", list(html_backends))
+def test_backend_doctype_before_body(backend: str):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    text = "<!DOCTYPE html>\n<body><a href='/feed.xml' type='application/rss+xml'>Feed</a></body>"
+    assert document_values(text, backend) == document_values(text, "bs4")
+    assert document_values(text, backend)["links"] == [
+        ("/feed.xml", "application/rss+xml")
+    ]
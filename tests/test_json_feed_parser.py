@@ -0,0 +1,198 @@
+import itertools
+import json
+
+import pytest
+
+from feedsearch_crawler.feed_spider import json_feed_parser
+from feedsearch_crawler.feed_spider.json_feed_parser import parse_json_feed
+
+VERSION = "https://jsonfeed.org/version/1.1"
+
+feed = {
+    "version": VERSION,
+    "title": "Test Feed",
+    "home_page_url": "https://example.com/",
+    "feed_url": "https://example.com/feed.json",
+    "_extension": {"about": "https://example.com/extension", "values": [1, 2]},
+    "items": [
+        {"id": str(i), "content_text": f"Item {i}", "date_published": "2020-01-01"}
+        for i in range(3)
+    ],
+}
+
+
+class DecoderSpy:
+    """
+    Records every value decoded by the JSON Feed parser.
+    """
+
+    def __init__(self):
+        self.values = []
+
+    def raw_decode(self, text, idx):
+        value, end = json.JSONDecoder().raw_decode(text, idx)
+        self.values.append(value)
+        return value, end
+
+
+@pytest.fixture
+def decoder(monkeypatch) -> DecoderSpy:
+    spy = DecoderSpy()
+    monkeypatch.setattr(json_feed_parser, "_decoder", spy)
+    return spy
+
+
+# Key orders of the feed, with the version key first, last, and between other keys.
+key_orders = [
+    list(feed),
+    list(reversed(list(feed))),
+    ["items", "_extension", "title", "version", "feed_url", "home_page_url"],
+]
+
+
+@pytest.mark.parametrize(
+    "keys,indent", list(itertools.product(key_orders, [None, 2]))
+)
+def test_matches_json_loads(keys, indent):
+    text = json.dumps({key: feed[key] for key in keys}, indent=indent)
+    assert parse_json_feed(text) == json.loads(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "nope",
+        "[1, 2]",
+        "{}",
+        '{"title": "No version"}',
+        '{"version": 2}',
+        '{"version": "https://example.com/version/1"}',
+        '{"version": "https://jsonfeed.org/version/1", "items": [1,}',
+        '{"version": "https://jsonfeed.org/version/1", "items": {}}',
+        '{"version": "https://jsonfeed.org/version/1"',
+    ],
+)
+def test_not_a_json_feed(text):
+    assert parse_json_feed(text) is None
+
+
+def test_rejects_other_key_before_version_without_decoding_it(decoder):
+    api_data = [{"id": i, "name": "name"} for i in range(1000)]
+    text = json.dumps({"title": "API", "data": api_data, "version": VERSION})
+
+    assert parse_json_feed(text) is None
+    assert decoder.values == ["title", "API", "data"]
+
+
+def test_allows_other_key_after_version():
+    text = json.dumps({"version": VERSION, "data": [1, 2], "title": "Title"})
+    assert parse_json_feed(text) == {
+        "version": VERSION,
+        "data": [1, 2],
+        "title": "Title",
+    }
+
+
+def test_allows_extension_key_before_version():
+    text = json.dumps({"_extension": {"a": 1}, "version": VERSION})
+    assert parse_json_feed(text) == {"_extension": {"a": 1}, "version": VERSION}
+
+
+def test_max_keys_before_version():
+    text = json.dumps({"title": "Title", "feed_url": "url", "version": VERSION})
+
+    assert parse_json_feed(text, max_keys=2) is None
+    assert parse_json_feed(text, max_keys=3) == json.loads(text)
+
+
+def test_max_items_truncates_items_and_stops_reading(decoder):
+    items = [{"id": str(i)} for i in range(10)]
+    text = json.dumps({"version": VERSION, "items": items, "title": "After items"})
+
+    assert parse_json_feed(text, max_items=4) == {
+        "version": VERSION,
+        "items": items[:4],
+    }
+    # Neither the items after the cap nor the keys after the items are decoded.
+    assert {"id": "4"} not in decoder.values
+    assert "title" not in decoder.values
+
+
+def test_max_items_reads_whole_list_of_max_items():
+    items = [{"id": str(i)} for i in range(4)]
+    text = json.dumps({"version": VERSION, "items": items, "title": "After items"})
+
+    assert parse_json_feed(text, max_items=4) == json.loads(text)
+    assert parse_json_feed(json.dumps({"version": VERSION, "items": []})) == {
+        "version": VERSION,
+        "items": [],
+    }
+
+
+def test_items_before_version_are_not_decoded_without_version(decoder):
+    api_data = [{"id": i, "version": "1.0"} for i in range(1000)]
+    text = json.dumps({"items": api_data, "title": "API"})
+
+    assert parse_json_feed(text) is None
+    assert decoder.values == ["items"]
+
+
+def test_items_before_version_with_other_version(decoder):
+    text = json.dumps({"items": [{"id": "1"}], "version": "https://example.com/v1"})
+
+    assert parse_json_feed(text) is None
+
+
+@pytest.mark.parametrize("escape_slashes", [False, True])
+def test_items_before_version(escape_slashes):
+    text = json.dumps({"items": feed["items"], "version": VERSION})
+    if escape_slashes:
+        text = text.replace("/", "\\/")
+
+    assert parse_json_feed(text) == {"items": feed["items"], "version": VERSION}
+
+
+def test_first_item_only(decoder):
+    items = [{"id": str(i)} for i in range(10)]
+    text = json.dumps({"version": VERSION, "title": "Title", "items": items})
+
+    assert parse_json_feed(text, first_item_only=True) == {
+        "version": VERSION,
+        "title": "Title",
+        "items": items[:1],
+    }
+    assert {"id": "1"} not in decoder.values
+    assert parse_json_feed(text, max_items=4, first_item_only=False)["items"] == (
+        items[:4]
+    )
+
+
+def test_first_item_only_reads_items_before_version():
+    items = [{"id": str(i)} for i in range(10)]
+    text = json.dumps({"items": items, "version": VERSION})
+
+    assert parse_json_feed(text, first_item_only=True) == json.loads(text)
+
+
+@pytest.mark.parametrize("first_item_only", [False, True])
+def test_items_before_version_over_max_items(decoder, first_item_only):
+    # Brackets in strings don't end the skipped items early.
+    items = [{"id": str(i), "tags": ["]", "}"], "text": 'a "[quote]"'} for i in range(5)]
+    text = json.dumps({"items": items, "title": "Title", "version": VERSION})
+
+    assert parse_json_feed(text, max_items=3, first_item_only=first_item_only) == {
+        "items": items[:3],
+        "title": "Title",
+        "version": VERSION,
+    }
+    # The items after the cap are skipped without being decoded.
+    assert items[3] not in decoder.values
+    assert parse_json_feed(text, max_items=10) == json.loads(text)
+
+
+def test_items_before_version_over_max_items_unterminated():
+    text = json.dumps({"items": [{"id": "1"}, {"id": "2"}], "version": VERSION})
+    # The items array is never closed.
+    text = text.replace("}], ", "}, ")
+    assert parse_json_feed(text, max_items=1) is None
@@ -0,0 +1,115 @@
+import pytest
+from yarl import URL
+
+from tests.link_filter_baseline import baseline_should_follow_link, read_corpus
+from feedsearch_crawler.crawler import Request, Response
+from feedsearch_crawler.feed_spider.link_filter import HrefFlags, LinkFilter
+
+# hrefs with percent-encoded characters, mixed case and other edge cases.
+edge_case_hrefs = [
+    "/%66eed",
+    "/%2Ffeed",
+    "/feed%20list",
+    "/blog?f%65ed=1",
+    "/x?comment%73=1",
+    "/x?comm%65nt=1",
+    "/podcast%73",
+    "/caf%C3%A9/rss",
+    "/café/rss",
+    "/a/../feed",
+    "http://EXAMPLE.com/RSS",
+    "/Feed.XML",
+    "/p/x.JPG",
+    "/feed.jpg?x=1",
+    "/feed?",
+    "/rss#top",
+    "/blog?feed",
+    "//cdn.example.com/feed",
+]
+
+link_types = [None, "application/rss+xml", "text/html", "application/json+oembed"]
+
+hrefs = read_corpus() + edge_case_hrefs
+
+
+def link_filter(full_crawl: bool) -> LinkFilter:
+    response = Response(URL("https://example.com/"), "GET", status_code=200)
+    return LinkFilter(response, Request.__new__(Request), full_crawl=full_crawl)
+
+
+@pytest.mark.parametrize("full_crawl", [False, True])
+@pytest.mark.parametrize("link_type", link_types)
+def test_should_follow_link_matches_baseline(full_crawl, link_type):
+    should_follow_link = link_filter(full_crawl).should_follow_link
+    for href in hrefs:
+        expected = baseline_should_follow_link(href, link_type, full_crawl)
+        assert should_follow_link(href, link_type) == expected, href
+
+
+@pytest.mark.parametrize(
+    "href,expected",
+    [
+        ("/%66eed", (URL("/feed"), 3)),
+        ("/blog?f%65ed=1", (URL("/blog?feed=1"), 3)),
+        ("/x?comment%73=1", None),
+    ],
+)
+def test_percent_encoded_hrefs(href, expected):
+    assert link_filter(full_crawl=True).should_follow_link(href) == expected
+
+
+def test_href_flags():
+    flags = HrefFlags("/authors/feed.xml?podcast=1&comment=2")
+
+    assert flags.is_feedlike_href
+    assert not flags.is_feedlike_querystring
+    assert flags.is_podcast_querystring
+    assert flags.has_author_info
+    assert flags.has_invalid_querystring
+    assert flags.is_valid_filetype
+    assert not flags.has_invalid_contents
+    assert not flags.is_low_priority
+
+
+@pytest.mark.parametrize(
+    "href",
+    [
+        "",
+        "  ",
+        "mailto:me@example.com",
+        "MAILTO:me@example.com",
+        " javascript:void(0)",
+        "JavaScript:alert(1)",
+        "#",
+        "#top",
+        "/images/photo.jpg",
+        "/images/photo.PNG?size=large#top",
+        "https://example.com/style.css",
+        "/video.mp4/",
+    ],
+)
+def test_prescreened_hrefs(href):
+    assert LinkFilter.is_prescreened_href(href)
+    assert LinkFilter.is_prescreened_href(href, "text/html")
+
+
+@pytest.mark.parametrize(
+    "href",
+    ["/feed", "/feed.xml", "/page#top", "/mailto/feed", "/blog/?photo.jpg", "/a.jpg.rss"],
+)
+def test_not_prescreened_hrefs(href):
+    assert not LinkFilter.is_prescreened_href(href)
+
+
+@pytest.mark.parametrize(
+    "link_type", ["application/rss+xml", "application/atom+xml", "application/json"]
+)
+def test_feed_link_type_bypasses_filetype_prescreen(link_type):
+    assert not LinkFilter.is_prescreened_href("/feed.png", link_type)
+    assert link_filter(False).should_follow_link("/feed.png", link_type) == (
+        URL("/feed.png"),
+        2,
+    )
+    # Links that can never be fetched are dropped whatever their type.
+    assert LinkFilter.is_prescreened_href("mailto:feed@example.com", link_type)
+    assert LinkFilter.is_prescreened_href("#feed", link_type)
@@ -0,0 +1,100 @@
+import pytest
+
+from feedsearch_crawler.crawler import LRUCache
+
+
+def test_get_and_set():
+    cache = LRUCache(3)
+    cache.set("a", 1)
+    cache.set("b", None)
+
+    assert cache.get("a") == 1
+    assert cache.get("b", "default") is None
+    assert cache.get("c") is None
+    assert cache.get("c", "default") == "default"
+    assert "a" in cache
+    assert "c" not in cache
+    assert len(cache) == 2
+
+
+def test_evicts_least_recently_set():
+    cache = LRUCache(3)
+    for key in "abcde":
+        cache.set(key, key.upper())
+
+    assert len(cache) == 3
+    assert [key for key in "abcde" if key in cache] == ["c", "d", "e"]
+
+
+def test_get_marks_most_recently_used():
+    cache = LRUCache(3)
+    for key in "abc":
+        cache.set(key, key)
+    assert cache.get("a") == "a"
+    cache.set("d", "d")
+
+    assert [key for key in "abcd" if key in cache] == ["a", "c", "d"]
+    # A lookup that misses doesn't change the order.
+    assert cache.get("b") is None
+    cache.set("e", "e")
+    assert [key for key in "abcde" if key in cache] == ["a", "d", "e"]
+
+
+def test_set_existing_key_marks_most_recently_used():
+    cache = LRUCache(3)
+    for key in "abc":
+        cache.set(key, key)
+    cache.set("a", "new")
+    cache.set("d", "d")
+
+    assert len(cache) == 3
+    assert "b" not in cache
+    assert cache.get("a") == "new"
+
+
+def test_hit_and_miss_counters():
+    cache = LRUCache(2)
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    cache.get("a")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a", "default")
+    cache.get("b", "default")
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # Membership checks and sets are not lookups.
+    assert "a" in cache
+    assert "b" not in cache
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # The evicted value is a miss.
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_clear():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.clear()
+
+    assert len(cache) == 0
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("maxsize", [0, 1])
+def test_small_capacity(maxsize):
+    cache = LRUCache(maxsize)
+    for key in "abc":
+        cache.set(key, key)
+        assert len(cache) == maxsize
+        assert cache.get(key) == (key if maxsize else None)
+
+    assert len(cache) == maxsize
+    assert cache.hits == 3 * maxsize
+    assert cache.misses == 3 * (1 - maxsize)
@@ -0,0 +1,176 @@
+import asyncio
+
+from feedsearch_crawler.crawler.lib import (
+    CrawlerPriorityQueue,
+    CallbackResult,
+    PriorityBuckets,
+)
+from feedsearch_crawler.crawler.queueable import Queueable
+
+
+class Item(Queueable):
+    __slots__ = ("name",)
+
+    def __init__(self, name: str, priority: int = Queueable.default_priority):
+        super().__init__()
+        self.name = name
+        self.priority = priority
+
+    def __repr__(self):
+        return f"Item({self.name})"
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+def drain(queue: CrawlerPriorityQueue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+        queue.task_done()
+    return items
+
+
+def test_fifo_within_priority():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        for i in range(100):
+            queue.put_nowait(Item(str(i)))
+        return drain(queue)
+
+    assert names(asyncio.run(run())) == [str(i) for i in range(100)]
+
+
+def test_order_across_priorities():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        for name, priority in [
+            ("low-1", 102),
+            ("default-1", 100),
+            ("link-1", 3),
+            ("default-2", 100),
+            ("link-2", 2),
+            ("link-3", 3),
+            ("low-2", 102),
+        ]:
+            queue.put_nowait(Item(name, priority))
+        queue.put_nowait(CallbackResult("result", 0))
+        first = queue.get_nowait()
+        queue.task_done()
+        return first, drain(queue)
+
+    first, rest = asyncio.run(run())
+    assert isinstance(first, CallbackResult)
+    assert names(rest) == [
+        "link-2",
+        "link-1",
+        "link-3",
+        "default-1",
+        "default-2",
+        "low-1",
+        "low-2",
+    ]
+
+
+def test_priority_reused_after_bucket_emptied():
+    buckets = PriorityBuckets()
+    buckets.append(Item("a", 5))
+    assert buckets.popleft().name == "a"
+    assert len(buckets) == 0
+    buckets.append(Item("b", 100))
+    buckets.append(Item("c", 5))
+    assert names([buckets.popleft(), buckets.popleft()]) == ["c", "b"]
+
+
+def test_iter_in_priority_order():
+    buckets = PriorityBuckets()
+    for name, priority in [("a", 100), ("b", 2), ("c", 100), ("d", 1), ("e", 2)]:
+        buckets.append(Item(name, priority))
+    assert names(buckets) == ["d", "b", "e", "a", "c"]
+    assert len(buckets) == 5
+
+
+def test_repr_with_items():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        queue.put_nowait(Item("a"))
+        return repr(queue)
+
+    assert "_queue=[Item(a)]" in asyncio.run(run())
+
+
+def test_put_many_nowait_and_join():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        queue.put_many_nowait([])
+        assert queue.empty()
+
+        items = [Item(str(i), 100 if i % 2 else 3) for i in range(10)]
+        queue.put_many_nowait(items)
+        assert queue.qsize() == 10
+
+        results = []
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                results.append(item)
+                queue.task_done()
+
+        task = asyncio.create_task(worker())
+        await asyncio.wait_for(queue.join(), timeout=1)
+        task.cancel()
+        return results
+
+    results = asyncio.run(run())
+    assert names(results) == ["0", "2", "4", "6", "8", "1", "3", "5", "7", "9"]
+
+
+def test_put_many_nowait_wakes_getters():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        getters = [asyncio.create_task(queue.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        queue.put_many_nowait([Item("a"), Item("b"), Item("c")])
+        return await asyncio.wait_for(asyncio.gather(*getters), timeout=1)
+
+    assert sorted(names(asyncio.run(run()))) == ["a", "b", "c"]
+
+
+def test_clear_finishes_join():
+    async def run():
+        queue = CrawlerPriorityQueue()
+        queue.put_many_nowait([Item("a", 2), Item("b"), Item("c", 102)])
+        queue.clear()
+        assert queue.empty()
+        assert len(queue._queue) == 0
+        await asyncio.wait_for(queue.join(), timeout=1)
+
+        queue.put_nowait(Item("d"))
+        assert names([queue.get_nowait()]) == ["d"]
+
+    asyncio.run(run())
+
+
+def test_class_priority():
+    assert Queueable.priority == Queueable.default_priority == 100
+    assert CallbackResult.priority == 1
+    assert CallbackResult(None, 0).priority == 1
+
+
+def test_subclass_priority_class_attribute():
+    class LowPriority(Queueable):
+        priority = 200
+
+    # The subclass namespace is left alone, and instances read the class attribute.
+    assert LowPriority.__dict__["priority"] == 200
+    assert LowPriority.priority == 200
+    low, high = LowPriority(), Item("high", priority=2)
+    assert (low.priority, high.priority) == (200, 2)
+    assert high < low
+
+    low.priority = 1
+    assert low.priority == 1
+    assert LowPriority().priority == 200
+    assert low < high
@@ -0,0 +1,29 @@
+from yarl import URL
+
+from feedsearch_crawler.crawler import Response
+
+
+def response(data: bytes, truncated: bool, encoding: str = "utf-8") -> Response:
+    return Response(
+        URL("https://example.com/"),
+        "GET",
+        encoding=encoding,
+        data=data,
+        truncated=truncated,
+    )
+
+
+def test_text_of_truncated_content_drops_incomplete_character():
+    data = "<title>Café</title>".encode("utf-8")
+    cut = data[: data.index(b"\xc3") + 1]
+    assert response(cut, truncated=True).text == "<title>Caf"
+    assert response(cut, truncated=False).text is None
+
+
+def test_text_of_truncated_content_with_invalid_bytes_is_none():
+    assert response(b"<title>\xff\xfe</title>", truncated=True).text is None
+
+
+def test_text_of_truncated_content_in_other_encoding():
+    data = "<title>x</title>".encode("utf-16")
+    assert response(data[:-1], truncated=True, encoding="utf-16").text == "<title>x</title"
@@ -0,0 +1,113 @@
+import codecs
+
+import pytest
+
+from feedsearch_crawler.feed_spider.lib import ParseTypes, sniff_feed_type
+
+RSS = '<rss version="2.0"><channel><title>Feed</title></channel></rss>'
+ATOM = '<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title></feed>'
+RDF = '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"></rdf:RDF>'
+JSON_FEED = '{"version": "https://jsonfeed.org/version/1.1", "items": []}'
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (RSS, ParseTypes.XML),
+        (ATOM, ParseTypes.XML),
+        (RDF, ParseTypes.XML),
+        (XML_DECLARATION + RSS, ParseTypes.XML),
+        (JSON_FEED, ParseTypes.JSON),
+        ("<html><head><title>Page</title></head></html>", None),
+        ("", None),
+    ],
+)
+def test_sniff_feed_type(text, expected):
+    assert sniff_feed_type(text.encode("utf-8")) == expected
+
+
+@pytest.mark.parametrize(
+    "bom, encoding",
+    [
+        (codecs.BOM_UTF8, "utf-8"),
+        (codecs.BOM_UTF16_LE, "utf-16-le"),
+        (codecs.BOM_UTF16_BE, "utf-16-be"),
+        (codecs.BOM_UTF32_LE, "utf-32-le"),
+        (codecs.BOM_UTF32_BE, "utf-32-be"),
+    ],
+)
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (XML_DECLARATION + RSS, ParseTypes.XML),
+        (ATOM, ParseTypes.XML),
+        (JSON_FEED, ParseTypes.JSON),
+        ("<html><body>Page</body></html>", None),
+    ],
+)
+def test_sniff_feed_type_with_bom(bom, encoding, text, expected):
+    assert sniff_feed_type(bom + text.encode(encoding)) == expected
+
+
+@pytest.mark.parametrize("whitespace", [" ", "\n", "\r\n", "\t \n  "])
+def test_sniff_feed_type_with_leading_whitespace(whitespace):
+    assert sniff_feed_type((whitespace + RSS).encode()) == ParseTypes.XML
+    with_declaration = whitespace + XML_DECLARATION + ATOM
+    assert sniff_feed_type(with_declaration.encode()) == ParseTypes.XML
+    assert sniff_feed_type((whitespace + JSON_FEED).encode()) == ParseTypes.JSON
+    bom_and_whitespace = codecs.BOM_UTF8 + (whitespace + JSON_FEED).encode()
+    assert sniff_feed_type(bom_and_whitespace) == ParseTypes.JSON
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<html><head><title>Page</title></head><body></body></html>",
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" '
+        '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head>'
+        '<link rel="alternate" type="application/rss+xml" href="/rss.xml"/>'
+        "</head></html>",
+    ],
+)
+def test_sniff_xml_declaration_followed_by_html(html):
+    assert sniff_feed_type((XML_DECLARATION + html).encode()) is None
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Any JSON object may be a JSON feed, and is checked when it is parsed.
+        ('{"data": [1, 2, 3]}', ParseTypes.JSON),
+        ('[{"version": "https://jsonfeed.org/version/1.1"}]', None),
+        ('"https://jsonfeed.org/version/1.1"', None),
+        ("123", None),
+        ("null", None),
+    ],
+)
+def test_sniff_non_feed_json(text, expected):
+    assert sniff_feed_type(text.encode()) == expected
+
+
+def test_sniff_feed_type_limit():
+    # The root element is found within the first 1000 bytes, but not if it is cut off.
+    for padding, expected in [(996, ParseTypes.XML), (997, None), (1000, None)]:
+        data = b" " * padding + RSS.encode()
+        assert sniff_feed_type(data) == expected, padding
+
+    data = b" " * 1000 + RSS.encode()
+    assert sniff_feed_type(data, limit=1004) == ParseTypes.XML
+    assert sniff_feed_type(b" " * 999 + b"{") == ParseTypes.JSON
+    assert sniff_feed_type(b" " * 1000 + b"{") is None
+
+
+def test_sniff_feed_type_limit_with_bom():
+    # The byte order mark counts towards the limit, and a character cut off at the limit
+    # is ignored.
+    padding = " ".encode("utf-16-le")
+    data = codecs.BOM_UTF16_LE + padding * 495 + RSS.encode("utf-16-le")
+    assert sniff_feed_type(data) == ParseTypes.XML
+    data = codecs.BOM_UTF16_LE + padding * 496 + RSS.encode("utf-16-le")
+    assert sniff_feed_type(data) is None
+    assert sniff_feed_type(data, limit=1001) is None
@@ -0,0 +1,345 @@
+import asyncio
+import time
+from pathlib import Path
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from feedsearch_crawler.crawler import Response
+from feedsearch_crawler.crawler.lib import Stats, URLHistory
+from feedsearch_crawler.feed_spider.html_document import HeadDocument, html_backends
+from feedsearch_crawler.feed_spider.link_filter import LinkFilter
+from feedsearch_crawler.feed_spider.spider import FeedsearchSpider
+
+html_path = Path(__file__).parent / "data" / "html"
+
+
+def test_find_body_start():
+    text = "<html><head><title>T</title></head><body class='x'><p>Text</p></body>"
+    assert FeedsearchSpider.find_body_start(text) == text.index("<body")
+    assert FeedsearchSpider.find_body_start("<p>No body</p>") == -1
+
+
+def test_find_body_start_skips_script_and_comments():
+    head = (
+        "<html><head>"
+        "<script>document.write('<body>');</script>"
+        "<!-- <body> -->"
+        "<style>/* <body> */</style>"
+        '<meta property="og:title" content="<body>">'
+        "<SCRIPT type='text/javascript'>var s = \"</head><BODY>\";</SCRIPT>"
+        "</head>"
+    )
+    text = head + "<BODY><p>Text</p></BODY>"
+    assert FeedsearchSpider.find_body_start(text) == len(head)
+
+
+def test_find_body_start_unterminated_comment():
+    assert FeedsearchSpider.find_body_start("<head><!-- <body>") == -1
+
+
+
+@pytest.mark.parametrize(
+    "unit",
+    ["<a x='", '<a x="', "<a b ", "<aaaa", "<script x='", "<a href='/feed' x=\""],
+)
+def test_scan_unterminated_tags_is_linear(unit):
+    # Each of these took seconds to scan when unterminated tags were rescanned from
+    # every "<".
+    text = "<html><head></head>" + unit * 20000
+    start = time.perf_counter()
+    assert FeedsearchSpider.find_body_start(text) == -1
+    assert FeedsearchSpider.scan_feedlike_hrefs(text) == []
+    assert time.perf_counter() - start < 1
+
+
+def test_scan_ignores_unterminated_tags():
+    assert FeedsearchSpider.find_body_start("<head></head><body class='x") == -1
+    assert FeedsearchSpider.scan_feedlike_hrefs("<body><a href='/feed.xml'") == []
+    assert FeedsearchSpider.scan_feedlike_hrefs(
+        "<body><a title='x>\n<a href=\"/rss\">'><a href='/feed.xml'>"
+    ) == [("/feed.xml", None)]
+
+
+def test_scan_stops_at_end():
+    text = "<head></head><body><a href='/feed.xml'></a><a href='/rss'></a></body>"
+    end = text.index("<a href='/rss'")
+    assert FeedsearchSpider.find_body_start(text, 10) == -1
+    assert FeedsearchSpider.scan_feedlike_hrefs(text, 0, end) == [("/feed.xml", None)]
+
+
+def test_scan_feedlike_hrefs():
+    text = (
+        "<body>"
+        '<a href="/about">About</a>'
+        '<a href="/feed.xml">Feed</a>'
+        '<a type="application/rss+xml" href="/updates">Updates</a>'
+        "<a HREF='/atom?a=1&amp;b=2' TYPE='application/atom+xml'>Atom</a>"
+        "<a href=/blog/rss>Unquoted</a>"
+        '<a title="a > b" href="/podcast">Podcast</a>'
+        "<!-- <a href='/commented/feed'>Feed</a> -->"
+        "<script>var a = '<a href=\"/script/feed\">';</script>"
+        '<a href="/oembed" type="application/json+oembed">oEmbed</a>'
+        "</body>"
+    )
+    assert FeedsearchSpider.scan_feedlike_hrefs(text) == [
+        ("/feed.xml", None),
+        ("/updates", "application/rss+xml"),
+        ("/atom?a=1&b=2", "application/atom+xml"),
+        ("/blog/rss", None),
+        ("/podcast", None),
+    ]
+
+
+def test_parse_html_head():
+    spider = FeedsearchSpider(head_only=True)
+    text = (html_path / "blog.html").read_text(encoding="utf-8")
+    document = spider.parse_html_head(text)
+    assert isinstance(document, HeadDocument)
+    links = list(document.links())
+    assert ("/feed.xml", "application/rss+xml") in links
+    assert ("/2020/01/first-post.html", None) not in links
+    assert document.title() == "Example Blog & Notes"
+
+
+no_head_page = (
+    "<!DOCTYPE html>\n<!-- no head -->\n<body>"
+    "<a href='/feed.xml' type='application/rss+xml'>Feed</a><a href='/about'>About</a>"
+    "</body>"
+)
+
+
+def test_has_elements():
+    assert FeedsearchSpider.has_elements("<title>T</title>")
+    assert FeedsearchSpider.has_elements("<script>var a;</script>")
+    assert not FeedsearchSpider.has_elements("")
+    assert not FeedsearchSpider.has_elements("<!DOCTYPE html>\n<!-- <p> -->\n ")
+    # The body may be the first tag on the page, leaving nothing to scan.
+    assert not FeedsearchSpider.has_elements("<body>", 0, 0)
+
+
+@pytest.mark.parametrize("backend", list(html_backends))
+def test_parse_html_head_without_head(backend):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    spider = FeedsearchSpider(head_only=True, html_backend=backend)
+    document = spider.parse_html_head(no_head_page)
+    assert not isinstance(document, HeadDocument)
+    assert list(document.links()) == [
+        ("/feed.xml", "application/rss+xml"),
+        ("/about", None),
+    ]
+
+
+@pytest.mark.parametrize("backend", list(html_backends))
+def test_discovery_only_parse_without_head(backend):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    spider = FeedsearchSpider(discovery_only=True, html_backend=backend)
+    document = asyncio.run(spider.parse_xml(no_head_page))
+    assert ("/feed.xml", "application/rss+xml") in list(document.links())
+
+
+def followed_links(spider, document):
+    link_filter = LinkFilter(request=None, response=None, full_crawl=spider.full_crawl)
+    followed = [link_filter.should_follow_link(*link) for link in document.links()]
+    return {values for values in followed if values}
+
+
+@pytest.mark.parametrize("backend", list(html_backends))
+def test_head_only_follows_same_links_as_full_parse(backend):
+    if not html_backends[backend].is_available():
+        pytest.skip(f"{backend} is not installed")
+    text = (html_path / "blog.html").read_text(encoding="utf-8")
+    # Percent-encoded hrefs are classified as they are decoded.
+    text = text.replace(
+        "</body>",
+        '<a href="/%66eed">Encoded</a><a href="/?%66eed=atom">Query</a>'
+        '<a href="/%70odcast/">Podcast</a><a href="/%61bout">About</a></body>',
+    )
+    head_only = FeedsearchSpider(head_only=True, html_backend=backend)
+    full_parse = FeedsearchSpider(head_only=False, html_backend=backend)
+
+    document = head_only.parse_html_head(text)
+    assert isinstance(document, HeadDocument)
+    links = followed_links(head_only, document)
+    assert links == followed_links(full_parse, asyncio.run(full_parse.parse_xml(text)))
+    assert (URL("/feed"), 3) in links
+    assert (URL("/?feed=atom"), 3) in links
+
+
+def test_follow_links_without_slicing():
+    spider = FeedsearchSpider()
+    spider.parse_slice_links = 0
+    spider.parse_slice_ms = 0
+    links = [("#top", None), ("mailto:me@example.com", None)] * 100
+    requests = asyncio.run(spider.follow_links(None, None, links))
+    assert requests == []
+    assert spider.stats[Stats.LINKS_DUPLICATE] == 198
+    assert spider.stats[Stats.LINKS_PRESCREENED] == 2
+
+
+def follow_links_with_ticker(spider, links):
+    """
+    Follow links on a page while another task counts how often it gets to run.
+    """
+
+    async def run():
+        spider._session = aiohttp.ClientSession()
+        url = URL("https://example.com/")
+        response = Response(url, "GET", history=URLHistory(url))
+        ticks = 0
+        done = False
+
+        async def ticker():
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        ticks = 0
+        requests = await spider.follow_links(None, response, links)
+        done = True
+        await task
+        await spider._session.close()
+        return requests, ticks
+
+    return asyncio.run(run())
+
+
+feed_links = [(f"/feeds/{i}.xml", None) for i in range(100)]
+
+
+def test_follow_links_over_max_links_per_page():
+    spider = FeedsearchSpider()
+    spider.max_links_per_page = 30
+    requests, _ = follow_links_with_ticker(spider, feed_links)
+    assert [request.url.path for request in requests] == [
+        href for href, _ in feed_links[:30]
+    ]
+    assert spider.stats[Stats.LINK_LISTS_TRUNCATED] == 1
+
+    # A page with exactly max_links_per_page links is not truncated.
+    spider = FeedsearchSpider()
+    spider.max_links_per_page = 100
+    requests, _ = follow_links_with_ticker(spider, feed_links)
+    assert len(requests) == 100
+    assert spider.stats[Stats.LINK_LISTS_TRUNCATED] == 0
+
+
+def test_follow_links_slices_by_link_count():
+    spider = FeedsearchSpider()
+    spider.parse_slice_links = 10
+    spider.parse_slice_ms = 0
+    requests, ticks = follow_links_with_ticker(spider, feed_links)
+    assert [request.url.path for request in requests] == [
+        href for href, _ in feed_links
+    ]
+    # The loop yields to the event loop after every 10 links.
+    assert ticks == 10
+
+
+def test_follow_links_slices_by_time(monkeypatch):
+    spider = FeedsearchSpider()
+    spider.parse_slice_links = 0
+    spider.parse_slice_ms = 5
+    # Each reading of the clock advances it by one millisecond.
+    clock = iter(range(1000000))
+    monkeypatch.setattr(time, "perf_counter", lambda: next(clock) / 1000)
+    requests, ticks = follow_links_with_ticker(spider, feed_links)
+    assert len(requests) == 100
+    assert ticks > 0
+
+
+def test_follow_links_without_slicing_never_yields():
+    spider = FeedsearchSpider()
+    spider.parse_slice_links = 0
+    spider.parse_slice_ms = 0
+    requests, ticks = follow_links_with_ticker(spider, feed_links)
+    assert len(requests) == 100
+    assert ticks == 0
+
+
+def test_follow_links_drops_links_before_url_parsing(monkeypatch):
+    checked = []
+    should_follow_link = LinkFilter.should_follow_link
+
+    def record_check(self, href, link_type=None):
+        checked.append(href)
+        return should_follow_link(self, href, link_type)
+
+    monkeypatch.setattr(LinkFilter, "should_follow_link", record_check)
+    spider = FeedsearchSpider()
+    links = [
+        ("mailto:me@example.com", None),
+        ("javascript:void(0)", None),
+        ("#top", None),
+        ("/logo.png", None),
+        ("/feed.png", "application/rss+xml"),
+        ("/feed", None),
+        ("/feed", None),
+        ("/logo.png", None),
+    ]
+    requests, _ = follow_links_with_ticker(spider, links)
+
+    assert [request.url.path for request in requests] == ["/feed.png", "/feed"]
+    assert checked == ["/feed.png", "/feed"]
+    assert spider.stats[Stats.LINKS_PRESCREENED] == 4
+    assert spider.stats[Stats.LINKS_DUPLICATE] == 2
+    assert spider._stats_links_dropped == [6]
+
+
+def test_follow_links_caches_repeated_hrefs(monkeypatch):
+    spider = FeedsearchSpider()
+    calls = {"should_follow_link": 0, "resolve_url": 0, "url_fingerprint": 0}
+
+    def count(obj, name):
+        method = getattr(obj, name)
+
+        def counted(*args, **kwargs):
+            calls[name.strip("_")] += 1
+            return method(*args, **kwargs)
+
+        monkeypatch.setattr(obj, name, counted)
+
+    count(LinkFilter, "should_follow_link")
+    count(spider, "_resolve_url")
+    count(spider._duplicate_filter, "url_fingerprint")
+
+    links = [("/feed.xml", "application/rss+xml"), ("/rss", None), ("/about", None)]
+
+    async def follow_pages():
+        spider._session = aiohttp.ClientSession()
+        pages = []
+        for path in ("/", "/blog/"):
+            url = URL("https://example.com" + path)
+            response = Response(url, "GET", history=URLHistory(url))
+            pages.append(await spider.follow_links(None, response, links))
+        await spider._session.close()
+        return pages
+
+    first, second = asyncio.run(follow_pages())
+    assert [str(request.url) for request in first] == [
+        "https://example.com/feed.xml",
+        "https://example.com/rss",
+    ]
+    # The links were already followed, and the second page neither classifies nor resolves them again.
+    assert second == []
+    assert calls == {"should_follow_link": 3, "resolve_url": 2, "url_fingerprint": 2}
+    assert spider._link_cache.hits == 3
+    assert spider._url_cache.hits == 2
+
+
+@pytest.mark.parametrize("fields", [["nope"], ["url", "title", "nope", "other"]])
+def test_unknown_fields(fields):
+    with pytest.raises(ValueError, match="nope"):
+        FeedsearchSpider(fields=fields)
+
+
+@pytest.mark.parametrize("fields", [None, [], ["url"], ["site_name", "velocity"]])
+def test_known_fields(fields):
+    spider = FeedsearchSpider(fields=fields)
+    assert spider.fields == (None if fields is None else set(fields))
@@ -0,0 +1,126 @@
+import copy
+from typing import List
+
+import pytest
+from yarl import URL
+
+from feedsearch_crawler.crawler.lib import URLHistory
+
+URLS = [URL(f"https://example.com/{i}") for i in range(5)]
+
+
+def chain(urls: List[URL]) -> URLHistory:
+    history = None
+    for url in urls:
+        history = URLHistory(url, history)
+    return history
+
+
+def test_single_url():
+    history = URLHistory(URLS[0])
+
+    assert history.url == URLS[0]
+    assert history.parent is None
+    assert history.depth == 1
+    assert history.root == URLS[0]
+    assert len(history) == 1
+    assert list(history) == [URLS[0]]
+
+
+def test_parent_chain():
+    history = chain(URLS)
+
+    assert history.url == URLS[-1]
+    assert history.root == URLS[0]
+    assert history.depth == len(URLS)
+    node, depth = history, len(URLS)
+    while node is not None:
+        assert node.depth == depth
+        assert node.root == URLS[0]
+        assert node.url == URLS[depth - 1]
+        node, depth = node.parent, depth - 1
+    assert depth == 0
+
+
+def test_iteration_order():
+    history = chain(URLS)
+
+    assert list(history) == URLS
+    # Iterating again gives the same order.
+    assert list(history) == URLS
+    assert [str(url) for url in history] == [str(url) for url in URLS]
+
+
+def test_append_does_not_modify_history():
+    history = chain(URLS[:2])
+    first = history.append(URLS[2])
+    second = history.append(URLS[3])
+
+    assert list(history) == URLS[:2]
+    assert list(first) == URLS[:3]
+    assert list(second) == URLS[:2] + [URLS[3]]
+    assert first.parent is second.parent is history
+    assert first.depth == second.depth == 3
+
+
+@pytest.mark.parametrize("index", range(-len(URLS), len(URLS)))
+def test_index(index):
+    assert chain(URLS)[index] == URLS[index]
+
+
+@pytest.mark.parametrize("index", [len(URLS), len(URLS) + 1, -len(URLS) - 1])
+def test_index_out_of_range(index):
+    with pytest.raises(IndexError):
+        chain(URLS)[index]
+
+
+def test_index_must_be_integer():
+    with pytest.raises(TypeError):
+        chain(URLS)[1:3]
+
+
+def test_repr():
+    assert repr(chain(URLS[:2])) == (
+        "URLHistory(['https://example.com/0', 'https://example.com/1'])"
+    )
+
+
+def test_matches_list_history():
+    """
+    Build the history of a crawl as lists of URLs, as it was built before URLHistory,
+    and as URLHistory chains, and check that they always hold the same URLs.
+    """
+    # Each Request copies the history of the Response it was followed from, and each
+    # Response appends any redirects and its URL to the history of its Request.
+    redirects = {URLS[1]: [URL("https://example.com/redirect")], URLS[3]: []}
+    list_histories = {URLS[0]: []}
+    chain_histories = {URLS[0]: None}
+    pages = [(URLS[0], URLS[1]), (URLS[1], URLS[2]), (URLS[1], URLS[3])]
+    pages.append((URLS[3], URLS[4]))
+
+    for parent, url in [(None, URLS[0])] + pages:
+        if parent is not None:
+            list_histories[url] = copy.deepcopy(list_histories[parent])
+            chain_histories[url] = chain_histories[parent]
+
+        list_history = list_histories[url]
+        chain_history = chain_histories[url]
+        for redirect in redirects.get(url, []):
+            list_history.append(redirect)
+            chain_history = URLHistory(redirect, chain_history)
+        list_history.append(url)
+        chain_history = URLHistory(url, chain_history)
+        chain_histories[url] = chain_history
+
+        assert list(chain_history) == list_history
+        assert len(chain_history) == len(list_history)
+        assert chain_history.depth == len(list_history)
+        assert chain_history.root == list_history[0]
+        assert chain_history[0] == list_history[0]
+        assert chain_history[-1] == list_history[-1]
+        if len(list_history) > 1:
+            assert chain_history.parent.url == list_history[-2]
+
+    # Later Responses don't change the history of earlier ones.
+    assert list(chain_histories[URLS[2]]) == list_histories[URLS[2]]
+    assert list_histories[URLS[2]] == [URLS[0], redirects[URLS[1]][0], URLS[1], URLS[2]]